@@ -9,10 +9,12 @@ Created on Dec 2019
 """"""""""""""""""""""""""""""
 import os
 import sys
-import pymysql
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
+from genepi.step1_downloadUCSCDB import DownloadUCSCDB
+from genepi.tools.annotationCache import GetGenomeRegionFileName
+
 """"""""""""""""""""""""""""""
 # design UI
 """"""""""""""""""""""""""""""
@@ -519,19 +521,21 @@ class Ui_AppGenEpi(object):
         list_command.append("-t")
         list_command.append(self.cb_thread.currentText())
 
-        ### using the default UCSCGenomeDatabase if user does not provide any self-defined regions.
+        ### call the download database function of genepi for updating the local annotation cache of the genome build
+        str_update_msg = ""
+        str_hgbuild = "hg19"
+        if self.ck_db.isChecked():
+            str_update_msg = "--updatedb -b " + self.cb_db.currentText()
+            str_hgbuild = self.cb_db.currentText()
+            DownloadUCSCDB(str_hgbuild=str_hgbuild)
+
+        ### using the annotation cache (or the default UCSCGenomeDatabase) if user does not provide any self-defined regions.
         if self.ck_region.isChecked():
             list_command.append("-s")
             list_command.append(self.tx_region.toPlainText())
         else:
             list_command.append("-s")
-            list_command.append(os.path.join(".", self.rootdir, "genepi", "UCSCGenomeDatabase.txt"))
-        
-        ### call the download database function of genepi for updating local database
-        str_update_msg = ""
-        if self.ck_db.isChecked():
-            str_update_msg = "--updatedb -b " + self.cb_db.currentText()
-            DownloadUCSCDB(os.path.join(".", self.rootdir, "genepi", "UCSCGenomeDatabase.txt"), self.cb_db.currentText())
+            list_command.append(GetGenomeRegionFileName(str_hgbuild))
         
         if self.ck_ld.isChecked():
             list_command.append("--compressld")
@@ -622,43 +626,6 @@ class Ui_AppGenEpi(object):
         ### release the run button
         self.bt_run.setEnabled(True)
 
-""""""""""""""""""""""""""""""
-# genepi module
-""""""""""""""""""""""""""""""
-# database schema: http://hgdownload.cse.ucsc.edu/goldenpath/hg19/database/
-# human genome build could be: hg18, hg19, hg38, etc.
-def DownloadUCSCDB(str_outputFilePath = os.path.dirname(os.path.abspath(__file__)), str_hgbuild = "hg19"):
-    """
-    To obtain the gene information such as official gene symbols and genomic coordinates, this function is for retrieving kgXref and knownGene data table from the UCSC human genome annotation database
-    Args:
-        str_outputFilePath (str): File path of output database
-        str_hgbuild (str): Genome build (eg. "hg19")
-    Returns:
-        - Expected Success Response::
-            "step1: Down load UCSC Database. DONE!"
-    
-    """
-
-    ### create connection
-    conv = {pymysql.constants.FIELD_TYPE.LONG: int}
-    conn = pymysql.Connect(host = "genome-mysql.cse.ucsc.edu", user = "genome", passwd = "",db = str_hgbuild,  local_infile = 1, conv = conv)
-    
-    ### execute sql command
-    str_sqlCommand = "SELECT chr, CASE WHEN strand='+' THEN txStart-1000 ELSE txStart END AS txStart, CASE WHEN strand='-' THEN txEnd+1000 ELSE txEnd END AS txEnd, strand, geneSymbol FROM "
-    str_sqlCommand = str_sqlCommand + "(SELECT REPLACE(chr, 'chr', '') AS chr, txStart, txEnd, strand, geneSymbol, MAX(ABS(txEnd-txStart)) FROM ( "
-    str_sqlCommand = str_sqlCommand + "SELECT knownGene.chrom AS chr, knownGene.txStart AS txStart, knownGene.txEnd AS txEnd, knownGene.strand AS strand, kgXref.geneSymbol AS geneSymbol FROM kgXref INNER JOIN knownGene ON kgXref.kgID=knownGene.name WHERE LEFT(kgXref.mRNA, 2) IN ('NR', 'NM')) AS L1 "
-    str_sqlCommand = str_sqlCommand + "GROUP BY geneSymbol) AS L2 WHERE LEFT(chr, 1) NOT IN ('X', 'Y', 'M', 'U') AND chr NOT LIKE '%\_%' ORDER BY CAST(chr AS UNSIGNED), txStart"
-    cur = conn.cursor()
-    cur.execute(str_sqlCommand)
-    db_result = cur.fetchall()
-    cur.close()
-    conn.close()
-
-    ### output database
-    with open(str_outputFilePath + "/UCSCGenomeDatabase.txt", "w") as file_outputFile:
-        for item in db_result:
-            file_outputFile.writelines(",".join(item) + "\n")
-
 """"""""""""""""""""""""""""""
 # main function
 """"""""""""""""""""""""""""""
@@ -14,7 +14,20 @@ import os
 import sys
 import numpy as np
 import multiprocessing as mp
-from . import *
+from .tools.genotypeStore import ConvertGenToStore
+from .tools.genotypeStore import LoadGenotypeStore
+from .tools.variantSummary import LoadVariantSummary
+from .tools.genotypeStore import GetGenotypeStoreFileName
+from .tools.genotypeStore import LoadGeneIndex
+from .tools.genotypeStore import WriteGeneIndex
+from .tools.genotypeStore import GetWritableGenotypeFileName
+from .tools.genReader import GetGenBaseName
+from .tools.stageCache import GetStageCachePath
+from .tools.stageCache import GetStageKey
+from .tools.stageCache import LoadStageCache
+from .tools.stageCache import SaveStageCache
+from .tools.annotationCache import GetAnnotationCachePath
+from .tools.annotationCache import GetGenomeRegionFileName
 
 """"""""""""""""""""""""""""""
 # define functions 
@@ -46,7 +59,7 @@ def ArgumentsParser():
     parser.add_argument('--app', action='store_true', default=False, help="open AppGenEpi")
 
     ### define arguments for I/O
-    parser.add_argument("-g", required=True, help="filename of the input .gen file")
+    parser.add_argument("-g", required=True, help="filename of the input .gen file (plain, gzip or bgzip)")
     parser.add_argument("-p", required=True, help="filename of the input phenotype")
     parser.add_argument("-s", required=False, help="self-defined genome regions")
     parser.add_argument("-o", required=False, help="output file path")
@@ -60,6 +73,9 @@ def ArgumentsParser():
     parser_group_1 = parser.add_argument_group("update UCSC database")
     parser_group_1.add_argument('--updatedb', action='store_true', default=False, help="enable this function")
     parser_group_1.add_argument("-b", required=False, default="hg19", choices=["hg19", "hg38"], help="human genome build")
+    parser_group_1.add_argument("--ucschost", required=False, default="genome-mysql.soe.ucsc.edu", help="host of the UCSC database or a local MySQL-compatible server with the same tables")
+    parser_group_1.add_argument("--ucscdump", required=False, nargs=2, default=None, metavar=("KNOWNGENE", "KGXREF"), help="build the annotation cache from the dumps of knownGene and kgXref tables instead of querying the database")
+    parser_group_1.add_argument("--annotationdir", required=False, default="", help="file path of the annotation cache (default: $GENEPI_ANNOTATION_CACHE or ~/.genepi/annotation)")
     
     ### define arguments for step2_estimateLD
     parser_group_2 = parser.add_argument_group("compress data by LD block")
@@ -69,6 +85,17 @@ def ArgumentsParser():
 
     ### define arguments for isolated test
     parser.add_argument('-i', action='store_true', default=False, help="enable isolated test")
+
+    ### define arguments for stage cache
+    parser_group_3 = parser.add_argument_group("stage cache of step2 and step3")
+    parser_group_3.add_argument('--nocache', action='store_true', default=False, help="disable this function")
+    parser_group_3.add_argument("--cachedir", required=False, default="", help="file path of the stage cache (default: .genepiCache next to the input .gen file)")
+
+    ### define arguments for resuming
+    parser.add_argument('--resume', action='store_true', default=False, help="resume step4 by skipping the genes finished by a previous run with the same inputs")
+
+    ### define arguments for memory budget
+    parser.add_argument("--memorybudget", required=False, default=0, type=float, help="memory budget of step4 in GB, genes exceeding the share of a thread take a low-memory path (default: available memory)")
  
     return parser
 
@@ -96,15 +123,14 @@ def InputChecking(str_inputFileName_genotype, str_inputFileName_phenotype, args)
         sys.exit("There is no input phenotype file.")
     
     ### count lines of input files
-    int_num_genotype = sum(1 for line in open(str_inputFileName_genotype))
     int_num_phenotype = sum(1 for line in open(str_inputFileName_phenotype))
-    
-    ### count sample num. in genotype file
-    with open(str_inputFileName_genotype, 'r') as file_inputFile:
-        list_line = file_inputFile.readline().strip().split(" ")
-        int_num_genotype_sample = (len(list_line) - 5) / 3
-        if int_num_genotype_sample != int_num_phenotype:
-            sys.exit("The number of samples in genotype file does not match the number of samples in phenotype file.")
+    ### convert genotype data into binary genotype store (skipped if it is up to date) in a single pass, then use the shape of the store
+    ConvertGenToStore(str_inputFileName_genotype, int_nJobs=min(int(args.t), mp.cpu_count()))
+    np_variant, np_hardcall = LoadGenotypeStore(str_inputFileName_genotype)
+    int_num_genotype = np_hardcall.shape[0]
+    int_num_genotype_sample = np_hardcall.shape[1]
+    if int_num_genotype_sample != int_num_phenotype:
+        sys.exit("The number of samples in genotype file does not match the number of samples in phenotype file.")
     
     ### get phenotype file
     if args.m=="c":
@@ -144,6 +170,22 @@ def main(args=None):
     ### obtain arguments from argument parser
     args = ArgumentsParser().parse_args(args)
 
+    ### import the steps after parsing the arguments, so --help (and a wrong argument) doesn't load the modelling and plotting stacks
+    from . import DownloadUCSCDB
+    from . import EstimateLDBlock
+    from . import SplitByGene
+    from . import BatchSingleGeneEpistasisLogistic
+    from . import BatchSingleGeneEpistasisLasso
+    from . import CrossGeneEpistasisLogistic
+    from . import CrossGeneEpistasisLasso
+    from . import EnsembleWithCovariatesClassifier
+    from . import EnsembleWithCovariatesRegressor
+    from . import SplittingDataAsIsolatedData
+    from . import ValidateByIsolatedDataClassifier
+    from . import ValidateByIsolatedDataRegressor
+    from . import ValidateByIsolatedDataCovariateClassifier
+    from . import ValidateByIsolatedDataCovariateRegressor
+
     ### get arguments for I/O
     str_inputFileName_genotype = os.path.abspath(args.g)
     str_inputFileName_phenotype = os.path.abspath(args.p)
@@ -174,13 +216,16 @@ def main(args=None):
         os.system(str_command)
         return
     
+    ### a .gen file in a read-only folder is linked into the output folder, where its genotype store (and the default stage cache) is written
+    str_inputFileName_genotype = GetWritableGenotypeFileName(str_inputFileName_genotype, str_outputFilePath)
+
     with open(os.path.join(str_outputFilePath, "GenEpi_Log_" + time.strftime("%Y%m%d-%H%M", time.localtime()) + ".txt"), "w") as file_outputFile:
         ### create log
         file_outputFile.writelines("start analysis at: " + time.strftime("%Y%m%d-%H:%M:%S", time.localtime()) + "\n" + "\n")
     
         ### log arguments
         file_outputFile.writelines("Arguments in effect:" + "\n")
-        file_outputFile.writelines("\t" + "-g (input genotype filename): " + str_inputFileName_genotype + "\n")
+        file_outputFile.writelines("\t" + "-g (input genotype filename): " + os.path.abspath(args.g) + "\n")
         file_outputFile.writelines("\t" + "-p (input phenotype filename): " + str_inputFileName_phenotype + "\n")
         file_outputFile.writelines("\t" + "-s (self-defined genome regions): " + str_inputFileName_regions + "\n")
         file_outputFile.writelines("\t" + "-o (output filepath): " + str_outputFilePath + "\n" + "\n")
@@ -190,13 +235,22 @@ def main(args=None):
         file_outputFile.writelines("\t" + "-t (number of threads): " + str(int_thread) + "\n" + "\n")
         
         file_outputFile.writelines("\t" + "--updatedb (enable function of update UCSC database): " + str(args.updatedb) + "\n")
-        file_outputFile.writelines("\t" + "-b (human genome build): " + args.b + "\n" + "\n")
+        file_outputFile.writelines("\t" + "-b (human genome build): " + args.b + "\n")
+        file_outputFile.writelines("\t" + "--ucschost (host of the UCSC database): " + args.ucschost + "\n")
+        file_outputFile.writelines("\t" + "--ucscdump (dumps of knownGene and kgXref tables): " + (",".join(args.ucscdump) if args.ucscdump is not None else "None") + "\n")
+        file_outputFile.writelines("\t" + "--annotationdir (file path of the annotation cache): " + GetAnnotationCachePath(args.b, args.annotationdir) + "\n" + "\n")
         
         file_outputFile.writelines("\t" + "--compressld (enable function of LD data compression): " + str(args.compressld) + "\n")
         file_outputFile.writelines("\t" + "-d (D prime threshold): " + str(args.d) + "\n")
         file_outputFile.writelines("\t" + "-r (R square threshold): " + str(args.r) + "\n" + "\n")
 
         file_outputFile.writelines("\t" + "-i (enable isolated test): " + str(args.i) + "\n" + "\n")
+
+        file_outputFile.writelines("\t" + "--resume (resume step4 from the journal of finished genes): " + str(args.resume) + "\n")
+        file_outputFile.writelines("\t" + "--memorybudget (memory budget of step4 in GB): " + (str(args.memorybudget) if args.memorybudget > 0 else "available memory") + "\n" + "\n")
+
+        file_outputFile.writelines("\t" + "--nocache (disable stage cache of step2 and step3): " + str(args.nocache) + "\n")
+        file_outputFile.writelines("\t" + "--cachedir (file path of the stage cache): " + GetStageCachePath(str_inputFileName_genotype, args.cachedir) + "\n" + "\n")
         
         ### check input format
         int_num_genotype, int_num_phenotype = InputChecking(str_inputFileName_genotype, str_inputFileName_phenotype, args)
@@ -208,29 +262,57 @@ def main(args=None):
         ### step0_splittingDataAsIsolatedData
         if args.i:
             SplittingDataAsIsolatedData(str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath=str_outputFilePath, int_randomState = 0)
-            str_inputFileName_genotype = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).replace(".gen", "_subset_1.gen"))
+            str_inputFileName_genotype = os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_subset_1.gen"))
             str_inputFileName_phenotype = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_phenotype).replace(".csv", "_subset_1.csv"))
 
+        ### convert genotype data into binary genotype store (skipped if it is up to date)
+        ConvertGenToStore(str_inputFileName_genotype, int_nJobs=int(int_thread))
+
         ### step1_downloadUCSCDB
         if args.updatedb:
-            DownloadUCSCDB(str_hgbuild=args.b)
+            DownloadUCSCDB(str_hgbuild=args.b, str_host=args.ucschost, list_inputFileName_dump=args.ucscdump, str_cacheFilePath=args.annotationdir)
     
+        ### stage cache of step2 and step3, which only depend on the genotype data and their parameters
+        str_cacheFilePath = GetStageCachePath(str_inputFileName_genotype, args.cachedir)
+        
         ### step2_estimateLD
         if args.compressld:
-            EstimateLDBlock(str_inputFileName_genotype, str_outputFilePath=str_outputFilePath, float_threshold_DPrime=float(args.d), float_threshold_RSquare=float(args.r))
-            str_inputFileName_genotype = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype.replace(".gen", "_LDReduced.gen")))
+            str_inputFileName_genotype_LDReduced = os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_LDReduced.gen"))
+            if not args.nocache:
+                str_key = GetStageKey(str_cacheFilePath, "step2_estimateLD", [str_inputFileName_genotype], {"genotype": os.path.basename(str_inputFileName_genotype), "DPrime": float(args.d), "RSquare": float(args.r)})
+            if not args.nocache and LoadStageCache(str_cacheFilePath, "step2_estimateLD", str_key, str_outputFilePath):
+                print("step2: Estimate LD. Restored from stage cache.")
+            else:
+                EstimateLDBlock(str_inputFileName_genotype, str_outputFilePath=str_outputFilePath, float_threshold_DPrime=float(args.d), float_threshold_RSquare=float(args.r), int_nJobs=int(int_thread))
+                ConvertGenToStore(str_inputFileName_genotype_LDReduced, int_nJobs=int(int_thread))
+                if not args.nocache:
+                    list_outputFileName = [str_inputFileName_genotype_LDReduced, os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", ".LDBlock"))]
+                    SaveStageCache(str_cacheFilePath, "step2_estimateLD", str_key, list_outputFileName + list(GetGenotypeStoreFileName(str_inputFileName_genotype_LDReduced)))
+            str_inputFileName_genotype = str_inputFileName_genotype_LDReduced
+            ConvertGenToStore(str_inputFileName_genotype)
+        
+        ### summarize genotype counts and allele frequency of each variant once for later steps (skipped if it is up to date)
+        LoadVariantSummary(str_inputFileName_genotype, str_inputFileName_phenotype)
         
         ### step3_splitByGene
-        if str_inputFileName_regions == "None":
-            SplitByGene(str_inputFileName_genotype, str_outputFilePath=os.path.join(str_outputFilePath, "snpSubsets"))
+        str_inputFileName_UCSCDB = GetGenomeRegionFileName(args.b, args.annotationdir) if str_inputFileName_regions == "None" else str_inputFileName_regions
+        if not args.nocache:
+            str_key = GetStageKey(str_cacheFilePath, "step3_splitByGene", [str_inputFileName_genotype, str_inputFileName_UCSCDB], {})
+        if not args.nocache and LoadStageCache(str_cacheFilePath, "step3_splitByGene", str_key, os.path.join(str_outputFilePath, "snpSubsets")):
+            ### the restored gene index refers to the genotype data of this run
+            str_inputFileName_geneIndex = os.path.join(str_outputFilePath, "snpSubsets", "GeneIndex.csv")
+            WriteGeneIndex(str_inputFileName_geneIndex, str_inputFileName_genotype, LoadGeneIndex(str_inputFileName_geneIndex)[1])
+            print("step3: Split by gene. Restored from stage cache.")
         else:
-            SplitByGene(str_inputFileName_genotype, str_inputFileName_UCSCDB=str_inputFileName_regions, str_outputFilePath=os.path.join(str_outputFilePath, "snpSubsets"))
+            SplitByGene(str_inputFileName_genotype, str_inputFileName_UCSCDB=str_inputFileName_UCSCDB, str_outputFilePath=os.path.join(str_outputFilePath, "snpSubsets"))
+            if not args.nocache:
+                SaveStageCache(str_cacheFilePath, "step3_splitByGene", str_key, [os.path.join(str_outputFilePath, "snpSubsets", "GeneIndex.csv")])
         
         if args.m=="c":
             ### step4_singleGeneEpistasis_Logistic (for case/control trial)
-            BatchSingleGeneEpistasisLogistic(os.path.join(str_outputFilePath, "snpSubsets"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=int(int_thread))
+            BatchSingleGeneEpistasisLogistic(os.path.join(str_outputFilePath, "snpSubsets"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=int(int_thread), str_inputFileName_genotype=str_inputFileName_genotype, bool_resume=args.resume, int_memoryBudget=int(args.memorybudget * 2**30))
             ### step5_crossGeneEpistasis_Logistic (for case/control trial)
-            float_score_train, float_score_test = CrossGeneEpistasisLogistic(os.path.join(str_outputFilePath, "singleGeneResult"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=1)
+            float_score_train, float_score_test = CrossGeneEpistasisLogistic(os.path.join(str_outputFilePath, "singleGeneResult"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=int(int_thread))
             file_outputFile.writelines("Overall genetic feature performance (F1 score)" + "\n")
             file_outputFile.writelines("Training: " + str(float_score_train) + "\n")
             file_outputFile.writelines("Testing (" + str(args.k) + "-fold CV): " + str(float_score_test) + "\n" + "\n")
@@ -241,7 +323,7 @@ def main(args=None):
             file_outputFile.writelines("Testing (" + str(args.k) + "-fold CV): " + str(float_score_test) + "\n" + "\n")
             ### step7_validateByIsolatedData
             if args.i == True:
-                str_inputFileName_genotype = os.path.join(str_outputFilePath, os.path.basename(args.g).replace(".gen", "_subset_2.gen"))
+                str_inputFileName_genotype = os.path.join(str_outputFilePath, GetGenBaseName(args.g).replace(".gen", "_subset_2.gen"))
                 str_inputFileName_phenotype = os.path.join(str_outputFilePath, os.path.basename(args.p).replace(".csv", "_subset_2.csv"))
                 float_score_test_gen = ValidateByIsolatedDataClassifier(os.path.join(str_outputFilePath, "crossGeneResult", "Classifier.pkl"), os.path.join(str_outputFilePath, "crossGeneResult", "Feature.csv"), str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath=os.path.join(str_outputFilePath, "isolatedValidation"))
                 float_score_test_cov = ValidateByIsolatedDataCovariateClassifier(os.path.join(str_outputFilePath, "crossGeneResult", "Classifier_Covariates.pkl"), os.path.join(str_outputFilePath, "crossGeneResult", "Feature.csv"), str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath=os.path.join(str_outputFilePath, "isolatedValidation"))
@@ -250,9 +332,9 @@ def main(args=None):
                 file_outputFile.writelines("With co-variate: " + str(float_score_test_cov) + "\n" + "\n")
         else:
             ### step4_singleGeneEpistasis_Lasso (for quantitative trial)
-            BatchSingleGeneEpistasisLasso(os.path.join(str_outputFilePath, "snpSubsets"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=int(int_thread))
+            BatchSingleGeneEpistasisLasso(os.path.join(str_outputFilePath, "snpSubsets"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=int(int_thread), str_inputFileName_genotype=str_inputFileName_genotype, bool_resume=args.resume, int_memoryBudget=int(args.memorybudget * 2**30))
             ### step5_crossGeneEpistasis_Lasso (for quantitative trial)
-            float_score_train, float_score_test = CrossGeneEpistasisLasso(os.path.join(str_outputFilePath, "singleGeneResult"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=1)
+            float_score_train, float_score_test = CrossGeneEpistasisLasso(os.path.join(str_outputFilePath, "singleGeneResult"), str_inputFileName_phenotype, int_kOfKFold=int(args.k), int_nJobs=int(int_thread))
             file_outputFile.writelines("Overall genetic feature performance (Average of the Pearson and Spearman correlation)" + "\n")
             file_outputFile.writelines("Training: " + str(float_score_train) + "\n")
             file_outputFile.writelines("Testing (" + str(args.k) + "-fold CV): " + str(float_score_test) + "\n" + "\n")
@@ -263,7 +345,7 @@ def main(args=None):
             file_outputFile.writelines("Testing (" + str(args.k) + "-fold CV): " + str(float_score_test) + "\n" + "\n")
             ### step7_validateByIsolatedData
             if args.i == True:
-                str_inputFileName_genotype = os.path.join(str_outputFilePath, os.path.basename(args.g).replace(".gen", "_subset_2.gen"))
+                str_inputFileName_genotype = os.path.join(str_outputFilePath, GetGenBaseName(args.g).replace(".gen", "_subset_2.gen"))
                 str_inputFileName_phenotype = os.path.join(str_outputFilePath, os.path.basename(args.p).replace(".csv", "_subset_2.csv"))
                 float_score_test_gen = ValidateByIsolatedDataRegressor(os.path.join(str_outputFilePath, "crossGeneResult", "Regressor.pkl"), os.path.join(str_outputFilePath, "crossGeneResult", "Feature.csv"), str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath=os.path.join(str_outputFilePath, "isolatedValidation"))
                 float_score_test_cov = ValidateByIsolatedDataCovariateRegressor(os.path.join(str_outputFilePath, "crossGeneResult", "Regressor_Covariates.pkl"), os.path.join(str_outputFilePath, "crossGeneResult", "Feature.csv"), str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath=os.path.join(str_outputFilePath, "isolatedValidation"))
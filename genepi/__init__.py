@@ -8,28 +8,64 @@ Created on Feb 2018
 """"""""""""""""""""""""""""""
 # import libraries
 """"""""""""""""""""""""""""""
-from .step0_correctMissingID import CorrectMissingID
-from .step1_downloadUCSCDB import DownloadUCSCDB
-from .step2_estimateLD import EstimateLDBlock
-from .step3_splitByGene import SplitByGene
-from .step4_singleGeneEpistasis_Logistic import SingleGeneEpistasisLogistic
-from .step4_singleGeneEpistasis_Logistic import BatchSingleGeneEpistasisLogistic
-from .step4_singleGeneEpistasis_Logistic import RandomizedLogisticRegression
-from .step4_singleGeneEpistasis_Logistic import LogisticRegressionL1CV
-from .step4_singleGeneEpistasis_Logistic import FeatureEncoderLogistic
-from .step4_singleGeneEpistasis_Lasso import SingleGeneEpistasisLasso
-from .step4_singleGeneEpistasis_Lasso import BatchSingleGeneEpistasisLasso
-from .step4_singleGeneEpistasis_Lasso import RandomizedLassoRegression
-from .step4_singleGeneEpistasis_Lasso import LassoRegressionCV
-from .step4_singleGeneEpistasis_Lasso import FeatureEncoderLasso
-from .step5_crossGeneEpistasis_Logistic import CrossGeneEpistasisLogistic
-from .step5_crossGeneEpistasis_Logistic import LogisticRegressionL1
-from .step5_crossGeneEpistasis_Lasso import CrossGeneEpistasisLasso
-from .step5_crossGeneEpistasis_Lasso import LassoRegression
-from .step6_ensembleWithCovariates import EnsembleWithCovariatesClassifier
-from .step6_ensembleWithCovariates import EnsembleWithCovariatesRegressor
-from .step7_validateByIsolatedData import SplittingDataAsIsolatedData
-from .step7_validateByIsolatedData import ValidateByIsolatedDataClassifier
-from .step7_validateByIsolatedData import ValidateByIsolatedDataRegressor
-from .step7_validateByIsolatedData import ValidateByIsolatedDataCovariateClassifier
-from .step7_validateByIsolatedData import ValidateByIsolatedDataCovariateRegressor
\ No newline at end of file
+import importlib
+
+""""""""""""""""""""""""""""""
+# define lazy attributes
+""""""""""""""""""""""""""""""
+### key: public name; value: the module defining it. The step modules (and the modelling and plotting stacks they import) are loaded at the first use of one of their names, so `import genepi`, `GenEpi --help` and the worker processes only load what they use
+dict_lazyAttribute = {
+    "ConvertGenToStore": ".tools.genotypeStore",
+    "CorrectMissingID": ".step0_correctMissingID",
+    "DownloadUCSCDB": ".step1_downloadUCSCDB",
+    "EstimateLDBlock": ".step2_estimateLD",
+    "SplitByGene": ".step3_splitByGene",
+    "SingleGeneEpistasisLogistic": ".step4_singleGeneEpistasis_Logistic",
+    "BatchSingleGeneEpistasisLogistic": ".step4_singleGeneEpistasis_Logistic",
+    "RandomizedLogisticRegression": ".step4_singleGeneEpistasis_Logistic",
+    "LogisticRegressionL1CV": ".step4_singleGeneEpistasis_Logistic",
+    "FeatureEncoderLogistic": ".step4_singleGeneEpistasis_Logistic",
+    "SingleGeneEpistasisLasso": ".step4_singleGeneEpistasis_Lasso",
+    "BatchSingleGeneEpistasisLasso": ".step4_singleGeneEpistasis_Lasso",
+    "RandomizedLassoRegression": ".step4_singleGeneEpistasis_Lasso",
+    "LassoRegressionCV": ".step4_singleGeneEpistasis_Lasso",
+    "FeatureEncoderLasso": ".step4_singleGeneEpistasis_Lasso",
+    "CrossGeneEpistasisLogistic": ".step5_crossGeneEpistasis_Logistic",
+    "LogisticRegressionL1": ".step5_crossGeneEpistasis_Logistic",
+    "FitAndEvaluateLogistic": ".step5_crossGeneEpistasis_Logistic",
+    "CrossGeneEpistasisLasso": ".step5_crossGeneEpistasis_Lasso",
+    "LassoRegression": ".step5_crossGeneEpistasis_Lasso",
+    "FitAndEvaluateLasso": ".step5_crossGeneEpistasis_Lasso",
+    "EnsembleWithCovariatesClassifier": ".step6_ensembleWithCovariates",
+    "EnsembleWithCovariatesRegressor": ".step6_ensembleWithCovariates",
+    "SplittingDataAsIsolatedData": ".step7_validateByIsolatedData",
+    "ValidateByIsolatedDataClassifier": ".step7_validateByIsolatedData",
+    "ValidateByIsolatedDataRegressor": ".step7_validateByIsolatedData",
+    "ValidateByIsolatedDataCovariateClassifier": ".step7_validateByIsolatedData",
+    "ValidateByIsolatedDataCovariateRegressor": ".step7_validateByIsolatedData",
+}
+
+__all__ = list(dict_lazyAttribute.keys())
+
+def __getattr__(str_name):
+    """
+
+    To load a public name of the package at its first use (PEP 562), the name is kept in the package afterwards.
+
+    Args:
+        str_name (str): The name of the attribute
+
+    Returns:
+        The attribute
+
+    """
+
+    if str_name not in dict_lazyAttribute:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(str_name))
+    attribute = getattr(importlib.import_module(dict_lazyAttribute[str_name], __name__), str_name)
+    globals()[str_name] = attribute
+
+    return attribute
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
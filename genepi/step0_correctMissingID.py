@@ -17,6 +17,9 @@ import sys
 import os
 import subprocess
 
+from genepi.tools.genReader import GetGenBaseName
+from genepi.tools.genReader import IterGenBlock
+
 """"""""""""""""""""""""""""""
 # main function
 """"""""""""""""""""""""""""""
@@ -25,14 +28,10 @@ def CorrectMissingID(str_inputFileName_genotype, str_outputFilePath = ""):
     if str_outputFilePath == "":
         str_outputFilePath = os.path.dirname(str_inputFileName_genotype)
 
-    ### count lines of input files
-    int_num_genotype = sum(1 for line in open(str_inputFileName_genotype))
-    
-    ### read .gen file
-    with open(str_inputFileName_genotype, "r") as file_inputFile:
-        with open(os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).replace(".gen", "_addID.gen")), "w") as file_outputFile:
-            int_count_snp = 0
-            for line in file_inputFile:
+    ### read .gen file (plain, gzip or bgzip) by blocks, the progress is taken from the byte offset
+    with open(os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_addID.gen")), "w") as file_outputFile:
+        for list_line, float_progress in IterGenBlock(str_inputFileName_genotype):
+            for line in list_line:
                 list_thisSnp = line.strip().split(" ")
                 ### if current snp have no ID, assign temporary ID (chromosome + position) to it
                 if list_thisSnp[1] == ".":
@@ -40,12 +39,11 @@ def CorrectMissingID(str_inputFileName_genotype, str_outputFilePath = ""):
                     file_outputFile.writelines(' '.join(list_thisSnp) + "\n")
                 else:
                     file_outputFile.writelines(line)
-                
-                ### show progress
-                int_count_snp = int_count_snp + 1
-                str_print = "step0: Processing: " + "{0:.2f}".format(float(int_count_snp) / int_num_genotype * 100) + "\t\t"
-                sys.stdout.write('%s\r' % str_print)
-                sys.stdout.flush()
+            
+            ### show progress
+            str_print = "step0: Processing: " + "{0:.2f}".format(float_progress * 100) + "\t\t"
+            sys.stdout.write('%s\r' % str_print)
+            sys.stdout.flush()
     
     print("step0: Correct Missingn ID DONE! \t\t\t\t")
 
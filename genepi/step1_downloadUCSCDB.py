@@ -9,21 +9,28 @@ Created on Feb 2018
 # import libraries
 """"""""""""""""""""""""""""""
 import os
-import pymysql
+import shutil
+
+from genepi.tools.annotationCache import QueryUCSCDB
+from genepi.tools.annotationCache import ParseUCSCDump
+from genepi.tools.annotationCache import BuildAnnotationCache
 
 """"""""""""""""""""""""""""""
 # main function
 """"""""""""""""""""""""""""""
 # database schema: http://hgdownload.cse.ucsc.edu/goldenpath/hg19/database/
 # human genome build could be: hg18, hg19, hg38, etc.
-def DownloadUCSCDB(str_outputFilePath = os.path.dirname(os.path.abspath(__file__)), str_hgbuild = "hg19"):
+def DownloadUCSCDB(str_outputFilePath = "", str_hgbuild = "hg19", str_host = "genome-mysql.soe.ucsc.edu", list_inputFileName_dump = None, str_cacheFilePath = ""):
     """
 
-    To obtain the gene information such as official gene symbols and genomic coordinates, this function is for retrieving kgXref and knownGene data table from the UCSC human genome annotation database
+    To obtain the gene information such as official gene symbols and genomic coordinates, this function is for retrieving kgXref and knownGene data table from the UCSC human genome annotation database (or their dump files, for the nodes without internet), and building the local annotation cache of the genome build, so that later runs never connect to the database
 
     Args:
-        str_outputFilePath (str): File path of output database
+        str_outputFilePath (str): File path of an additional copy of the gene regions (UCSCGenomeDatabase.txt) (default: "". Only the annotation cache)
         str_hgbuild (str): Genome build (eg. "hg19")
+        str_host (str): Host of the UCSC database or a local MySQL-compatible server with the same tables (default: "genome-mysql.soe.ucsc.edu")
+        list_inputFileName_dump (list): File names of the dumps of knownGene and kgXref tables, the database is not queried if they are given (default: None)
+        str_cacheFilePath (str): File path of the annotation cache (default: "". $GENEPI_ANNOTATION_CACHE or ~/.genepi/annotation)
 
     Returns:
         - Expected Success Response::
@@ -32,28 +39,25 @@ def DownloadUCSCDB(str_outputFilePath = os.path.dirname(os.path.abspath(__file__
     
     """
 
-    ### create connection
-    conv = {pymysql.constants.FIELD_TYPE.LONG: int}
-    conn = pymysql.Connect(host = "genome-mysql.soe.ucsc.edu", user = "genome", passwd = "",db = str_hgbuild,  local_infile = 1, conv = conv)
-    
-    ### execute sql command
-    str_sqlCommand = "SELECT chr, CASE WHEN strand='+' THEN txStart-1000 ELSE txStart END AS txStart, CASE WHEN strand='-' THEN txEnd+1000 ELSE txEnd END AS txEnd, strand, geneSymbol FROM "
-    str_sqlCommand = str_sqlCommand + "(SELECT REPLACE(chr, 'chr', '') AS chr, txStart, txEnd, strand, geneSymbol, MAX(ABS(txEnd-txStart)) FROM ( "
-    str_sqlCommand = str_sqlCommand + "SELECT knownGene.chrom AS chr, knownGene.txStart AS txStart, knownGene.txEnd AS txEnd, knownGene.strand AS strand, kgXref.geneSymbol AS geneSymbol FROM kgXref INNER JOIN knownGene ON kgXref.kgID=knownGene.name WHERE LEFT(kgXref.mRNA, 2) IN ('NR', 'NM')) AS L1 "
-    str_sqlCommand = str_sqlCommand + "GROUP BY geneSymbol) AS L2 WHERE LEFT(chr, 1) NOT IN ('X', 'Y', 'M', 'U') AND chr NOT LIKE '%\_%' ORDER BY CAST(chr AS UNSIGNED), txStart"
-    cur = conn.cursor()
-    cur.execute(str_sqlCommand)
-    db_result = cur.fetchall()
-    cur.close()
-    conn.close()
+    ### retrieve gene regions
+    if list_inputFileName_dump is not None and len(list_inputFileName_dump) == 2:
+        list_region = ParseUCSCDump(list_inputFileName_dump[0], list_inputFileName_dump[1])
+        str_source = "dump: " + ", ".join([os.path.abspath(item) for item in list_inputFileName_dump])
+    else:
+        list_region = QueryUCSCDB(str_hgbuild, str_host)
+        str_source = "mysql: " + str_host + "/" + str_hgbuild
+
+    ### build annotation cache
+    str_fileName_UCSCDB = BuildAnnotationCache(list_region, str_hgbuild, str_source, str_cacheFilePath)
 
     ### output database
-    with open(str_outputFilePath + "/UCSCGenomeDatabase.txt", "w") as file_outputFile:
-        for item in db_result:
-            file_outputFile.writelines(",".join(item) + "\n")
+    if str_outputFilePath != "":
+        shutil.copyfile(str_fileName_UCSCDB, os.path.join(str_outputFilePath, "UCSCGenomeDatabase.txt"))
     
     print("step1: Down load UCSC Database. DONE!")
 
+    return str_fileName_UCSCDB
+
 
 """
 list_output = []
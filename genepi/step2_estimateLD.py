@@ -11,10 +11,39 @@ Created on Feb 2018
 import os
 import sys
 import numpy as np
+import multiprocessing as mp
+
+from genepi.tools.genotypeStore import ConvertGenToStore
+from genepi.tools.genotypeStore import LoadGenotypeStore
+from genepi.tools.genotypeStore import HardCallToIndex
+from genepi.tools.genotypeStore import DecodeGenHardCall
+from genepi.tools.variantSummary import LoadVariantSummary
+from genepi.tools.genReader import GetGenBaseName
+from genepi.tools.genReader import IterGenBlock
 
 """"""""""""""""""""""""""""""
 # define functions 
 """"""""""""""""""""""""""""""
+def DecodeHardCall(gen_snp):
+    """
+
+    A function for decoding the hard calls of a single variant from a line of .gen file
+
+    Args:
+        gen_snp (str): A line of .gen file
+        
+    Returns:
+        (ndarray): np_call
+
+            1D array containing the genotype index (0: AA, 1: AB, 2: BB) of all samples with `int8` type
+    
+    """
+
+    ### get all subject's genotype
+    np_info, np_hardcall = DecodeGenHardCall(gen_snp)
+    
+    return HardCallToIndex(np_hardcall[0])
+
 def EstimateAlleleFrequency(gen_snp):
     """
 
@@ -31,16 +60,29 @@ def EstimateAlleleFrequency(gen_snp):
     
     """
     
-    ### get all subject's genotype
-    list_snp = gen_snp.split(" ")[5:]
+    return EstimateAlleleFrequencyByHardCall(DecodeHardCall(gen_snp.strip()))
+
+def EstimateAlleleFrequencyByHardCall(np_call):
+    """
+
+    A function for estimating allele frequency of a single varaint from its hard calls
+
+    Args:
+        np_call (ndarray): 1D array containing the hard calls of a variant of all samples with `int8` type
+        
+    Returns:
+        (tuple): tuple containing:
+
+            - float_frequency_A (float): The reference allele type frequency
+            - float_frequency_B (float): The alternative allele type frequency
+    
+    """
+    
     ### get the number of subjects
-    int_num_subject = int(len(list_snp)/3)
+    int_num_subject = np_call.shape[0]
     
     ### generate count table (AA, AB, BB)
-    list_count = [0, 0, 0]
-    for idx_subject in range(0, int_num_subject):
-        idx_col = np.argmax(list_snp[idx_subject * 3: idx_subject * 3 + 3])
-        list_count[idx_col] = list_count[idx_col] + 1
+    list_count = np.bincount(HardCallToIndex(np_call), minlength=3)
     
     ### calculate allele frequency
     ### frequency of A = AA + AB/2
@@ -67,74 +109,284 @@ def EstimatePairwiseLD(gen_snp_1, gen_snp_2):
     
     """
 
-    ### get all subject's genotype
-    list_snp1 = gen_snp_1.split(" ")[5:]
-    list_snp2 = gen_snp_2.split(" ")[5:]
+    return EstimatePairwiseLDByHardCall(DecodeHardCall(gen_snp_1.strip()), DecodeHardCall(gen_snp_2.strip()))
+
+def EstimatePairwiseLDByHardCall(np_call_1, np_call_2):
+    """
+
+    Lewontin (1964) linkage disequilibrium (LD) estimation from the hard calls of two variants.
+
+    Args:
+        np_call_1 (ndarray): 1D array containing the hard calls of first variant of all samples with `int8` type
+        np_call_2 (ndarray): 1D array containing the hard calls of second variant of all samples with `int8` type
+
+    Returns:
+        (tuple): tuple containing:
+
+            - float_D_prime (float): The DPrime of these two variants
+            - float_R_square (float): The RSquare of these two variants
+    
+    """
+
+    np_D_prime, np_R_square = EstimatePairwiseLDBatch(np.asarray(np_call_1)[np.newaxis, :], np_call_2)
+    
+    return float(np_D_prime[0]), float(np_R_square[0])
+
+def GenerateContingencyTableBatch(np_call_block, np_call):
+    """
+
+    To generate the 3x3 genotype contingency tables between several variants and one variant (or row by row between two sets of variants) with a single bincount.
+
+    Args:
+        np_call_block (ndarray): 2D array (variants x samples) containing the hard calls of several variants with `int8` type
+        np_call (ndarray): 1D array containing the hard calls of one variant of all samples, or 2D array with the same shape as np_call_block, with `int8` type
+
+    Returns:
+        (ndarray): np_contigency
+
+            3D array (variants x 3 x 3) containing the contingency tables, row: genotype of the variant in np_call_block; col: genotype of the variant in np_call
+    
+    """
+
+    int_num_pair = np_call_block.shape[0]
+    np_index = HardCallToIndex(np_call_block).astype(np.int64) * 3 + HardCallToIndex(np_call).astype(np.int64)
+    np_index = np_index + (np.arange(int_num_pair, dtype=np.int64) * 9)[:, np.newaxis]
+    
+    return np.bincount(np_index.ravel(), minlength=int_num_pair * 9).reshape(int_num_pair, 3, 3)
+
+def EstimatePairwiseLDBatch(np_call_block, np_call):
+    """
+
+    Lewontin (1964) linkage disequilibrium (LD) estimation between several variants and one variant (or row by row between two sets of variants). The EM algorithm runs on all of the pairs at once; a pair stops updating once it converges, and the pairs with zero denominator get DPrime = RSquare = 1.0.
+
+    Args:
+        np_call_block (ndarray): 2D array (variants x samples) containing the hard calls of several variants with `int8` type
+        np_call (ndarray): 1D array containing the hard calls of one variant of all samples, or 2D array with the same shape as np_call_block, with `int8` type
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_D_prime (ndarray): 1D array containing the DPrime of each pair
+            - np_R_square (ndarray): 1D array containing the RSquare of each pair
+    
+    """
+
     ### get the number of subjects
-    int_num_subject = int(len(list_snp1)/3)
+    int_num_subject = np_call_block.shape[1]
     
     ### generate contigency table
     ### row: SNP1_AA; SNP1_Aa; SNP1_aa
     ### col: SNP2_bb; SNP2_Bb; SNP2_bb
-    np_contigency = np.zeros((3, 3), np.dtype(int))
-    for idx_subject in range(0, int_num_subject):
-        idx_row = np.argmax(np.array(list_snp1[idx_subject * 3: idx_subject * 3 + 3]))
-        idx_col = np.argmax(np.array(list_snp2[idx_subject * 3: idx_subject * 3 + 3]))
-        np_contigency[idx_row, idx_col] = np_contigency[idx_row, idx_col] + 1
+    np_contigency = GenerateContingencyTableBatch(np_call_block, np_call).astype(float)
     
     ### estimate single locus haplotyes
     ### snp1_A = (AABB + AABb + AAbb) + (AaBB + AaBb + Aabb)/2; snp1_a = snp1_A - 1
-    float_probability_A = float(np.sum(np_contigency[0, :]) + float(np.sum(np_contigency[1, :])) / 2) / int_num_subject
-    float_probability_a = 1 - float_probability_A
+    np_probability_A = (np.sum(np_contigency[:, 0, :], axis=1) + np.sum(np_contigency[:, 1, :], axis=1) / 2) / int_num_subject
+    np_probability_a = 1 - np_probability_A
     ### snp2_B = (AABB + AaBB + aaBB) + (AABb + AaBb + aaBb)/2; snp2_b = snp2_B - 1
-    float_probability_B = float(np.sum(np_contigency[:, 0]) + float(np.sum(np_contigency[:, 1])) / 2) / int_num_subject
-    float_probability_b = 1 - float_probability_B
+    np_probability_B = (np.sum(np_contigency[:, :, 0], axis=1) + np.sum(np_contigency[:, :, 1], axis=1) / 2) / int_num_subject
+    np_probability_b = 1 - np_probability_B
     
     ### set arbitrary probability of AB
-    float_probability_AB = float_probability_A * float_probability_B
+    np_probability_AB = np_probability_A * np_probability_B
     
-    try:
-        ### EM algorithm
+    ### EM algorithm, only the pairs which haven't converged are updated
+    ### num_AABB, num_AABb, num_AaBB terms and num_AaBb are constant during iterations
+    np_num_constant = 2 * np_contigency[:, 0, 0] + np_contigency[:, 0, 1] + np_contigency[:, 1, 0]
+    np_num_AaBb = np_contigency[:, 1, 1]
+    np_flag_zeroDivision = np.zeros(np_probability_AB.shape[0], dtype=bool)
+    np_activeIdx = np.arange(np_probability_AB.shape[0])
+    np_A = np_probability_A
+    np_B = np_probability_B
+    np_AB = np_probability_AB.copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
         for idx_loop in range(0, 10000):
             ### E(num_AB|prob_AB) = 2 * num_AABB + num_AABb + num_AaBB +
             ### (prob_AB * (1 + prob_AB - prob_A - prob_B) * num_AbBb) / 
             ### ((prob_A - prob_AB) * (prob_B - prob_AB) + prob_AB * (1 + prob_AB - prob_A - prob_B))
-            float_num_AB_estimateByEM = 2 * float(np_contigency[0, 0]) + float(np_contigency[0, 1]) + float(np_contigency[1, 0]) + (float_probability_AB * (1 + float_probability_AB - float_probability_A - float_probability_B) * float(np_contigency[1, 1])) / ((float_probability_A - float_probability_AB) * (float_probability_B - float_probability_AB) + float_probability_AB * (1 + float_probability_AB - float_probability_A - float_probability_B))
-            float_probability_AB_estimateByEM = float_num_AB_estimateByEM / (int_num_subject * 2)
-            if abs(float_probability_AB_estimateByEM - float_probability_AB) < 0.0000001:
+            np_ab = 1 + np_AB - np_A - np_B
+            np_denominator = (np_A - np_AB) * (np_B - np_AB) + np_AB * np_ab
+            np_num_AB_estimateByEM = np_num_constant + (np_AB * np_ab * np_num_AaBb) / np_denominator
+            np_probability_AB_estimateByEM = np_num_AB_estimateByEM / (int_num_subject * 2)
+            
+            ### pairs with zero denominator or converged pairs stop here, the converged ones keep their previous estimation
+            np_flag_thisZero = np_denominator == 0
+            np_flag_update = ~(np_flag_thisZero | (np.abs(np_probability_AB_estimateByEM - np_AB) < 0.0000001))
+            if np_flag_update.all():
+                np_AB = np_probability_AB_estimateByEM
+                continue
+            np_flag_zeroDivision[np_activeIdx[np_flag_thisZero]] = True
+            np_probability_AB[np_activeIdx] = np.where(np_flag_update, np_probability_AB_estimateByEM, np_AB)
+            
+            ### keep the pairs which haven't converged
+            np_activeIdx = np_activeIdx[np_flag_update]
+            if np_activeIdx.shape[0] == 0:
                 break
-            else:
-                float_probability_AB = float_probability_AB_estimateByEM
+            np_A = np_A[np_flag_update]
+            np_B = np_B[np_flag_update]
+            np_AB = np_probability_AB_estimateByEM[np_flag_update]
+            np_num_constant = np_num_constant[np_flag_update]
+            np_num_AaBb = np_num_AaBb[np_flag_update]
+        else:
+            np_probability_AB[np_activeIdx] = np_AB
         
         ### calculate D
-        float_D = float_probability_AB - float_probability_A * float_probability_B
+        np_D = np_probability_AB - np_probability_A * np_probability_B
         ### calculate D prime
-        if float_D >= 0:
-            float_D_min = min([float_probability_A * (1 - float_probability_B), (1 - float_probability_A) * float_probability_B])
-        else:
-            float_D_min = max([-float_probability_A * float_probability_B, -(1 - float_probability_A) * (1 - float_probability_B)])
-        float_D_prime = float_D / float_D_min
+        np_D_min = np.where(np_D >= 0, np.minimum(np_probability_A * (1 - np_probability_B), (1 - np_probability_A) * np_probability_B), np.maximum(-np_probability_A * np_probability_B, -(1 - np_probability_A) * (1 - np_probability_B)))
+        np_D_prime = np_D / np_D_min
         ### calculate R square
-        float_R_square = (float_D**2) / (float_probability_A * float_probability_a * float_probability_B * float_probability_b)
+        np_R_denominator = np_probability_A * np_probability_a * np_probability_B * np_probability_b
+        np_R_square = (np_D**2) / np_R_denominator
+    
+    np_flag_zeroDivision = np_flag_zeroDivision | (np_D_min == 0) | (np_R_denominator == 0)
+    np_D_prime[np_flag_zeroDivision] = 1.0
+    np_R_square[np_flag_zeroDivision] = 1.0
+    
+    return np_D_prime, np_R_square
+
+def EstimateLaggedLDBatch(np_hardcall, float_threshold_DPrime = 0.8, float_threshold_RSquare = 0.8, int_maxLag = 50):
+    """
+
+    To estimate the LD between each variant and its previous variants (up to int_maxLag variants before it) in batches of many pairs. The previous variant is always in the current LD block, so a LD block never extends beyond the run of variants in LD with their previous variant; only the pairs within such a run are estimated.
+
+    Args:
+        np_hardcall (ndarray): 2D array (variants x samples) containing hard calls with `int8` type
+        float_threshold_DPrime (float): The Dprime threshold for discriminating a LD block (default: 0.8)
+        float_threshold_RSquare (float): The RSquare threshold for discriminating a LD block (default: 0.8)
+        int_maxLag (int): The maximum distance (in variants) of the estimated pairs (default: 50)
+
+    Returns:
+        (ndarray): np_flag_notInLD
+
+            2D array (variants x (int_maxLag + 1)) with `bool` type, [i, d] is True if variant i and variant i - d are not in LD; the pairs which are not estimated are False
+    
+    """
+
+    int_num_snp = np_hardcall.shape[0]
+    np_flag_notInLD = np.zeros([int_num_snp, int_maxLag + 1], dtype=bool)
+    np_idx = np.arange(int_num_snp)
+    
+    ### the number of snps loaded at once, so that about 2^24 genotypes are processed in a batch
+    int_chunkSize = max(int_maxLag + 1, 2**24 // max(np_hardcall.shape[1], 1))
+    
+    ### estimate the LD between each snp and its previous snp
+    for idx_start in range(1, int_num_snp, int_chunkSize):
+        idx_end = min(idx_start + int_chunkSize, int_num_snp)
+        np_call = np.array(np_hardcall[idx_start - 1:idx_end, :])
+        np_DPrime, np_RSquare = EstimatePairwiseLDBatch(np_call[:-1, :], np_call[1:, :])
+        np_flag_notInLD[idx_start:idx_end, 1] = (np_DPrime < float_threshold_DPrime) | (np_RSquare < float_threshold_RSquare)
+    
+    ### the first snp of the run which each snp belongs to
+    np_runStart = np.maximum.accumulate(np.where(np_flag_notInLD[:, 1] | (np_idx == 0), np_idx, 0))
+    
+    ### estimate the LD between each snp and the snps before its previous snp in the same run, lag by lag
+    for idx_start in range(0, int_num_snp, int_chunkSize):
+        idx_end = min(idx_start + int_chunkSize, int_num_snp)
+        idx_read = max(idx_start - int_maxLag, 0)
+        np_call = np.array(np_hardcall[idx_read:idx_end, :])
+        for int_lag in range(2, int_maxLag + 1):
+            np_snpIdx = idx_start + np.flatnonzero(np_idx[idx_start:idx_end] - int_lag >= np_runStart[idx_start:idx_end])
+            if np_snpIdx.shape[0] == 0:
+                break
+            np_DPrime, np_RSquare = EstimatePairwiseLDBatch(np_call[np_snpIdx - int_lag - idx_read, :], np_call[np_snpIdx - idx_read, :])
+            np_flag_notInLD[np_snpIdx, int_lag] = (np_DPrime < float_threshold_DPrime) | (np_RSquare < float_threshold_RSquare)
+    
+    return np_flag_notInLD
+
+def EstimateLDBlockInRange(str_inputFileName_genotype, int_idx_start, int_idx_end, float_threshold_DPrime = 0.8, float_threshold_RSquare = 0.8):
+    """
+
+    To estimate the LD blocks of a range of variants (e.g. a chromosome) in the binary genotype store. Each variant is compared with all of the variants in the current LD block, and a new LD block is started if any pair is not in LD.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        int_idx_start (int): The first row of the range in the genotype store
+        int_idx_end (int): The row after the last row of the range in the genotype store
+        float_threshold_DPrime (float): The Dprime threshold for discriminating a LD block (default: 0.8)
+        float_threshold_RSquare (float): The RSquare threshold for discriminating a LD block (default: 0.8)
+
+    Returns:
+        (list): list_LDBlock
+
+            A list of (rsid of representative snp, row of representative snp, rsids in the LD block) tuples in genomic order
+    
+    """
+
+    np_variant, np_hardcall = LoadGenotypeStore(str_inputFileName_genotype)
+    np_rsid = np_variant[int_idx_start:int_idx_end, 1]
+    np_hardcall = np_hardcall[int_idx_start:int_idx_end, :]
+    np_maf = LoadVariantSummary(str_inputFileName_genotype)["maf"][int_idx_start:int_idx_end]
+    
+    ### estimate the LD between nearby snps in batches
+    int_maxLag = 50
+    np_flag_notInLD = EstimateLaggedLDBatch(np_hardcall, float_threshold_DPrime, float_threshold_RSquare, int_maxLag)
+    
+    ### create dictionary for LD block
+    ### key: rsID; value:[minor allele requency, row in genotype store]
+    list_LDBlock = []
+    dict_thisLDBlock = {}
+    idx_blockStart = 0
+    for idx_snp in range(np_rsid.shape[0]):
+        np_thisCall = np.array(np_hardcall[idx_snp, :])
         
-        return float_D_prime, float_R_square
+        ### estimate pairwise LD for all of the snps in dictionary, the pairs within the maximum lag were estimated in batches
+        if idx_snp > idx_blockStart:
+            bool_flag_inLD = not np.any(np_flag_notInLD[idx_snp, 1:min(idx_snp - idx_blockStart, int_maxLag) + 1])
+            if bool_flag_inLD and idx_snp - idx_blockStart > int_maxLag:
+                np_DPrime, np_RSquare = EstimatePairwiseLDBatch(np.array(np_hardcall[idx_blockStart:idx_snp - int_maxLag, :]), np_thisCall)
+                bool_flag_inLD = not np.any((np_DPrime < float_threshold_DPrime) | (np_RSquare < float_threshold_RSquare))
+            
+            ### if this snp not in this LD block, then output and clear the content of dictionary
+            if bool_flag_inLD == False:
+                list_LDBlock.append(GetLDBlockRepresentative(dict_thisLDBlock, int_idx_start))
+                dict_thisLDBlock.clear()
+                idx_blockStart = idx_snp
+        
+        ### add this snp to current dictionary
+        dict_thisLDBlock[np_rsid[idx_snp]] = [float(np_maf[idx_snp]), idx_snp]
+    
+    ### output the final LD block in dictionary
+    if len(dict_thisLDBlock) > 0:
+        list_LDBlock.append(GetLDBlockRepresentative(dict_thisLDBlock, int_idx_start))
+    
+    return list_LDBlock
+
+def GetLDBlockRepresentative(dict_thisLDBlock, int_idx_start = 0):
+    """
+
+    To find a snp with maximum minor allele frequency to be representative snp of a LD block.
+
+    Args:
+        dict_thisLDBlock (dict): The LD block, key: rsID; value:[minor allele requency, row]
+        int_idx_start (int): The offset added to the rows (default: 0)
+
+    Returns:
+        (tuple): (rsid of representative snp, row of representative snp, rsids in the LD block)
+    
+    """
+
+    str_representative_rsid = list(dict_thisLDBlock.keys())[0]
+    for key in dict_thisLDBlock.keys():
+        if dict_thisLDBlock[key][0] > dict_thisLDBlock[str_representative_rsid][0]:
+            str_representative_rsid = key
     
-    except ZeroDivisionError:
-        return 1.0, 1.0
+    return str_representative_rsid, int_idx_start + dict_thisLDBlock[str_representative_rsid][1], list(dict_thisLDBlock.keys())
 
 """"""""""""""""""""""""""""""
 # main function
 """"""""""""""""""""""""""""""
-def EstimateLDBlock(str_inputFileName_genotype, str_outputFilePath = "", float_threshold_DPrime = 0.8, float_threshold_RSquare = 0.8):
+def EstimateLDBlock(str_inputFileName_genotype, str_outputFilePath = "", float_threshold_DPrime = 0.8, float_threshold_RSquare = 0.8, int_nJobs = 1):
     """
 
-    A function for implementing linkage disequilibrium (LD) dimension reduction. In genotype data, a variant often exhibits high dependency with its nearby variants because of LD. In the practical implantation, we prefer to group these dependent features to reduce the dimension of features. In other words, we can take the advantages of LD to reduce the dimensionality of genetic features. In this regard, this function adopted the same approach developed by Lewontin (1964) to estimate LD. We used D’ and r2 as the criteria to group highly dependent genetic features as blocks. In each block, we chose the features with the largest minor allele frequency to represent other features in the same block.
+    A function for implementing linkage disequilibrium (LD) dimension reduction. In genotype data, a variant often exhibits high dependency with its nearby variants because of LD. In the practical implantation, we prefer to group these dependent features to reduce the dimension of features. In other words, we can take the advantages of LD to reduce the dimensionality of genetic features. In this regard, this function adopted the same approach developed by Lewontin (1964) to estimate LD. We used D’ and r2 as the criteria to group highly dependent genetic features as blocks. In each block, we chose the features with the largest minor allele frequency to represent other features in the same block. LD blocks never cross chromosome boundaries, so the chromosomes are estimated in parallel and the output is identical for any number of processes.
 
     Args:
         str_inputFileName_genotype (str): File name of input genotype data
         str_outputFilePath (str): File path of output file
         float_threshold_DPrime (float): The Dprime threshold for discriminating a LD block (default: 0.8)
         float_threshold_RSquare (float): The RSquare threshold for discriminating a LD block (default: 0.8)
+        int_nJobs (int): The number of processes (default: 1)
 
     Returns:
         - Expected Success Response::
@@ -147,66 +399,46 @@ def EstimateLDBlock(str_inputFileName_genotype, str_outputFilePath = "", float_t
     if str_outputFilePath == "":
         str_outputFilePath = os.path.dirname(str_inputFileName_genotype)
     
-    ### get the number of snp
-    int_num_snp = sum(1 for line in open(str_inputFileName_genotype))
-    
-    ### read .gen file and estimate the LD block
-    list_outputLDBlock = []
-    with open(str_inputFileName_genotype, "r") as file_inputFile:
-        with open(os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).replace(".gen", "_LDReduced.gen")), "w") as file_outputFile:
-            ### create dictionary for LD block
-            ### key: rsID; value:[minor allele requency, raw genotypes data]
-            dict_thisLDBlock = {}
-            ### put first snp into dictionary
-            line_previousSnp = file_inputFile.readline()
-            list_previousSnp = line_previousSnp.strip().split(" ")
-            dict_thisLDBlock[list_previousSnp[1]] = [min(EstimateAlleleFrequency(line_previousSnp)), line_previousSnp]
-            
-            ### scan all other snps
-            int_count_snp = 1
-            for line in file_inputFile:
-                list_thisSnp = line.strip().split(" ")
-                
-                ### estimate pairwise LD for all of the snps in dictionary
-                bool_flag_inLD = True
-                for key in dict_thisLDBlock.keys():
-                    float_DPrime, float_RSquare = EstimatePairwiseLD(dict_thisLDBlock[key][1], line)
-                    if float_DPrime < float_threshold_DPrime or float_RSquare < float_threshold_RSquare:
-                        bool_flag_inLD = False
-                        break
-                
-                ### if this snp not in this LD block, then output and clear the content of dictionary
-                if bool_flag_inLD == False:
-                    ### find a snp with maximum minor allele frequency to be representative snp
-                    str_representative_rsid = list(dict_thisLDBlock.keys())[0]
-                    for key in dict_thisLDBlock.keys():
-                        if dict_thisLDBlock[key][0] > dict_thisLDBlock[str_representative_rsid][0]:
-                            str_representative_rsid = key
-                    list_outputLDBlock.append(str_representative_rsid + ":" + ",".join(dict_thisLDBlock.keys()))
-                    file_outputFile.writelines(dict_thisLDBlock[str_representative_rsid][1])
-                    dict_thisLDBlock.clear()
-                ### add this snp to current dictionary
-                dict_thisLDBlock[list_thisSnp[1]] = [min(EstimateAlleleFrequency(line)), line]
-                
-                ### show progress
-                int_count_snp = int_count_snp + 1
-                str_print = "step2: Processing: " + "{0:.2f}".format(float(int_count_snp) / int_num_snp * 100) + "%"
-                sys.stdout.write('%s\r' % str_print)
-                sys.stdout.flush()
-            
-            ### output the final LD block in dictionary
-            ### find a snp with maximum minor allele frequency to be representative snp
-            str_representative_rsid = list(dict_thisLDBlock.keys())[0]
-            for key in dict_thisLDBlock.keys():
-                if dict_thisLDBlock[key][0] > dict_thisLDBlock[str_representative_rsid][0]:
-                    str_representative_rsid = key
-            list_outputLDBlock.append(str_representative_rsid + ":" + ",".join(dict_thisLDBlock.keys()))
-            file_outputFile.writelines(dict_thisLDBlock[str_representative_rsid][1])
+    ### convert genotype data into binary genotype store (skipped if it is up to date)
+    ConvertGenToStore(str_inputFileName_genotype, int_nJobs=int_nJobs)
+    np_variant, np_hardcall = LoadGenotypeStore(str_inputFileName_genotype)
+    int_num_snp = np_variant.shape[0]
+    
+    ### summarize allele frequency of all snps once (skipped if it is up to date)
+    LoadVariantSummary(str_inputFileName_genotype)
+    
+    ### partition the snps by chromosome (consecutive rows with the same chromosome)
+    np_chromosomeStart = np.concatenate([[0], np.flatnonzero(np_variant[1:, 0] != np_variant[:-1, 0]) + 1])
+    np_chromosomeEnd = np.concatenate([np_chromosomeStart[1:], [int_num_snp]])
+    list_args = [(str_inputFileName_genotype, int(idx_start), int(idx_end), float_threshold_DPrime, float_threshold_RSquare) for idx_start, idx_end in zip(np_chromosomeStart, np_chromosomeEnd)]
+    
+    ### estimate the LD block of each chromosome
+    if int_nJobs > 1 and len(list_args) > 1:
+        mp_pool = mp.Pool(min(int_nJobs, len(list_args)))
+        list_LDBlock_chromosome = mp_pool.starmap(EstimateLDBlockInRange, list_args)
+        mp_pool.close()
+    else:
+        list_LDBlock_chromosome = []
+        for args in list_args:
+            list_LDBlock_chromosome.append(EstimateLDBlockInRange(*args))
+            ### show progress
+            str_print = "step2: Processing: " + "{0:.2f}".format(float(args[2]) / int_num_snp * 100) + "%"
+            sys.stdout.write('%s\r' % str_print)
+            sys.stdout.flush()
+    list_LDBlock = [item for list_thisLDBlock in list_LDBlock_chromosome for item in list_thisLDBlock]
+    
+    ### output the representative snps of the LD blocks in genomic order
+    set_representativeRow = set([item[1] for item in list_LDBlock])
+    with open(os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_LDReduced.gen")), "w") as file_outputFile:
+        idx_snp = 0
+        for list_line, float_progress in IterGenBlock(str_inputFileName_genotype):
+            file_outputFile.writelines([line for idx_line, line in enumerate(list_line, idx_snp) if idx_line in set_representativeRow])
+            idx_snp = idx_snp + len(list_line)
     
     ### output the file of LD block
     ### output file format: rsid_representative: rsid_1,rsid_2,rsid_3,...(the snps in the same LD block)
-    with open(os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).replace(".gen", ".LDBlock")), "w") as file_outputFile:
-        for item in list_outputLDBlock:
-            file_outputFile.writelines(item + "\n")
+    with open(os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", ".LDBlock")), "w") as file_outputFile:
+        for item in list_LDBlock:
+            file_outputFile.writelines(item[0] + ":" + ",".join(item[2]) + "\n")
     
     print("step2: Estimate LD. DONE! \t\t\t\t")
\ No newline at end of file
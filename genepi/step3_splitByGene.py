@@ -11,56 +11,79 @@ Created on Feb 2018
 import os
 import numpy as np
 
+from genepi.tools.genotypeStore import ConvertGenToStore
+from genepi.tools.genotypeStore import LoadGenotypeStore
+from genepi.tools.genotypeStore import WriteGeneIndex
+from genepi.tools.geneAnnotationIndex import LoadAnnotationIndex
+from genepi.tools.geneAnnotationIndex import QueryGenesByPositions
+from genepi.tools.genReader import OpenGenFile
+from genepi.tools.genReader import IterGenBlock
+
 """"""""""""""""""""""""""""""
 # main function
 """"""""""""""""""""""""""""""
-def SplitMegaGene(list_snpsOnGene, int_window, int_step, str_outputFilePath, str_outputFileName):
+def SplitMegaGene(list_snpsOnGene, int_window, int_step, str_outputFilePath, str_outputFileName, int_idx_start = 0, bool_writeGen = True):
     """
 
     In order to extract genetic features for a gene, this function used the start and end positions of each gene from the local UCSC database to split the genetic features. Then, generate the .GEN files for each gene in the folder named snpSubsets.
 
     Args:
-        list_snpsOnGene (list): A list contains SNPs on a gene
+        list_snpsOnGene (list): A list contains SNPs (lines of .gen file) on a gene, only its length is used if bool_writeGen is False
         int_window (int): The size of the sliding window
         int_step (int): The step of the sliding window
         str_outputFilePath (str): File path of output file
         str_outputFileName (str): File name of output file
+        int_idx_start (int): Row of the first SNP on this gene in the genotype data (default: 0)
+        bool_writeGen (bool): Write the .GEN file of each gene subset, otherwise the subsets are only recorded as row ranges (default: True)
 
     Returns:
-        None
+        (list): list_geneIndex
+
+            A list of (file name of gene subset, start row, end row) tuples of the gene subsets
     
     """
     
+    list_geneIndex = []
+    
     ### write to gen file if this gene is not mega gene
     int_total_window = int((len(list_snpsOnGene)-int_window)/int_step)
     if int_total_window <= 0:
-        with open(os.path.join(str_outputFilePath, str_outputFileName + ".gen"), "w") as file_outputFile:
-            for item in list_snpsOnGene:
-                file_outputFile.writelines(item)
+        if bool_writeGen:
+            with open(os.path.join(str_outputFilePath, str_outputFileName + ".gen"), "w") as file_outputFile:
+                for item in list_snpsOnGene:
+                    file_outputFile.writelines(item)
+        list_geneIndex.append((str_outputFileName + ".gen", int_idx_start, int_idx_start + len(list_snpsOnGene)))
 
     ### write gen file of each window on current gene (output file name: geneSymbol_numOfSNPOnGene@windowNum.gen)
     else: 
         for idx_w in range(int_total_window):
-            with open(os.path.join(str_outputFilePath, str_outputFileName.split("_")[0] + "@" + str(idx_w) + "_" + str_outputFileName.split("_")[1] + ".gen"), "w") as file_outputFile:
-                for item in list_snpsOnGene[int_step*idx_w:int_step*idx_w+int_window]:
-                    file_outputFile.writelines(item)
+            str_windowFileName = str_outputFileName.split("_")[0] + "@" + str(idx_w) + "_" + str_outputFileName.split("_")[1] + ".gen"
+            if bool_writeGen:
+                with open(os.path.join(str_outputFilePath, str_windowFileName), "w") as file_outputFile:
+                    for item in list_snpsOnGene[int_step*idx_w:int_step*idx_w+int_window]:
+                        file_outputFile.writelines(item)
+            list_geneIndex.append((str_windowFileName, int_idx_start + int_step*idx_w, int_idx_start + min(int_step*idx_w+int_window, len(list_snpsOnGene))))
         
         ### write reminder SNPs to gen file
-        with open(os.path.join(str_outputFilePath, str_outputFileName.split("_")[0] + "@" + str(int_total_window) + "_" + str_outputFileName.split("_")[1] + ".gen"), "w") as file_outputFile:
-            for item in list_snpsOnGene[int_step*int_total_window:]:
-                file_outputFile.writelines(item)
+        str_windowFileName = str_outputFileName.split("_")[0] + "@" + str(int_total_window) + "_" + str_outputFileName.split("_")[1] + ".gen"
+        if bool_writeGen:
+            with open(os.path.join(str_outputFilePath, str_windowFileName), "w") as file_outputFile:
+                for item in list_snpsOnGene[int_step*int_total_window:]:
+                    file_outputFile.writelines(item)
+        list_geneIndex.append((str_windowFileName, int_idx_start + int_step*int_total_window, int_idx_start + len(list_snpsOnGene)))
     
-    return
+    return list_geneIndex
 
-def SplitByGene(str_inputFileName_genotype, str_inputFileName_UCSCDB = os.path.dirname(os.path.abspath(__file__)) + "/UCSCGenomeDatabase.txt", str_outputFilePath = ""):
+def SplitByGene(str_inputFileName_genotype, str_inputFileName_UCSCDB = os.path.dirname(os.path.abspath(__file__)) + "/UCSCGenomeDatabase.txt", str_outputFilePath = "", bool_writeGen = False):
     """
 
-    In order to extract genetic features for a gene, this function used the start and end positions of each gene from the local UCSC database to split the genetic features. Then, generate the .GEN files for each gene in the folder named snpSubsets.
+    In order to extract genetic features for a gene, this function used the start and end positions of each gene from the local UCSC database to split the genetic features. The subset of each gene is recorded as a range of rows in the binary genotype store (GeneIndex.csv in the folder named snpSubsets), so no genotype data is copied. Genes are looked up in a serialized interval index of the genome regions, so a SNP on overlapping genes is assigned to each of them. The .GEN files for each gene are only generated if bool_writeGen is True.
 
     Args:
         str_inputFileName_genotype (str): File name of input genotype data
         str_inputFileName_UCSCDB (str): File name of input genome regions
         str_outputFilePath (str): File path of output file
+        bool_writeGen (bool): Also generate the .GEN file of each gene subset (default: False)
 
     Returns:
         - Expected Success Response::
@@ -84,75 +107,43 @@ def SplitByGene(str_inputFileName_genotype, str_inputFileName_UCSCDB = os.path.d
     if not os.path.exists(str_outputFilePath):
         os.makedirs(str_outputFilePath)
     
-    ### load UCSC Genome Database
-    list_UCSCGenomeDatabase = []
-    with open(str_inputFileName_UCSCDB, "r") as file_inputFile:
-        for line in file_inputFile:
-            list_UCSCGenomeDatabase.append(line.strip().split(","))
-    np_UCSCGenomeDatabase = np.array(list_UCSCGenomeDatabase)
+    ### load interval index of UCSC Genome Database
+    dict_UCSCGenomeDatabase = LoadAnnotationIndex(str_inputFileName_UCSCDB)
     
-    ### scan all snp
-    with open(str_inputFileName_genotype, "r") as file_inputFile:
-        idx_gene = 0
-        list_snpsOnGene = []
-        for line in file_inputFile:
-            ### get information of each snp
-            list_thisSnp = line.strip().split(" ")
-            int_chromosome = int(list_thisSnp[0])
-            int_position = int(list_thisSnp[2])
-
-            ### current gene is in next chromosome
-            if int_chromosome < int(np_UCSCGenomeDatabase[idx_gene, 0]):
-                continue
-            ### current snp of genotype data is in next chromosome
-            elif int_chromosome > int(np_UCSCGenomeDatabase[idx_gene, 0]):
-                if len(list_snpsOnGene) != 0:
-                    #### write gen file of current gene (output file name: geneSymbol_numOfSNPOnGene.gen)
-                    #str_outputFileName = str(np_UCSCGenomeDatabase[idx_gene, 4]) + "_" + str(len(list_snpsOnGene)) + ".gen"
-                    #with open(os.path.join(str_outputFilePath, str_outputFileName), "w") as file_outputFile:
-                    #    for item in list_snpsOnGene:
-                    #        file_outputFile.writelines(item)
-                    str_outputFileName = str(np_UCSCGenomeDatabase[idx_gene, 4]) + "_" + str(len(list_snpsOnGene))
-                    SplitMegaGene(list_snpsOnGene, int_window, int_step, str_outputFilePath, str_outputFileName)
-                list_snpsOnGene = []
-                while int_chromosome > int(np_UCSCGenomeDatabase[idx_gene, 0]):
-                    ### jump to next gene
-                    idx_gene = idx_gene + 1
-                    ### if no next gene then break
-                    if idx_gene == np_UCSCGenomeDatabase.shape[0]:
-                        break
-                    ### current snp on next gene
-                    if int(np_UCSCGenomeDatabase[idx_gene, 1]) <= int_position and int_position <= int(np_UCSCGenomeDatabase[idx_gene, 2]) and int_chromosome == int(np_UCSCGenomeDatabase[idx_gene, 0]):
-                        list_snpsOnGene.append(line)
+    ### convert genotype data into binary genotype store (skipped if it is up to date), only its variant index is scanned
+    ConvertGenToStore(str_inputFileName_genotype)
+    np_variant, np_hardcall = LoadGenotypeStore(str_inputFileName_genotype)
+    np_chromosome = np_variant[:, 0].astype(np.int64)
+    np_position = np_variant[:, 2].astype(np.int64)
+    
+    ### lines of .gen file are only read if the .GEN files of gene subsets are requested, record the (decompressed) offset of each line for seeking
+    if bool_writeGen:
+        np_offset = np.cumsum([0] + [len(line) for list_line, float_progress in IterGenBlock(str_inputFileName_genotype, bool_decode=False) for line in list_line])
+        file_inputFile, file_rawFile = OpenGenFile(str_inputFileName_genotype)
     
-            ### chromosome numbers of current snp and gene are match
+    ### query the genes of all snps on each chromosome at once, a snp on overlapping genes is assigned to each of them
+    list_geneIndex = []
+    np_chromosome_unique = np_chromosome[np.sort(np.unique(np_chromosome, return_index=True)[1])]
+    for int_chromosome in np_chromosome_unique:
+        np_snpIdx = np.flatnonzero(np_chromosome == int_chromosome)
+        np_geneIdx, np_snpStart, np_snpEnd = QueryGenesByPositions(dict_UCSCGenomeDatabase, int_chromosome, np_position[np_snpIdx])
+        for idx_gene, idx_snpStart, idx_snpEnd in zip(np_geneIdx, np_snpStart, np_snpEnd):
+            int_idx_start = int(np_snpIdx[idx_snpStart])
+            int_idx_end = int(np_snpIdx[idx_snpEnd - 1]) + 1
+            if bool_writeGen:
+                file_inputFile.seek(np_offset[int_idx_start])
+                list_snpsOnGene = file_inputFile.read(np_offset[int_idx_end] - np_offset[int_idx_start]).decode().splitlines(True)
             else:
-                ### current snp on current gene
-                if int(np_UCSCGenomeDatabase[idx_gene, 1]) <= int_position and int_position <= int(np_UCSCGenomeDatabase[idx_gene, 2]):
-                    list_snpsOnGene.append(line)
-                ### snp position exceed this gene
-                elif int_position > int(np_UCSCGenomeDatabase[idx_gene, 2]):
-                    if len(list_snpsOnGene) != 0:
-                        #### write gen file of current gene (output file name: geneSymbol_numOfSNPOnGene.gen)
-                        #str_outputFileName = str(np_UCSCGenomeDatabase[idx_gene, 4]) + "_" + str(len(list_snpsOnGene)) + ".gen"
-                        #with open(os.path.join(str_outputFilePath, str_outputFileName), "w") as file_outputFile:
-                        #    for item in list_snpsOnGene:
-                        #        file_outputFile.writelines(item)
-                        str_outputFileName = str(np_UCSCGenomeDatabase[idx_gene, 4]) + "_" + str(len(list_snpsOnGene))
-                        SplitMegaGene(list_snpsOnGene, int_window, int_step, str_outputFilePath, str_outputFileName)
-                    list_snpsOnGene = []
-                    while int_position > int(np_UCSCGenomeDatabase[idx_gene, 2]) and int_chromosome == int(np_UCSCGenomeDatabase[idx_gene, 0]):
-                        ### jump to next gene
-                        idx_gene = idx_gene + 1
-                        ### if no next gene then break
-                        if idx_gene == np_UCSCGenomeDatabase.shape[0]:
-                            break
-                        ### snp on next gene
-                        if int(np_UCSCGenomeDatabase[idx_gene, 1]) <= int_position and int_position <= int(np_UCSCGenomeDatabase[idx_gene, 2]) and int_chromosome == int(np_UCSCGenomeDatabase[idx_gene, 0]):
-                            list_snpsOnGene.append(line)
-
-            ### if the index of gene out of the boundary of DB then break
-            if idx_gene >= np_UCSCGenomeDatabase.shape[0]:
-                break
+                list_snpsOnGene = range(int_idx_start, int_idx_end)
+            ### output file name: geneSymbol_numOfSNPOnGene
+            str_outputFileName = str(dict_UCSCGenomeDatabase["symbol"][idx_gene]) + "_" + str(idx_snpEnd - idx_snpStart)
+            list_geneIndex.extend(SplitMegaGene(list_snpsOnGene, int_window, int_step, str_outputFilePath, str_outputFileName, int_idx_start, bool_writeGen))
+    
+    if bool_writeGen:
+        file_inputFile.close()
+        file_rawFile.close()
+    
+    ### write gene index (rows of each gene subset in the genotype store) for step4
+    WriteGeneIndex(os.path.join(str_outputFilePath, "GeneIndex.csv"), str_inputFileName_genotype, list_geneIndex)
     
     print("step3: Split by gene. DONE!")
@@ -17,22 +17,54 @@ os.environ["PYTHONWARNINGS"] = "ignore"
 
 import os
 import sys
-import itertools
 import numpy as np
 np.seterr(divide='ignore', invalid='ignore')
 from sklearn.feature_selection import VarianceThreshold
 from sklearn.feature_selection import chi2
 from scipy.sparse import coo_matrix
 from sklearn.utils import shuffle
-from sklearn import linear_model
 from sklearn.model_selection import KFold
-from sklearn.model_selection import GridSearchCV
 from sklearn.metrics import confusion_matrix
 import sklearn.metrics as skMetric
-import scipy.stats as stats
 import multiprocessing as mp
 
-from genepi.tools import randomized_l1
+from genepi.tools.stabilitySelection import StabilitySelectionLogistic
+from genepi.tools.genotypeStore import DecodeGenOneHot
+from genepi.tools.genotypeStore import HardCallToOneHot
+from genepi.tools.genotypeStore import ConvertGenToStore
+from genepi.tools.genotypeStore import InitGenotypeStoreWorker
+from genepi.tools.genotypeStore import GetGenotypeStoreWorkerData
+from genepi.tools.genotypeStore import LoadGeneIndex
+from genepi.tools.genReader import IterGenBlock
+from genepi.tools.variantSummary import LoadVariantSummary
+from genepi.tools.variantSummary import HashFile
+from genepi.tools.variantSummary import GetOneHotVariance
+from genepi.tools.interactionScreening import ScreenPairwiseInteraction
+from genepi.tools.interactionScreening import ScreenPairwiseInteractionParallel
+from genepi.tools.interactionScreening import LimitInteractionByMemory
+from genepi.tools.interactionScreening import MaterializeInteraction
+from genepi.tools.regularizationPath import SearchLogisticRegressionL1
+from genepi.tools.geneScheduler import EstimateGeneCost
+from genepi.tools.geneScheduler import GetGeneSnpCount
+from genepi.tools.geneScheduler import ImapLongestJobFirst
+from genepi.tools.memoryBudget import PlanGeneMemory
+from genepi.tools.bitPacked import IsBitPacked
+from genepi.tools.bitPacked import PackBits
+from genepi.tools.bitPacked import UnpackBits
+from genepi.tools.bitPacked import GetVariance
+from genepi.tools.bitPacked import GetChi2
+from genepi.tools.contingencyTable import GenerateContingencyTableBatch
+from genepi.tools.contingencyTable import GetFeatureStatistics
+from genepi.tools.geneJournal import GetGeneJournalFileName
+from genepi.tools.geneJournal import GetGeneInputHash
+from genepi.tools.geneJournal import LoadGeneJournal
+from genepi.tools.geneJournal import IsGeneFinished
+from genepi.tools.geneJournal import OpenGeneJournal
+from genepi.tools.geneJournal import AppendGeneJournal
+from genepi.tools.geneJournal import GetGeneOutputFileName
+from genepi.tools.featureContainer import WriteFeatureShard
+from genepi.tools.featureContainer import OpenFeatureContainer
+from genepi.tools.featureContainer import AppendFeatureShard
 
 """"""""""""""""""""""""""""""
 # define functions 
@@ -43,7 +75,7 @@ def RandomizedLogisticRegression(np_X, np_y):
     Implementation of the stability selection.
 
     Args:
-        np_X (ndarray): 2D array containing genotype data with `int8` type
+        np_X (ndarray): 2D array containing genotype data with `int8` type, or bit-packed data by PackBits
         np_y (ndarray): 2D array containing phenotype data with `float` type
 
     Returns:
@@ -53,14 +85,8 @@ def RandomizedLogisticRegression(np_X, np_y):
     
     """
 
-    X = np_X
-    y = np_y
-    X_sparse = coo_matrix(X)
-    X, X_sparse, y = shuffle(X, X_sparse, y, random_state=0)
-    estimator = randomized_l1.RandomizedLogisticRegression(n_jobs=1, n_resampling=100)
-    estimator.fit(X, y)
-    
-    return estimator.scores_
+    ### sparse resampling with shared subsample masks and early stopping (replaces randomized_l1.RandomizedLogisticRegression)
+    return StabilitySelectionLogistic(np_X, np_y, int_nResampling=100)
 
 def LogisticRegressionL1CV(np_X, np_y, int_kOfKFold = 2, int_nJobs = 1):
     """
@@ -91,15 +117,11 @@ def LogisticRegressionL1CV(np_X, np_y, int_kOfKFold = 2, int_nJobs = 1):
     list_predict_proba = []
     list_weight = []
     for idxTr, idxTe in kf.split(X):
-        cost = [2**x for x in range(-8, 8)]
-        parameters = [{'C':cost, 'penalty':['l1'], 'dual':[False], 'class_weight':['balanced']}]
-        kf_estimator = KFold(n_splits=2)
-        estimator_logistic = linear_model.LogisticRegression(max_iter=100, solver='liblinear')
-        estimator_grid = GridSearchCV(estimator_logistic, parameters, scoring='f1', n_jobs=1, cv=kf_estimator)
-        estimator_grid.fit(X[idxTr], y[idxTr])
-        list_label = estimator_grid.best_estimator_.predict(X[idxTe])
-        list_prob = estimator_grid.best_estimator_.predict_proba(X[idxTe])
-        list_weight.append([float(item) for item in estimator_grid.best_estimator_.coef_[0]])
+        ### search C along the grid with early stopping
+        estimator_best = SearchLogisticRegressionL1(X[idxTr], y[idxTr])
+        list_label = estimator_best.predict(X[idxTe])
+        list_prob = estimator_best.predict_proba(X[idxTe])
+        list_weight.append([float(item) for item in estimator_best.coef_[0]])
         for idx_y, idx_label, idx_prob in zip(list(y[idxTe]), list_label, list_prob):
             list_target.append(float(idx_y))
             list_predict.append(idx_label)
@@ -111,68 +133,37 @@ def LogisticRegressionL1CV(np_X, np_y, int_kOfKFold = 2, int_nJobs = 1):
     
     return float_f1Score, np_weight, dict_y
 
-def FeatureEncoderLogistic(np_genotype_rsid, np_genotype, np_phenotype, int_dim):
+def FeatureEncoderLogistic(np_genotype_rsid, np_genotype, np_phenotype, int_dim, int_memoryLimit = 2**30, bool_lowMemory = False, int_nJobs = 1):
     """
 
-    Implementation of the two-element combinatorial encoding.
+    Implementation of the two-element combinatorial encoding. Bit-packed genotype data (PackBits) gives bit-packed encoded features, one bit per sample and feature.
 
     Args:
         np_genotype_rsid (ndarray): 1D array containing rsid of genotype data with `str` type
-        np_genotype (ndarray): 2D array containing genotype data with `int8` type
+        np_genotype (ndarray): 2D array containing genotype data with `int8` type, or bit-packed data by PackBits
         np_phenotype (ndarray): 2D array containing phenotype data with `float` type
         int_dim (int): The dimension of a variant (default: 3. AA, AB and BB)
+        int_memoryLimit (int): The memory limit of the encoded features in bytes as they are stored (bit-packed or `int8`), the most significant interaction terms which fit are kept if exceeded (default: 2**30. 0: no limit)
+        bool_lowMemory (bool): Stream the pairwise screening in small tiles, for the genes exceeding the memory budget of a worker (default: False)
+        int_nJobs (int): The number of processes screening the tiles of SNP pairs, for the many features of the cross-gene stage (default: 1)
 
     Returns:
         (tuple): tuple containing:
 
-            - list_interaction_rsid (ndarray): 1D array containing rsid of genotype data with `str` type
-            - np_interaction (ndarray): 2D array containing genotype data with `int8` type
+            - np_interaction_rsid (ndarray): 1D array containing rsid of genotype data with `str` type
+            - np_interaction (ndarray): 2D array containing genotype data with `int8` type (bit-packed if np_genotype is)
     
     """
 
-    ### combinatorial encoding
-    np_interaction = np_genotype
-    list_interaction_rsid = list(np_genotype_rsid)    
-
-    list_combs = list(itertools.combinations(range(int(np_interaction.shape[1]/int_dim)), 2))
-    for idx_combs in range(len(list_combs)):
-        try:
-            ### generate interaction terms
-            tuple_comb = list_combs[idx_combs]
-            np_this_interaction = np.zeros([np_phenotype.shape[0], int_dim**2], dtype='int8')
-            list_this_interaction_id = []
-            for idx_x in range(int_dim):
-                for idx_y in range(int_dim):
-                    np_this_interaction_term = (np_genotype[:, tuple_comb[0] * int_dim + idx_x] * np_genotype[:, tuple_comb[1] * int_dim + idx_y]).astype(np.int8)
-                    if not(np.array_equal(np_this_interaction_term, np_genotype[:, tuple_comb[0] * int_dim + idx_x])) and not(np.array_equal(np_this_interaction_term, np_genotype[:, tuple_comb[1] * int_dim + idx_y])):
-                        np_this_interaction[:, idx_x * int_dim + idx_y] = np_this_interaction_term
-                    list_this_interaction_id.append(np_genotype_rsid[tuple_comb[0] * int_dim + idx_x] + "*" + np_genotype_rsid[tuple_comb[1] * int_dim + idx_y])
-            
-            ### variance check (detect variance < 0.05)
-            sk_variance = VarianceThreshold(threshold=(.95 * (1 - .95)))
-            np_this_interaction = sk_variance.fit_transform(np_this_interaction)
-            np_this_interaction_id = np.array(list_this_interaction_id)
-            np_this_interaction_id = np.array(np_this_interaction_id[sk_variance.get_support()])
-            
-            ### chi-square test selection
-            np_chi2 = -np.log10(chi2(np_this_interaction.astype(int), np_phenotype[:, -1].astype(int))[1])
-            np_selectedIdx = np.array([x > 2 for x in np_chi2])
-            np_this_interaction = np_this_interaction[:, np_selectedIdx]
-            np_this_interaction_id = np_this_interaction_id[np_selectedIdx]
-        
-            ### append insteraction terms
-            int_num_interaction = np_this_interaction.shape[1]
-            if int_num_interaction == 0:
-                continue
-            np_interaction_append = np.empty((np_interaction.shape[0], np_interaction.shape[1] + int_num_interaction), dtype='int')
-            np_interaction_append[:,:-(int_num_interaction)] = np_interaction
-            np_interaction_append[:,-(int_num_interaction):] = np_this_interaction
-            np_interaction = np_interaction_append
-            list_interaction_rsid.extend(list(np_this_interaction_id))
-        except:
-            pass
+    ### combinatorial encoding, pairwise interaction terms are screened in batches and only the selected ones are built
+    if int_nJobs > 1 and not bool_lowMemory:
+        np_selected, np_score = ScreenPairwiseInteractionParallel(np_genotype, np_phenotype, int_dim, str_test="chi2", int_nJobs=int_nJobs)
+    else:
+        np_selected, np_score = ScreenPairwiseInteraction(np_genotype, np_phenotype, int_dim, str_test="chi2", int_blockSize=8 if bool_lowMemory else 64, bool_streaming=bool_lowMemory)
+    np_selected = LimitInteractionByMemory(np_selected, np_score, np_genotype, int_memoryLimit)
+    np_interaction_rsid, np_interaction = MaterializeInteraction(np_genotype_rsid, np_genotype, np_selected)
 
-    return np.array(list_interaction_rsid), np_interaction
+    return np_interaction_rsid, np_interaction
 
 def GenerateContingencyTable(np_genotype, np_phenotype):
     """
@@ -180,8 +171,8 @@ def GenerateContingencyTable(np_genotype, np_phenotype):
     Generating the contingency table for chi-square test.
 
     Args:
-        np_X (ndarray): 2D array containing genotype data with `int8` type
-        np_y (ndarray): 2D array containing phenotype data with `float` type
+        np_X (ndarray): 1D array containing genotype data of a feature with `int8` type, or bit-packed data of a feature by PackBits
+        np_y (ndarray): 1D array containing phenotype data with `float` type
 
     Returns:
         (ndarray): np_contingency 
@@ -190,13 +181,11 @@ def GenerateContingencyTable(np_genotype, np_phenotype):
     
     """
 
-    np_contingency = np.array([[0, 0], [0, 0]])
-    for idx_subject in range(0, np_genotype.shape[0]):
-        np_contingency[int(np_genotype[idx_subject]), int(np_phenotype[idx_subject])] = np_contingency[int(np_genotype[idx_subject]), int(np_phenotype[idx_subject])] + 1
-    np_contingency = np.rot90(np_contingency)
-    np_contingency = np.rot90(np_contingency)
+    ### the table of a single feature by the batched tables, [[feature & case, feature & control], [no feature & case, no feature & control]]
+    if not IsBitPacked(np_genotype):
+        np_genotype = np.asarray(np_genotype).reshape(-1, 1)
     
-    return np_contingency
+    return GenerateContingencyTableBatch(np_genotype, np_phenotype)[0]
 
 def FilterInLoading(np_genotype, np_phenotype):
     """
@@ -204,16 +193,24 @@ def FilterInLoading(np_genotype, np_phenotype):
     This function is for filtering low quality varaint. Before modeling each subset of genotype features, two criteria were adopted to exclude low quality data. The first criterion is that the genotype frequency of a feature should exceed 5%, where the genotype frequency means the proportion of genotype among the total samples in the dataset. The second criterion is regarding the association between the feature and the phenotype. We used χ2 test to estimate the association between the feature and the phenotype, and the p-value should be smaller than 0.01.
 
     Args:
-        np_genotype (ndarray): 2D array containing genotype data with `int8` type
+        np_genotype (ndarray): 2D array containing genotype data with `int8` type, or bit-packed data by PackBits
         np_phenotype (ndarray): 2D array containing phenotype data with `float` type
 
     Returns:
-        (ndarray): np_genotype
-        
-            2D array containing genotype data with `int8` type
+        (int): The number of features passing the criteria
     
     """
 
+    ### bit-packed features are tested by popcount, a feature on a threshold within floating point error is tested again on the unpacked data
+    if IsBitPacked(np_genotype):
+        float_threshold_variance = .95 * (1 - .95)
+        np_variance = GetVariance(np_genotype)
+        with np.errstate(divide="ignore"):
+            np_chi2 = -np.log10(GetChi2(np_genotype, np_phenotype[:, -1].astype(int))[1])
+        if np.any(np.abs(np_variance - float_threshold_variance) <= 1e-9 * float_threshold_variance) or np.any((np_variance > float_threshold_variance) & (np.abs(np_chi2 - 2) <= 1e-6)):
+            return FilterInLoading(UnpackBits(np_genotype), np_phenotype)
+        return int(np.sum((np_variance > float_threshold_variance) & (np_chi2 > 2)))
+
     try:
         ### variance check (detect variance < 0.05)
         sk_variance = VarianceThreshold(threshold=(.95 * (1 - .95)))
@@ -232,7 +229,7 @@ def FilterInLoading(np_genotype, np_phenotype):
 """"""""""""""""""""""""""""""
 # main function
 """"""""""""""""""""""""""""""
-def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath = "", int_kOfKFold = 2, int_nJobs = 1):      
+def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath = "", int_kOfKFold = 2, int_nJobs = 1, np_phenotype = None, np_hardcall = None, np_variant = None, np_variantCount = None, int_memoryLimit = 2**30, bool_lowMemory = False):      
     """
 
     A workflow to model a single gene containing two-element combinatorial encoding, stability selection, filtering low quality varaint and  L1-regularized Logistic regression with k-fold cross validation.
@@ -243,6 +240,12 @@ def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_ph
         str_outputFilePath (str): File path of output file
         int_kOfKFold (int): The k for k-fold cross validation (default: 2)
         int_nJobs (int): The number of thread (default: 1)
+        np_phenotype (ndarray): Preloaded phenotype data, str_inputFileName_phenotype is not read if given (default: None)
+        np_hardcall (ndarray): Preloaded hard calls (variants x samples) of this gene from the genotype store, str_inputFileName_genotype is not read if given (default: None)
+        np_variant (ndarray): Variant index (variants x 5) of np_hardcall (default: None)
+        np_variantCount (ndarray): Counts of AA, AB, BB and missing calls (variants x 4) of np_hardcall from the variant summary table, used to skip variants before decoding them (default: None)
+        int_memoryLimit (int): The memory limit of the encoded features in bytes (default: 2**30. 0: no limit)
+        bool_lowMemory (bool): Take the low-memory path, which streams the pairwise screening (default: False)
 
     Returns:
         (float): float_f1Score
@@ -258,38 +261,53 @@ def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_ph
     #-------------------------
     # load data
     #-------------------------
-    ### count lines of input files
-    int_num_phenotype = sum(1 for line in open(str_inputFileName_phenotype))
-    
     ### get phenotype file
-    list_phenotype = []
-    with open(str_inputFileName_phenotype, 'r') as file_inputFile:
-        for line in file_inputFile:
-            list_phenotype.append(line.strip().split(","))
-    np_phenotype = np.array(list_phenotype, dtype=np.float)
-    del list_phenotype
+    if np_phenotype is None:
+        list_phenotype = []
+        with open(str_inputFileName_phenotype, 'r') as file_inputFile:
+            for line in file_inputFile:
+                list_phenotype.append(line.strip().split(","))
+        np_phenotype = np.array(list_phenotype, dtype=np.float)
+        del list_phenotype
+    int_num_phenotype = np_phenotype.shape[0]
     
-    ### get genotype file
-    list_genotype = [[] for x in range(int_num_phenotype)]
+    ### get genotype from preloaded hard calls
+    list_genotype = []
     list_genotype_rsid = []
-    with open(str_inputFileName_genotype, 'r') as file_inputFile:
-        for line in file_inputFile:
-            list_thisSnp = line.strip().split(" ")
-            np_this_genotype = np.empty([int_num_phenotype, 3], dtype='int8')
-            for idx_subject in range(0, int_num_phenotype):
-                list_allelType = [0, 0, 0]
-                list_allelType[np.argmax(list_thisSnp[idx_subject * 3 + 5 : idx_subject * 3 + 8])] = 1
-                np_this_genotype[idx_subject, :] = list_allelType
+    if np_hardcall is not None:
+        ### skip the variants which can't pass the variance check of FilterInLoading before decoding them
+        if np_variantCount is not None:
+            np_selectedIdx = np.any(GetOneHotVariance(np_variantCount) > .95 * (1 - .95) - 1e-12, axis=1)
+            np_hardcall = np_hardcall[np_selectedIdx, :]
+            np_variant = np_variant[np_selectedIdx, :]
+        np_genotype_all = HardCallToOneHot(np_hardcall)
+        for idx_snp in range(np_variant.shape[0]):
+            np_this_genotype = np_genotype_all[:, idx_snp * 3:idx_snp * 3 + 3]
             if FilterInLoading(np_this_genotype, np_phenotype) == 0:
                 continue
-            for idx_subject in range(0, int_num_phenotype):
-                list_allelType = [0, 0, 0]
-                list_allelType[np.argmax(list_thisSnp[idx_subject * 3 + 5 : idx_subject * 3 + 8])] = 1
-                list_genotype[idx_subject].extend(list_allelType)
-            list_genotype_rsid.append(list_thisSnp[1] + "_AA")
-            list_genotype_rsid.append(list_thisSnp[1] + "_AB")
-            list_genotype_rsid.append(list_thisSnp[1] + "_BB")
-    np_genotype = np.array(list_genotype, dtype=np.int8)
+            list_genotype.append(np_this_genotype)
+            list_genotype_rsid.append(np_variant[idx_snp, 1] + "_AA")
+            list_genotype_rsid.append(np_variant[idx_snp, 1] + "_AB")
+            list_genotype_rsid.append(np_variant[idx_snp, 1] + "_BB")
+        del np_genotype_all
+    ### get genotype file
+    else:
+        ### decode a block of lines at a time
+        for list_line, float_progress in IterGenBlock(str_inputFileName_genotype):
+            np_info, np_genotype_block = DecodeGenOneHot(list_line)
+            for idx_snp in range(np_info.shape[0]):
+                np_this_genotype = np_genotype_block[:, idx_snp * 3:idx_snp * 3 + 3]
+                if FilterInLoading(np_this_genotype, np_phenotype) == 0:
+                    continue
+                list_genotype.append(np_this_genotype)
+                list_genotype_rsid.append(np_info[idx_snp, 1] + "_AA")
+                list_genotype_rsid.append(np_info[idx_snp, 1] + "_AB")
+                list_genotype_rsid.append(np_info[idx_snp, 1] + "_BB")
+            del np_genotype_block
+    if len(list_genotype) > 0:
+        np_genotype = np.concatenate(list_genotype, axis=1)
+    else:
+        np_genotype = np.empty([int_num_phenotype, 0], dtype=np.int8)
     np_genotype_rsid = np.array(list_genotype_rsid)
     
     if np_genotype_rsid.shape[0] == 0:
@@ -298,8 +316,8 @@ def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_ph
     #-------------------------
     # preprocess data
     #-------------------------        
-    ### generate interaction terms
-    np_genotype_rsid, np_genotype = FeatureEncoderLogistic(np_genotype_rsid, np_genotype, np_phenotype, 3)
+    ### generate interaction terms, the encoded features are kept bit-packed until the stability selection narrows them down
+    np_genotype_rsid, np_genotype = FeatureEncoderLogistic(np_genotype_rsid, PackBits(np_genotype), np_phenotype, 3, int_memoryLimit, bool_lowMemory)
     
     #-------------------------
     # select feature
@@ -308,7 +326,7 @@ def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_ph
     np_randWeight = np.array(RandomizedLogisticRegression(np_genotype, np_phenotype[:, -1].astype(int)))
     np_selectedIdx = np.array([x >= 0.25 for x in np_randWeight])
     np_randWeight = np_randWeight[np_selectedIdx]
-    np_genotype = np_genotype[:, np_selectedIdx]
+    np_genotype = UnpackBits(np_genotype, np_selectedIdx)
     np_genotype_rsid = np_genotype_rsid[np_selectedIdx]
     if np_genotype_rsid.shape[0] == 0:
         return 0.0
@@ -331,16 +349,9 @@ def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_ph
     #-------------------------
     # analyze result
     #-------------------------
-    ### calculate chi-square p-value
-    np_chi2 = -np.log10(chi2(np_genotype.astype(int), np_phenotype[:, -1].astype(int))[1])
-    list_oddsRatio = []
-    for idx_feature in range(0, np_genotype.shape[1]):
-        np_contingency = GenerateContingencyTable(np_genotype[:, idx_feature], np_phenotype[:, -1])
-        oddsratio, pvalue = stats.fisher_exact(np_contingency)
-        list_oddsRatio.append(oddsratio)
-        
-    ### calculate genotype frequency
-    np_genotypeFreq = np.sum(np_genotype, axis=0).astype(float) / np_genotype.shape[0]
+    ### calculate chi-square p-value, odds ratio and genotype frequency from the contingency tables of all features at once
+    np_oddsRatio, np_pValue, np_genotypeFreq = GetFeatureStatistics(np_genotype, np_phenotype[:, -1])
+    np_chi2 = -np.log10(np_pValue)
     
     #-------------------------
     # output results
@@ -349,17 +360,46 @@ def SingleGeneEpistasisLogistic(str_inputFileName_genotype, str_inputFileName_ph
     with open(os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).split("_")[0] + "_Result.csv"), "w") as file_outputFile:
         file_outputFile.writelines("rsid,weight,chi-square_log_p-value,odds_ratio,genotype_frequency" + "\n")
         for idx_feature in range(0, np_genotype_rsid.shape[0]):
-            file_outputFile.writelines(str(np_genotype_rsid[idx_feature,]) + "," + str(np_weight[idx_feature,]) + "," + str(np_chi2[idx_feature,]) + "," + str(list_oddsRatio[idx_feature]) + "," + str(np_genotypeFreq[idx_feature]) + "\n")
+            file_outputFile.writelines(str(np_genotype_rsid[idx_feature,]) + "," + str(np_weight[idx_feature,]) + "," + str(np_chi2[idx_feature,]) + "," + str(np_oddsRatio[idx_feature]) + "," + str(np_genotypeFreq[idx_feature]) + "\n")
             
     ### output feature
-    with open(os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).split("_")[0] + "_Feature.csv"), "w") as file_outputFile:
+    str_outputFileName_feature = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).split("_")[0] + "_Feature.csv")
+    with open(str_outputFileName_feature, "w") as file_outputFile:
         file_outputFile.writelines(",".join(np_genotype_rsid) + "\n")
         for idx_subject in range(0, np_genotype.shape[0]):
             file_outputFile.writelines(",".join(np_genotype[idx_subject, :].astype(str)) + "\n")
+    ### the bit-packed copy of the features, which is appended to the feature container of the folder by the batch run
+    WriteFeatureShard(str_outputFileName_feature, np_genotype_rsid, np_genotype)
     
     return float_f1Score
 
-def BatchSingleGeneEpistasisLogistic(str_inputFilePath_genotype, str_inputFileName_phenotype, str_outputFilePath = "", int_kOfKFold = 2, int_nJobs = mp.cpu_count()):
+def SingleGeneEpistasisLogisticFromStore(str_inputFileName_genotype, int_idx_start, int_idx_end, str_outputFilePath = "", int_kOfKFold = 2, int_nJobs = 1, int_memoryLimit = 2**30, bool_lowMemory = False):
+    """
+
+    Worker of the single gene workflow in a multiprocessing pool initialized by InitGenotypeStoreWorker. The SNPs of this gene are sliced from the memory-mapped genotype store and the phenotype is the one loaded once by the parent process.
+
+    Args:
+        str_inputFileName_genotype (str): File name of the gene subset, only used for naming the output files
+        int_idx_start (int): The first row of this gene in the genotype store
+        int_idx_end (int): The row after the last row of this gene in the genotype store
+        str_outputFilePath (str): File path of output file
+        int_kOfKFold (int): The k for k-fold cross validation (default: 2)
+        int_nJobs (int): The number of thread (default: 1)
+        int_memoryLimit (int): The memory limit of the encoded features in bytes (default: 2**30. 0: no limit)
+        bool_lowMemory (bool): Take the low-memory path, which streams the pairwise screening (default: False)
+
+    Returns:
+        (float): float_f1Score
+    
+    """
+    
+    np_variant, np_hardcall, np_phenotype, np_variantCount = GetGenotypeStoreWorkerData()
+    if np_variantCount is not None:
+        np_variantCount = np_variantCount[int_idx_start:int_idx_end, :]
+    
+    return SingleGeneEpistasisLogistic(str_inputFileName_genotype, "", str_outputFilePath, int_kOfKFold, int_nJobs, np_phenotype, np.array(np_hardcall[int_idx_start:int_idx_end, :]), np_variant[int_idx_start:int_idx_end, :], np_variantCount, int_memoryLimit, bool_lowMemory)
+
+def BatchSingleGeneEpistasisLogistic(str_inputFilePath_genotype, str_inputFileName_phenotype, str_outputFilePath = "", int_kOfKFold = 2, int_nJobs = mp.cpu_count(), str_inputFileName_genotype = "", int_memoryLimit = 2**30, bool_resume = False, int_memoryBudget = 0):
     """
 
     Batch running for the single gene workflow.
@@ -370,6 +410,10 @@ def BatchSingleGeneEpistasisLogistic(str_inputFilePath_genotype, str_inputFileNa
         str_outputFilePath (str): File path of output file
         int_kOfKFold (int): The k for k-fold cross validation (default: 2)
         int_nJobs (int): The number of thread (default: 1)
+        str_inputFileName_genotype (str): File name of the genotype data which was split into str_inputFilePath_genotype, the one recorded in the gene index is used if empty (default: "")
+        int_memoryLimit (int): The memory limit of the encoded features of each gene in bytes (default: 2**30. 0: no limit)
+        bool_resume (bool): Skip the genes finished by a previous run with the same inputs, which are recorded in the journal All_Logistic_k*.journal.csv (default: False)
+        int_memoryBudget (int): The memory budget of all of the workers in bytes, the genes exceeding the share of a worker take the low-memory path and the concurrency is capped so that the estimated memory of the running genes fits (default: 0. The available memory)
 
     Returns:
         - Expected Success Response::
@@ -385,27 +429,85 @@ def BatchSingleGeneEpistasisLogistic(str_inputFilePath_genotype, str_inputFileNa
     if not os.path.exists(str_outputFilePath):
         os.makedirs(str_outputFilePath)
     
-    ### scan all of the gen file in path
+    ### use the gene index written by step3 if exist, so that each worker slices its gene from the shared memory-mapped genotype store
+    str_inputFileName_geneIndex = os.path.join(str_inputFilePath_genotype, "GeneIndex.csv")
+    bool_store = os.path.isfile(str_inputFileName_geneIndex)
+    
+    ### scan all of the gene subsets in the gene index or all of the gen file in path
     list_genotypeFileName = []
-    for str_fileName in os.listdir(str_inputFilePath_genotype):
-        if ".gen" in str_fileName:
-            list_genotypeFileName.append(str_fileName)
+    if bool_store:
+        str_inputFileName_genotype_index, list_geneIndex = LoadGeneIndex(str_inputFileName_geneIndex)
+        if str_inputFileName_genotype == "":
+            str_inputFileName_genotype = str_inputFileName_genotype_index
+        ConvertGenToStore(str_inputFileName_genotype)
+        list_genotypeFileName = [item[0] for item in list_geneIndex]
+    else:
+        for str_fileName in os.listdir(str_inputFilePath_genotype):
+            if ".gen" in str_fileName:
+                list_genotypeFileName.append(str_fileName)
 
     ### batch PolyLogisticRegression
     ### inital multiprocessing pool
-    mp_pool = mp.Pool(int_nJobs)
+    if bool_store:
+        ### load phenotype once in parent process and hand it to each worker by the pool initializer
+        list_phenotype = []
+        with open(str_inputFileName_phenotype, 'r') as file_inputFile:
+            for line in file_inputFile:
+                list_phenotype.append(line.strip().split(","))
+        np_phenotype = np.array(list_phenotype, dtype=np.float)
+        del list_phenotype
+        ### genotype counts of all variants from the variant summary table (computed once if it doesn't exist)
+        dict_summary = LoadVariantSummary(str_inputFileName_genotype, str_inputFileName_phenotype)
+        np_variantCount = dict_summary["count"]
+        mp_pool = mp.Pool(int_nJobs, initializer=InitGenotypeStoreWorker, initargs=(str_inputFileName_genotype, np_phenotype, np_variantCount))
+        func_job = SingleGeneEpistasisLogisticFromStore
+        ### estimate the memory of each gene from its number of SNPs before encoding
+        list_memoryLimit, list_lowMemory, list_memory, int_memoryBudget = PlanGeneMemory([int_idx_end - int_idx_start for gene, int_idx_start, int_idx_end in list_geneIndex], np_phenotype.shape[0], int_memoryLimit, "Logistic", int_memoryBudget, int_nJobs)
+        list_args = [(os.path.join(str_inputFilePath_genotype, gene), int_idx_start, int_idx_end, str_outputFilePath, int_kOfKFold, int_nJobs, list_memoryLimit[idx_gene], list_lowMemory[idx_gene]) for idx_gene, (gene, int_idx_start, int_idx_end) in enumerate(list_geneIndex)]
+        list_cost = [EstimateGeneCost(gene, int_idx_end - int_idx_start) for gene, int_idx_start, int_idx_end in list_geneIndex]
+        list_hash = [GetGeneInputHash([dict_summary["hash_genotype"], dict_summary["hash_phenotype"], gene, int_idx_start, int_idx_end, int_kOfKFold, list_memoryLimit[idx_gene]]) for idx_gene, (gene, int_idx_start, int_idx_end) in enumerate(list_geneIndex)]
+    else:
+        mp_pool = mp.Pool(int_nJobs)
+        func_job = SingleGeneEpistasisLogistic
+        ### estimate the memory of each gene from its number of SNPs before encoding
+        with open(str_inputFileName_phenotype, 'r') as file_inputFile:
+            int_num_sample = sum(1 for line in file_inputFile)
+        list_memoryLimit, list_lowMemory, list_memory, int_memoryBudget = PlanGeneMemory([GetGeneSnpCount(gene) for gene in list_genotypeFileName], int_num_sample, int_memoryLimit, "Logistic", int_memoryBudget, int_nJobs)
+        list_args = [(os.path.join(str_inputFilePath_genotype, gene), str_inputFileName_phenotype, str_outputFilePath, int_kOfKFold, int_nJobs, None, None, None, None, list_memoryLimit[idx_gene], list_lowMemory[idx_gene]) for idx_gene, gene in enumerate(list_genotypeFileName)]
+        list_cost = [EstimateGeneCost(gene) for gene in list_genotypeFileName]
+        str_hash_phenotype = HashFile(str_inputFileName_phenotype)["hash"]
+        list_hash = [GetGeneInputHash([HashFile(os.path.join(str_inputFilePath_genotype, gene))["hash"], str_hash_phenotype, gene, int_kOfKFold, list_memoryLimit[idx_gene]]) for idx_gene, gene in enumerate(list_genotypeFileName)]
     
-    ### apply pool on the function that need be parallelizing
-    dict_result = {}
-    for int_count_gene, float_f1Score in enumerate(mp_pool.starmap(SingleGeneEpistasisLogistic, [(os.path.join(str_inputFilePath_genotype, gene), str_inputFileName_phenotype, str_outputFilePath, int_kOfKFold, int_nJobs) for gene in list_genotypeFileName]), 0):
-        if list_genotypeFileName[int_count_gene] not in dict_result:
-            dict_result[list_genotypeFileName[int_count_gene]] = float_f1Score
-        str_print = "step4: Processing: " + "{0:.2f}".format(float(int_count_gene) / len(list_genotypeFileName) * 100) + "% - " + list_genotypeFileName[int_count_gene] + ": " + "\t\t"
+    ### skip the genes finished by a previous run with the same inputs, including the memory limit planned for the gene, which truncates its interaction terms under a smaller budget
+    dict_journal = LoadGeneJournal(GetGeneJournalFileName(str_outputFilePath, "Logistic", int_kOfKFold)) if bool_resume else {}
+    list_float_f1Score = [None] * len(list_genotypeFileName)
+    list_idx_todo = []
+    for idx_gene, str_geneFileName in enumerate(list_genotypeFileName):
+        if IsGeneFinished(dict_journal, str_geneFileName, list_hash[idx_gene], str_outputFilePath):
+            list_float_f1Score[idx_gene] = dict_journal[str_geneFileName][1]
+        else:
+            list_idx_todo.append(idx_gene)
+    
+    ### apply pool on the function that need be parallelizing, the largest genes are dispatched first while their estimated memory fits the budget, and each result is appended to the journal (and its features to the feature container) as it finishes
+    file_journal = OpenGeneJournal(GetGeneJournalFileName(str_outputFilePath, "Logistic", int_kOfKFold), bool_resume)
+    OpenFeatureContainer(str_outputFilePath, bool_resume)
+    for int_count_gene, (idx_todo, float_f1Score) in enumerate(ImapLongestJobFirst(mp_pool, func_job, [list_args[idx_gene] for idx_gene in list_idx_todo], [list_cost[idx_gene] for idx_gene in list_idx_todo], [list_memory[idx_gene] for idx_gene in list_idx_todo], int_memoryBudget), len(list_genotypeFileName) - len(list_idx_todo) + 1):
+        idx_gene = list_idx_todo[idx_todo]
+        list_float_f1Score[idx_gene] = float_f1Score
+        AppendFeatureShard(str_outputFilePath, GetGeneOutputFileName(str_outputFilePath, list_genotypeFileName[idx_gene])[1])
+        AppendGeneJournal(file_journal, list_genotypeFileName[idx_gene], list_hash[idx_gene], float_f1Score)
+        str_print = "step4: Processing: " + "{0:.2f}".format(float(int_count_gene) / len(list_genotypeFileName) * 100) + "% - " + list_genotypeFileName[idx_gene] + ": " + "\t\t"
         sys.stdout.write('%s\r' % str_print)
         sys.stdout.flush()
 
+    file_journal.close()
     mp_pool.close()
 
+    dict_result = {}
+    for str_geneFileName, float_f1Score in zip(list_genotypeFileName, list_float_f1Score):
+        if str_geneFileName not in dict_result:
+            dict_result[str_geneFileName] = float_f1Score
+
     ### output result
     with open(str_outputFilePath + "All_Logistic_k" + str(int_kOfKFold) + ".csv", "w") as file_outputFile:
         file_outputFile.writelines("GeneSymbol,F1Score" + "\n")
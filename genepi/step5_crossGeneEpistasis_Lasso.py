@@ -19,17 +19,19 @@ import os
 import numpy as np
 np.seterr(divide='ignore', invalid='ignore')
 from sklearn.feature_selection import f_regression
-from sklearn import linear_model
 from scipy.sparse import coo_matrix
 from sklearn.utils import shuffle
-from sklearn.model_selection import KFold
-from sklearn.model_selection import GridSearchCV
 from sklearn.externals import joblib
 import scipy.stats as stats
 
 from genepi.step4_singleGeneEpistasis_Lasso import RandomizedLassoRegression
 from genepi.step4_singleGeneEpistasis_Lasso import LassoRegressionCV
 from genepi.step4_singleGeneEpistasis_Lasso import FeatureEncoderLasso
+from genepi.tools.regularizationPath import SearchLassoRegression
+from genepi.tools.featureContainer import LoadFeatureContainer
+from genepi.tools.featureContainer import LoadFeature
+from genepi.tools.featureContainer import OpenFeatureContainer
+from genepi.tools.featureContainer import AppendFeatureContainer
 
 """"""""""""""""""""""""""""""
 # define functions 
@@ -59,13 +61,9 @@ def LassoRegression(np_X, np_y, int_nJobs = 1):
     list_target = []
     list_predict = []
     
-    alpha = np.logspace(-10, 10, 200)
-    parameters = [{'alpha':alpha}]
-    kf_estimator = KFold(n_splits=2)
-    estimator_lasso = linear_model.Lasso(max_iter=1000)
-    estimator_grid = GridSearchCV(estimator_lasso, parameters, scoring='neg_mean_squared_error', n_jobs=int_nJobs, cv=kf_estimator)
-    estimator_grid.fit(X, y)
-    list_label = estimator_grid.best_estimator_.predict(X)
+    ### search alpha along one warm-started regularization path with early stopping
+    estimator_best = SearchLassoRegression(X, y)
+    list_label = estimator_best.predict(X)
     for idx_y, idx_label in zip(list(y), list_label):
         list_target.append(float(idx_y))
         list_predict.append(idx_label)
@@ -74,35 +72,46 @@ def LassoRegression(np_X, np_y, int_nJobs = 1):
     
     return (float_pearson + float_spearman) / 2
 
-def RegressorModelPersistence(np_X, np_y, str_outputFilePath = "", int_nJobs = 1):
+def FitAndEvaluateLasso(np_X, np_y, int_kOfKFold = 2, int_nJobs = 1, bool_filterZeroWeight = False):
     """
 
-    Dumping regressor for model persistence
+    Fitting the L1-regularized Lasso regression once for all of the outputs of a model: the k-fold cross validation (test score and averaged weights), and one search on all of the data whose estimator gives the training score and is dumped for model persistence.
 
     Args:
         np_X (ndarray): 2D array containing genotype data with `int8` type
-        np_y (ndarray): 2D array containing phenotype data with `float` type
-        str_outputFilePath (str): File path of output file
+        np_y (ndarray): 1D array containing phenotype data with `float` type
+        int_kOfKFold (int): The k for k-fold cross validation (default: 2)
         int_nJobs (int): The number of thread (default: 1)
+        bool_filterZeroWeight (bool): Fit the estimator on all of the data with the features of non-zero cross validation weight only (default: False)
 
     Returns:
-        None
+        (tuple): tuple containing:
+
+            - float_AVG_S_P_train (float): The average of the Peason's and Spearman's correlation of the estimator for training set
+            - float_AVG_S_P_test (float): The average of the Peason's and Spearman's correlation of the k-fold cross validation
+            - np_weight (ndarray): 1D array containing the averaged weights of the k-fold cross validation with `float` type
+            - estimator_best (Lasso): The estimator fitted on all of the data, None if no feature is left
     
     """
 
+    ### k-fold cross validation
+    float_AVG_S_P_test, np_weight = LassoRegressionCV(np_X, np_y, int_kOfKFold, int_nJobs)
+    
+    ### filter out zero-weight features
     X = np_X
-    y = np_y
-    X_sparse = coo_matrix(X)
-    X, X_sparse, y = shuffle(X, X_sparse, y, random_state=0)
+    if bool_filterZeroWeight:
+        X = X[:, np_weight != 0.0]
+    if X.shape[1] == 0:
+        return 0.0, float_AVG_S_P_test, np_weight, None
     
-    alpha = np.logspace(-10, 10, 200)
-    parameters = [{'alpha':alpha}]
-    kf_estimator = KFold(n_splits=2)
-    estimator_lasso = linear_model.Lasso(max_iter=1000)
-    estimator_grid = GridSearchCV(estimator_lasso, parameters, scoring='neg_mean_squared_error', n_jobs=int_nJobs, cv=kf_estimator)
-    estimator_grid.fit(X, y)
+    ### one search on all of the data for both training score and model persistence
+    X, y = shuffle(X, np_y, random_state=0)
+    estimator_best = SearchLassoRegression(X, y)
+    list_predict = estimator_best.predict(X)
+    float_pearson = stats.stats.pearsonr(y, list_predict)[0]
+    float_spearman = stats.stats.spearmanr(y, list_predict)[0]
     
-    joblib.dump(estimator_grid.best_estimator_, os.path.join(str_outputFilePath, "Regressor.pkl"))
+    return (float_pearson + float_spearman) / 2, float_AVG_S_P_test, np_weight, estimator_best
 
 """"""""""""""""""""""""""""""
 # main function
@@ -142,7 +151,7 @@ def CrossGeneEpistasisLasso(str_inputFilePath_feature, str_inputFileName_phenoty
     ### set default score file name
     if str_inputFileName_score == "":
         for str_fileName in os.listdir(str_inputFilePath_feature):
-            if str_fileName.startswith("All_Lasso"):
+            if str_fileName.startswith("All_Lasso") and not str_fileName.endswith(".journal.csv"):
                 str_inputFileName_score = os.path.join(str_inputFilePath_feature, str_fileName)
     
     #-------------------------
@@ -165,18 +174,7 @@ def CrossGeneEpistasisLasso(str_inputFilePath_feature, str_inputFileName_phenoty
         if "Feature.csv" in str_fileName:
             list_featureFileName.append(str_fileName)
     
-    ### get all selected snp ids
-    list_genotype_rsid = []
-    for item in list_featureFileName:
-        with open(os.path.join(str_inputFilePath_feature, item), "r") as file_inputFile:
-            ### grep the header
-            list_rsids = file_inputFile.readline().strip().split(",")
-            for rsid in list_rsids:
-                list_genotype_rsid.append(rsid)
-    np_genotype_rsid = np.array(list_genotype_rsid)
-    
     ### count lines of input files
-    int_num_genotype = len(np_genotype_rsid)
     int_num_phenotype = sum(1 for line in open(str_inputFileName_phenotype))
     
     ### get phenotype file
@@ -187,24 +185,23 @@ def CrossGeneEpistasisLasso(str_inputFilePath_feature, str_inputFileName_phenoty
     np_phenotype = np.array(list_phenotype, dtype=np.float)
     del list_phenotype
     
-    ### get genotype file
+    ### get genotype file, the features of step4 are mapped from the feature container at once (the text of a feature file is read only if the container doesn't hold its current features)
     ### declare a dictionary for mapping snp and gene
     dict_geneMap ={}
-    idx_genotype_rsid = 0
-    np_genotype = np.empty([int_num_phenotype, int_num_genotype], dtype='int8')
+    dict_container = LoadFeatureContainer(str_inputFilePath_feature)
+    list_genotype_rsid = []
+    list_genotype = []
     for item in list_featureFileName:
-        with open(os.path.join(str_inputFilePath_feature, item), "r") as file_inputFile:
-            ### grep feature from header of feature file
-            list_rsids = file_inputFile.readline().strip().split(",")
-            for rsid in list_rsids:
-                ### key: rsIDs of a feature; value: gene symbol
-                dict_geneMap[rsid] = item.split("_")[0]
-            idx_phenotype = 0
-            ### read feaure and write into np_genotype
-            for line in file_inputFile:
-                np_genotype[idx_phenotype, idx_genotype_rsid:idx_genotype_rsid + len(list_rsids)] = np.array([float(x) for x in line.strip().split(",")], dtype='int')
-                idx_phenotype = idx_phenotype + 1
-            idx_genotype_rsid = idx_genotype_rsid + len(list_rsids)
+        np_this_genotype_rsid, np_this_genotype = LoadFeature(dict_container, os.path.join(str_inputFilePath_feature, item))
+        for rsid in np_this_genotype_rsid:
+            ### key: rsIDs of a feature; value: gene symbol
+            dict_geneMap[rsid] = item.split("_")[0]
+        list_genotype_rsid.extend(list(np_this_genotype_rsid))
+        list_genotype.append(np_this_genotype)
+    del dict_container
+    np_genotype_rsid = np.array(list_genotype_rsid)
+    np_genotype = np.concatenate(list_genotype, axis=1) if len(list_genotype) > 0 else np.empty([int_num_phenotype, 0], dtype='int8')
+    del list_genotype
     
     #-------------------------
     # preprocess data
@@ -231,7 +228,7 @@ def CrossGeneEpistasisLasso(str_inputFilePath_feature, str_inputFileName_phenoty
     
     ### generate cross gene interations
     if np_genotype_degree1.shape[1] > 0:
-        np_genotype_crossGene_rsid, np_genotype_crossGene = FeatureEncoderLasso(np_genotype_degree1_rsid, np_genotype_degree1, np_phenotype, 1)
+        np_genotype_crossGene_rsid, np_genotype_crossGene = FeatureEncoderLasso(np_genotype_degree1_rsid, np_genotype_degree1, np_phenotype, 1, int_memoryLimit=0, int_nJobs=int_nJobs)
     
     ### remove degree 1 feature from dataset
     np_selectedIdx = np.array([x != 1 for x in np_genotype_rsid_degree])
@@ -259,8 +256,7 @@ def CrossGeneEpistasisLasso(str_inputFilePath_feature, str_inputFileName_phenoty
     #-------------------------
     # build model
     #-------------------------
-    float_AVG_S_P_test, np_weight = LassoRegressionCV(np_genotype, np_phenotype[:, -1].astype(float), int_kOfKFold, int_nJobs)
-    float_AVG_S_P_train = LassoRegression(np_genotype, np_phenotype[:, -1].astype(float), int_nJobs)
+    float_AVG_S_P_train, float_AVG_S_P_test, np_weight, estimator_best = FitAndEvaluateLasso(np_genotype, np_phenotype[:, -1].astype(float), int_kOfKFold, int_nJobs, bool_filterZeroWeight=True)
     
     ### filter out zero-weight features
     np_selectedIdx = np.array([x != 0.0 for x in np_weight])
@@ -301,11 +297,14 @@ def CrossGeneEpistasisLasso(str_inputFilePath_feature, str_inputFileName_phenoty
         file_outputFile.writelines(",".join(np_genotype_rsid) + "\n")
         for idx_subject in range(0, np_genotype.shape[0]):
             file_outputFile.writelines(",".join(np_genotype[idx_subject, :].astype(str)) + "\n")
+    ### the features are also kept in the feature container of the folder for step6
+    OpenFeatureContainer(str_outputFilePath)
+    AppendFeatureContainer(str_outputFilePath, os.path.join(str_outputFilePath, "Feature.csv"), np_genotype_rsid, np_genotype)
 
     #-------------------------
     # dump persistent model
     #-------------------------
-    RegressorModelPersistence(np_genotype, np_phenotype[:, -1].astype(int), str_outputFilePath, int_nJobs)
+    joblib.dump(estimator_best, os.path.join(str_outputFilePath, "Regressor.pkl"))
 
     print("step5: Detect cross gene epistasis. DONE! (Training score:" + "{0:.2f}".format(float_AVG_S_P_train) + "; " + str(int_kOfKFold) + "-fold Test Score:" + "{0:.2f}".format(float_AVG_S_P_test) + ")")
     
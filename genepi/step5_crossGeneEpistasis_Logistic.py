@@ -17,27 +17,24 @@ os.environ["PYTHONWARNINGS"] = "ignore"
 
 import os
 import numpy as np
-import scipy as sp
 np.seterr(divide='ignore', invalid='ignore')
 from sklearn.feature_selection import chi2
-from sklearn import linear_model
 from scipy.sparse import coo_matrix
 from sklearn.utils import shuffle
-from sklearn.model_selection import KFold
-from sklearn.model_selection import GridSearchCV
 from sklearn.externals import joblib
 import sklearn.metrics as skMetric
-import scipy.stats as stats
-from scipy.optimize import curve_fit
-from scipy.stats import norm
-
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
 
 from genepi.step4_singleGeneEpistasis_Logistic import RandomizedLogisticRegression
 from genepi.step4_singleGeneEpistasis_Logistic import LogisticRegressionL1CV
 from genepi.step4_singleGeneEpistasis_Logistic import FeatureEncoderLogistic
+from genepi.tools.regularizationPath import SearchLogisticRegressionL1
+from genepi.tools.bitPacked import IsBitPacked
+from genepi.tools.contingencyTable import GenerateContingencyTableBatch
+from genepi.tools.contingencyTable import GetFeatureStatistics
+from genepi.tools.featureContainer import LoadFeatureContainer
+from genepi.tools.featureContainer import LoadFeature
+from genepi.tools.featureContainer import OpenFeatureContainer
+from genepi.tools.featureContainer import AppendFeatureContainer
 
 """"""""""""""""""""""""""""""
 # define functions 
@@ -67,13 +64,9 @@ def LogisticRegressionL1(np_X, np_y, int_nJobs = 1):
     list_target = []
     list_predict = []
     
-    cost = [2**x for x in range(-8, 8)]
-    parameters = [{'C':cost, 'penalty':['l1'], 'dual':[False], 'class_weight':['balanced']}]
-    kf_estimator = KFold(n_splits=2)
-    estimator_logistic = linear_model.LogisticRegression(max_iter=100, solver='liblinear')
-    estimator_grid = GridSearchCV(estimator_logistic, parameters, scoring='f1', n_jobs=int_nJobs, cv=kf_estimator)
-    estimator_grid.fit(X, y)
-    list_label = estimator_grid.best_estimator_.predict(X)
+    ### search C along the grid with early stopping
+    estimator_best = SearchLogisticRegressionL1(X, y)
+    list_label = estimator_best.predict(X)
     for idx_y, idx_label in zip(list(y), list_label):
         list_target.append(float(idx_y))
         list_predict.append(idx_label)
@@ -87,8 +80,8 @@ def GenerateContingencyTable(np_genotype, np_phenotype):
     Generating the contingency table for chi-square test.
 
     Args:
-        np_X (ndarray): 2D array containing genotype data with `int8` type
-        np_y (ndarray): 2D array containing phenotype data with `float` type
+        np_X (ndarray): 1D array containing genotype data of a feature with `int8` type, or bit-packed data of a feature by PackBits
+        np_y (ndarray): 1D array containing phenotype data with `float` type
 
     Returns:
         (ndarray): np_contingency 
@@ -97,43 +90,51 @@ def GenerateContingencyTable(np_genotype, np_phenotype):
     
     """
 
-    np_contingency = np.array([[0, 0], [0, 0]])
-    for idx_subject in range(0, np_genotype.shape[0]):
-        np_contingency[int(np_genotype[idx_subject]), int(np_phenotype[idx_subject])] = np_contingency[int(np_genotype[idx_subject]), int(np_phenotype[idx_subject])] + 1
-    np_contingency = np.rot90(np_contingency)
-    np_contingency = np.rot90(np_contingency)
+    ### the table of a single feature by the batched tables, [[feature & case, feature & control], [no feature & case, no feature & control]]
+    if not IsBitPacked(np_genotype):
+        np_genotype = np.asarray(np_genotype).reshape(-1, 1)
     
-    return np_contingency
+    return GenerateContingencyTableBatch(np_genotype, np_phenotype)[0]
 
-def ClassifierModelPersistence(np_X, np_y, str_outputFilePath = "", int_nJobs = 1):
+def FitAndEvaluateLogistic(np_X, np_y, int_kOfKFold = 2, int_nJobs = 1, bool_filterZeroWeight = False):
     """
 
-    Dumping classifier for model persistence
+    Fitting the L1-regularized Logistic regression once for all of the outputs of a model: the k-fold cross validation (test score, averaged weights and predictions), and one search on all of the data whose estimator gives the training score and is dumped for model persistence.
 
     Args:
         np_X (ndarray): 2D array containing genotype data with `int8` type
-        np_y (ndarray): 2D array containing phenotype data with `float` type
-        str_outputFilePath (str): File path of output file
+        np_y (ndarray): 1D array containing phenotype data with `int` type
+        int_kOfKFold (int): The k for k-fold cross validation (default: 2)
         int_nJobs (int): The number of thread (default: 1)
+        bool_filterZeroWeight (bool): Fit the estimator on all of the data with the features of non-zero cross validation weight only (default: False)
 
     Returns:
-        None
+        (tuple): tuple containing:
+
+            - float_f1Score_train (float): The F1 score of the estimator for training set
+            - float_f1Score_test (float): The F1 score of the k-fold cross validation
+            - np_weight (ndarray): 1D array containing the averaged weights of the k-fold cross validation with `float` type
+            - dict_y (dict): The targets, predictions and probabilities of the k-fold cross validation
+            - estimator_best (LogisticRegression): The estimator fitted on all of the data, None if no feature is left
     
     """
 
+    ### k-fold cross validation
+    float_f1Score_test, np_weight, dict_y = LogisticRegressionL1CV(np_X, np_y, int_kOfKFold, int_nJobs)
+    
+    ### filter out zero-weight features
     X = np_X
-    y = np_y
-    X_sparse = coo_matrix(X)
-    X, X_sparse, y = shuffle(X, X_sparse, y, random_state=0)
+    if bool_filterZeroWeight:
+        X = X[:, np_weight != 0.0]
+    if X.shape[1] == 0:
+        return 0.0, float_f1Score_test, np_weight, dict_y, None
     
-    cost = [2**x for x in range(-8, 8)]
-    parameters = [{'C':cost, 'penalty':['l1'], 'dual':[False], 'class_weight':['balanced']}]
-    kf_estimator = KFold(n_splits=2)
-    estimator_logistic = linear_model.LogisticRegression(max_iter=100, solver='liblinear')
-    estimator_grid = GridSearchCV(estimator_logistic, parameters, scoring='f1', n_jobs=int_nJobs, cv=kf_estimator)
-    estimator_grid.fit(X, y)
+    ### one search on all of the data for both training score and model persistence
+    X, y = shuffle(X, np_y, random_state=0)
+    estimator_best = SearchLogisticRegressionL1(X, y)
+    float_f1Score_train = skMetric.f1_score(y.astype(float), estimator_best.predict(X))
     
-    joblib.dump(estimator_grid.best_estimator_, os.path.join(str_outputFilePath, "Classifier.pkl"))
+    return float_f1Score_train, float_f1Score_test, np_weight, dict_y, estimator_best
 
 def gaussian(x, mean, amplitude, standard_deviation):
     return amplitude * np.exp( - ((x - mean) / standard_deviation) ** 2)
@@ -159,6 +160,12 @@ def PlotPolygenicScore(list_target, list_predict, list_proba, str_outputFilePath
     
     """
 
+    ### the plotting stack is imported at first use, so the workflow and its worker processes start without it
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+    from scipy.optimize import curve_fit
+
     float_f1Score = skMetric.f1_score(list_target, list_predict)
 
     #-------------------------
@@ -224,7 +231,7 @@ def PlotPolygenicScore(list_target, list_predict, list_proba, str_outputFilePath
 
     plt.figure(figsize=(5,5))
     sns.scatterplot(x=pd_prevalence_obs.index, y=pd_prevalence_obs['obs'], hue=pd_rr['Relative Risk'], palette=sns.cubehelix_palette(8, start=.5, rot=-.75, as_cmap=True))
-    popt, pcov = sp.optimize.curve_fit(fsigmoid, pd_prevalence_pre.index, pd_prevalence_pre['pre'], method='dogbox', bounds=([0., 0.],[1., 100.]))
+    popt, pcov = curve_fit(fsigmoid, pd_prevalence_pre.index, pd_prevalence_pre['pre'], method='dogbox', bounds=([0., 0.],[1., 100.]))
     sns.lineplot(x=pd_prevalence_pre.index, y=fsigmoid(pd_prevalence_pre.index, *popt), color="black")
 
     plt.legend(prop={'size': 12}, loc='upper left')
@@ -293,7 +300,7 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
     ### set default score file name
     if str_inputFileName_score == "":
         for str_fileName in os.listdir(str_inputFilePath_feature):
-            if str_fileName.startswith("All_Logistic"):
+            if str_fileName.startswith("All_Logistic") and not str_fileName.endswith(".journal.csv"):
                 str_inputFileName_score = os.path.join(str_inputFilePath_feature, str_fileName)
 
     #-------------------------
@@ -316,18 +323,7 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
         if "Feature.csv" in str_fileName:
             list_featureFileName.append(str_fileName)
     
-    ### get all selected snp ids
-    list_genotype_rsid = []
-    for item in list_featureFileName:
-        with open(os.path.join(str_inputFilePath_feature, item), "r") as file_inputFile:
-            ### grep the header
-            list_rsids = file_inputFile.readline().strip().split(",")
-            for rsid in list_rsids:
-                list_genotype_rsid.append(rsid)
-    np_genotype_rsid = np.array(list_genotype_rsid)
-    
     ### count lines of input files
-    int_num_genotype = len(np_genotype_rsid)
     int_num_phenotype = sum(1 for line in open(str_inputFileName_phenotype))
     
     ### get phenotype file
@@ -338,24 +334,23 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
     np_phenotype = np.array(list_phenotype, dtype=np.float)
     del list_phenotype
     
-    ### get genotype file
+    ### get genotype file, the features of step4 are mapped from the feature container at once (the text of a feature file is read only if the container doesn't hold its current features)
     ### declare a dictionary for mapping snp and gene
     dict_geneMap ={}
-    idx_genotype_rsid = 0
-    np_genotype = np.empty([int_num_phenotype, int_num_genotype], dtype='int8')
+    dict_container = LoadFeatureContainer(str_inputFilePath_feature)
+    list_genotype_rsid = []
+    list_genotype = []
     for item in list_featureFileName:
-        with open(os.path.join(str_inputFilePath_feature, item), "r") as file_inputFile:
-            ### grep feature from header of feature file
-            list_rsids = file_inputFile.readline().strip().split(",")
-            for rsid in list_rsids:
-                ### key: rsIDs of a feature; value: gene symbol
-                dict_geneMap[rsid] = item.split("_")[0]
-            idx_phenotype = 0
-            ### read feaure and write into np_genotype
-            for line in file_inputFile:
-                np_genotype[idx_phenotype, idx_genotype_rsid:idx_genotype_rsid + len(list_rsids)] = np.array([float(x) for x in line.strip().split(",")], dtype='int')
-                idx_phenotype = idx_phenotype + 1
-            idx_genotype_rsid = idx_genotype_rsid + len(list_rsids)
+        np_this_genotype_rsid, np_this_genotype = LoadFeature(dict_container, os.path.join(str_inputFilePath_feature, item))
+        for rsid in np_this_genotype_rsid:
+            ### key: rsIDs of a feature; value: gene symbol
+            dict_geneMap[rsid] = item.split("_")[0]
+        list_genotype_rsid.extend(list(np_this_genotype_rsid))
+        list_genotype.append(np_this_genotype)
+    del dict_container
+    np_genotype_rsid = np.array(list_genotype_rsid)
+    np_genotype = np.concatenate(list_genotype, axis=1) if len(list_genotype) > 0 else np.empty([int_num_phenotype, 0], dtype='int8')
+    del list_genotype
     
     #-------------------------
     # preprocess data
@@ -382,7 +377,7 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
     
     ### generate cross gene interations
     if np_genotype_degree1.shape[1] > 0:
-        np_genotype_crossGene_rsid, np_genotype_crossGene = FeatureEncoderLogistic(np_genotype_degree1_rsid, np_genotype_degree1, np_phenotype, 1)
+        np_genotype_crossGene_rsid, np_genotype_crossGene = FeatureEncoderLogistic(np_genotype_degree1_rsid, np_genotype_degree1, np_phenotype, 1, int_memoryLimit=0, int_nJobs=int_nJobs)
     
     ### remove degree 1 feature from dataset
     np_selectedIdx = np.array([x != 1 for x in np_genotype_rsid_degree])
@@ -410,8 +405,7 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
     #-------------------------
     # build model
     #-------------------------
-    float_f1Score_test, np_weight, dict_y = LogisticRegressionL1CV(np_genotype, np_phenotype[:, -1].astype(int), int_kOfKFold, int_nJobs)
-    float_f1Score_train = LogisticRegressionL1(np_genotype, np_phenotype[:, -1].astype(int), int_nJobs)
+    float_f1Score_train, float_f1Score_test, np_weight, dict_y, estimator_best = FitAndEvaluateLogistic(np_genotype, np_phenotype[:, -1].astype(int), int_kOfKFold, int_nJobs, bool_filterZeroWeight=True)
     
     ### filter out zero-weight features
     np_selectedIdx = np.array([x != 0.0 for x in np_weight])
@@ -425,16 +419,9 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
     #-------------------------
     # analyze result
     #-------------------------
-    ### calculate chi-square p-value
-    np_chi2 = -np.log10(chi2(np_genotype.astype(int), np_phenotype[:, -1].astype(int))[1])
-    list_oddsRatio = []
-    for idx_feature in range(0, np_genotype.shape[1]):
-        np_contingency = GenerateContingencyTable(np_genotype[:, idx_feature], np_phenotype[:, -1])
-        oddsratio, pvalue = stats.fisher_exact(np_contingency)
-        list_oddsRatio.append(oddsratio)
-        
-    ### calculate genotype frequency
-    np_genotypeFreq = np.sum(np_genotype, axis=0).astype(float) / np_genotype.shape[0]
+    ### calculate chi-square p-value, odds ratio and genotype frequency from the contingency tables of all features at once
+    np_oddsRatio, np_pValue, np_genotypeFreq = GetFeatureStatistics(np_genotype, np_phenotype[:, -1])
+    np_chi2 = -np.log10(np_pValue)
     
     ### calculate statistic
     tn, fp, fn, tp = skMetric.confusion_matrix(dict_y["target"], dict_y["predict"]).ravel()
@@ -453,11 +440,11 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
         for idx_feature in range(0, np_genotype_rsid.shape[0]):
             ### if this feature is single gene epistasis
             if np_genotype_rsid[idx_feature,] in dict_geneMap.keys():
-                str_thisOutput = str(np_genotype_rsid[idx_feature,]) + "," + str(np_weight[idx_feature,]) + "," + str(np_chi2[idx_feature,]) + "," + str(list_oddsRatio[idx_feature]) + "," + str(np_genotypeFreq[idx_feature]) + "," + str(dict_geneMap[np_genotype_rsid[idx_feature,]]).split("@")[0] + "," + str(dict_score[dict_geneMap[np_genotype_rsid[idx_feature,]]]) + "\n"
+                str_thisOutput = str(np_genotype_rsid[idx_feature,]) + "," + str(np_weight[idx_feature,]) + "," + str(np_chi2[idx_feature,]) + "," + str(np_oddsRatio[idx_feature]) + "," + str(np_genotypeFreq[idx_feature]) + "," + str(dict_geneMap[np_genotype_rsid[idx_feature,]]).split("@")[0] + "," + str(dict_score[dict_geneMap[np_genotype_rsid[idx_feature,]]]) + "\n"
                 file_outputFile.writelines(str_thisOutput)
             ### else this feature is cross gene epistasis
             else:
-                str_thisOutput = str(np_genotype_rsid[idx_feature,]) + "," + str(np_weight[idx_feature,]) + "," + str(np_chi2[idx_feature,]) + "," + str(list_oddsRatio[idx_feature]) + "," + str(np_genotypeFreq[idx_feature]) + "," + str(dict_geneMap[np_genotype_rsid[idx_feature,].split("*")[0]]).split("@")[0] + "*" + str(dict_geneMap[np_genotype_rsid[idx_feature,].split("*")[1]]).split("@")[0] + ", " + "\n"
+                str_thisOutput = str(np_genotype_rsid[idx_feature,]) + "," + str(np_weight[idx_feature,]) + "," + str(np_chi2[idx_feature,]) + "," + str(np_oddsRatio[idx_feature]) + "," + str(np_genotypeFreq[idx_feature]) + "," + str(dict_geneMap[np_genotype_rsid[idx_feature,].split("*")[0]]).split("@")[0] + "*" + str(dict_geneMap[np_genotype_rsid[idx_feature,].split("*")[1]]).split("@")[0] + ", " + "\n"
                 file_outputFile.writelines(str_thisOutput)            
  
     ### output feature
@@ -465,6 +452,9 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
         file_outputFile.writelines(",".join(np_genotype_rsid) + "\n")
         for idx_subject in range(0, np_genotype.shape[0]):
             file_outputFile.writelines(",".join(np_genotype[idx_subject, :].astype(str)) + "\n")
+    ### the features are also kept in the feature container of the folder for step6
+    OpenFeatureContainer(str_outputFilePath)
+    AppendFeatureContainer(str_outputFilePath, os.path.join(str_outputFilePath, "Feature.csv"), np_genotype_rsid, np_genotype)
 
     ### output figures
     PlotPolygenicScore(dict_y["target"], dict_y["predict"], dict_y["predict_proba"], str_outputFilePath, "CV")
@@ -472,7 +462,7 @@ def CrossGeneEpistasisLogistic(str_inputFilePath_feature, str_inputFileName_phen
     #-------------------------
     # dump persistent model
     #-------------------------
-    ClassifierModelPersistence(np_genotype, np_phenotype[:, -1].astype(int), str_outputFilePath, int_nJobs)
+    joblib.dump(estimator_best, os.path.join(str_outputFilePath, "Classifier.pkl"))
     
     print("step5: Detect cross gene epistasis. DONE! (Training score:" + "{0:.2f}".format(float_f1Score_train) + "; " + str(int_kOfKFold) + "-fold Test Score:" + "{0:.2f}".format(float_f1Score_test) + ")")
     print("AUC: " + "{0:.2f}".format(float_auc) + "; Specificity: " + "{0:.2f}".format(float_specificity) + "; Sensitivity: " + "{0:.2f}".format(float_sensitivity))
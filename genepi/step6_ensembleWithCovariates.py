@@ -19,17 +19,12 @@ import os
 import numpy as np
 np.seterr(divide='ignore', invalid='ignore')
 
-from sklearn import linear_model
-from scipy.sparse import coo_matrix
-from sklearn.utils import shuffle
-from sklearn.model_selection import KFold
-from sklearn.model_selection import GridSearchCV
 from sklearn.externals import joblib
 
-from genepi.step4_singleGeneEpistasis_Logistic import LogisticRegressionL1CV
-from genepi.step4_singleGeneEpistasis_Lasso import LassoRegressionCV
-from genepi.step5_crossGeneEpistasis_Logistic import LogisticRegressionL1
-from genepi.step5_crossGeneEpistasis_Lasso import LassoRegression
+from genepi.step5_crossGeneEpistasis_Logistic import FitAndEvaluateLogistic
+from genepi.step5_crossGeneEpistasis_Lasso import FitAndEvaluateLasso
+from genepi.tools.featureContainer import LoadFeatureContainer
+from genepi.tools.featureContainer import LoadFeature
 
 """"""""""""""""""""""""""""""
 # define functions 
@@ -56,19 +51,6 @@ def LoadDataForEnsemble(str_inputFileName_feature, str_inputFileName_phenotype):
         print("step6: There is no variant remained in previous step.")
         return None, None
 
-    ### get all selected snp ids
-    list_genotype_rsid = []
-    with open(str_inputFileName_feature, "r") as file_inputFile:
-        ### grep the header
-        list_rsids = file_inputFile.readline().strip().split(",")
-        for rsid in list_rsids:
-            list_genotype_rsid.append(rsid)
-    np_genotype_rsid = np.array(list_genotype_rsid)
-    
-    ### count lines of input files
-    int_num_genotype = len(np_genotype_rsid)
-    int_num_phenotype = sum(1 for line in open(str_inputFileName_phenotype))
-    
     ### get phenotype file
     list_phenotype = []
     with open(str_inputFileName_phenotype, 'r') as file_inputFile:
@@ -81,82 +63,15 @@ def LoadDataForEnsemble(str_inputFileName_feature, str_inputFileName_phenotype):
         print("step6: There is no other factors exist.")
         return None, None
     
-    ### get genotype file
-    np_genotype = np.empty([int_num_phenotype, int_num_genotype], dtype=np.float16)
-    with open(str_inputFileName_feature, "r") as file_inputFile:
-        ### skip header
-        file_inputFile.readline()
-        idx_phenotype = 0
-        ### read feaure and write into np_genotype
-        for line in file_inputFile:
-            np_genotype[idx_phenotype, :len(list_rsids)] = np.array([float(x) for x in line.strip().split(",")], dtype='int')
-            idx_phenotype = idx_phenotype + 1
+    ### get genotype file, mapped from the feature container of step5 if it holds the current features (else the text of the feature file is read)
+    np_genotype_rsid, np_genotype = LoadFeature(LoadFeatureContainer(os.path.dirname(os.path.abspath(str_inputFileName_feature))), str_inputFileName_feature)
+    np_genotype = np_genotype.astype(np.float16)
     
     ### concatenate genotype and other factors
     np_genotype = np.concatenate((np_genotype, np_phenotype[:, :-1]), axis=1).astype(float)
     
     return np_genotype, np_phenotype
 
-def ClassifierModelPersistence(np_X, np_y, str_outputFilePath = "", int_nJobs = 1):
-    """
-
-    Dumping ensemble classifier for model persistence
-
-    Args:
-        np_X (ndarray): 2D array containing genotype data with `int8` type
-        np_y (ndarray): 2D array containing phenotype data with `float` type
-        str_outputFilePath (str): File path of output file
-        int_nJobs (int): The number of thread (default: 1)
-
-    Returns:
-        None
-    
-    """
-
-    X = np_X
-    y = np_y
-    X_sparse = coo_matrix(X)
-    X, X_sparse, y = shuffle(X, X_sparse, y, random_state=0)
-    
-    cost = [2**x for x in range(-8, 8)]
-    parameters = [{'C':cost, 'penalty':['l1'], 'dual':[False], 'class_weight':['balanced']}]
-    kf_estimator = KFold(n_splits=2)
-    estimator_logistic = linear_model.LogisticRegression(max_iter=100, solver='liblinear')
-    estimator_grid = GridSearchCV(estimator_logistic, parameters, scoring='f1', n_jobs=int_nJobs, cv=kf_estimator)
-    estimator_grid.fit(X, y)
-    
-    joblib.dump(estimator_grid.best_estimator_, os.path.join(str_outputFilePath, "Classifier_Covariates.pkl"))
-
-def RegressorModelPersistence(np_X, np_y, str_outputFilePath = "", int_nJobs = 1):
-    """
-
-    Dumping ensemble regressor for model persistence
-
-    Args:
-        np_X (ndarray): 2D array containing genotype data with `int8` type
-        np_y (ndarray): 2D array containing phenotype data with `float` type
-        str_outputFilePath (str): File path of output file
-        int_nJobs (int): The number of thread (default: 1)
-
-    Returns:
-        None
-    
-    """
-    
-    X = np_X
-    y = np_y
-    X_sparse = coo_matrix(X)
-    X, X_sparse, y = shuffle(X, X_sparse, y, random_state=0)
-    
-    alpha = np.logspace(-10, 10, 200)
-    parameters = [{'alpha':alpha}]
-    kf_estimator = KFold(n_splits=2)
-    estimator_lasso = linear_model.Lasso(max_iter=1000)
-    estimator_grid = GridSearchCV(estimator_lasso, parameters, scoring='neg_mean_squared_error', n_jobs=int_nJobs, cv=kf_estimator)
-    estimator_grid.fit(X, y)
-    
-    joblib.dump(estimator_grid.best_estimator_, os.path.join(str_outputFilePath, "Regressor_Covariates.pkl"))
-
 """"""""""""""""""""""""""""""
 # main function
 """"""""""""""""""""""""""""""
@@ -198,13 +113,12 @@ def EnsembleWithCovariatesClassifier(str_inputFileName_feature, str_inputFileNam
     #-------------------------
     # build model
     #-------------------------
-    float_f1Score_test, np_weight, dict_y = LogisticRegressionL1CV(np_genotype, np_phenotype[:, -1].astype(int), int_kOfKFold, int_nJobs)
-    float_f1Score_train = LogisticRegressionL1(np_genotype, np_phenotype[:, -1].astype(int), int_nJobs)
+    float_f1Score_train, float_f1Score_test, np_weight, dict_y, estimator_best = FitAndEvaluateLogistic(np_genotype, np_phenotype[:, -1].astype(int), int_kOfKFold, int_nJobs)
     
     #-------------------------
     # dump persistent model
     #-------------------------
-    ClassifierModelPersistence(np_genotype, np_phenotype[:, -1].astype(int), str_outputFilePath, int_nJobs)
+    joblib.dump(estimator_best, os.path.join(str_outputFilePath, "Classifier_Covariates.pkl"))
     
     print("step6: Ensemble with covariates. DONE! (Training score:" + "{0:.2f}".format(float_f1Score_train) + "; " + str(int_kOfKFold) + "-fold Test Score:" + "{0:.2f}".format(float_f1Score_test) + ")")
 
@@ -248,13 +162,12 @@ def EnsembleWithCovariatesRegressor(str_inputFileName_feature, str_inputFileName
     #-------------------------
     # build model
     #-------------------------
-    float_AVG_S_P_test, np_weight = LassoRegressionCV(np_genotype, np_phenotype[:, -1].astype(float), int_kOfKFold, int_nJobs)
-    float_AVG_S_P_train = LassoRegression(np_genotype, np_phenotype[:, -1].astype(float), int_nJobs)
+    float_AVG_S_P_train, float_AVG_S_P_test, np_weight, estimator_best = FitAndEvaluateLasso(np_genotype, np_phenotype[:, -1].astype(float), int_kOfKFold, int_nJobs)
     
     #-------------------------
     # dump persistent model
     #-------------------------
-    RegressorModelPersistence(np_genotype, np_phenotype[:, -1].astype(int), str_outputFilePath, int_nJobs)
+    joblib.dump(estimator_best, os.path.join(str_outputFilePath, "Regressor_Covariates.pkl"))
     
     print("step6: Ensemble with covariates. DONE! (Training score:" + "{0:.2f}".format(float_AVG_S_P_train) + "; " + str(int_kOfKFold) + "-fold Test Score:" + "{0:.2f}".format(float_AVG_S_P_test) + ")")
     
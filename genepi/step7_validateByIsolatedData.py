@@ -18,9 +18,13 @@ import numpy as np
 from sklearn.externals import joblib
 import sklearn.metrics as skMetric
 import scipy.stats as stats
-import subprocess
 
 from genepi.step5_crossGeneEpistasis_Logistic import PlotPolygenicScore
+from genepi.tools.genotypeStore import LoadGenotypeStore
+from genepi.tools.genotypeStore import HardCallToOneHot
+from genepi.tools.genotypeStore import DecodeGenOneHot
+from genepi.tools.genReader import GetGenBaseName
+from genepi.tools.genReader import IterGenBlock
 
 """"""""""""""""""""""""""""""
 # define functions 
@@ -31,7 +35,6 @@ def SplittingDataAsIsolatedData(str_inputFileName_genotype, str_inputFileName_ph
         str_outputFilePath = os.path.dirname(str_inputFileName_genotype)    
     
     ### count lines of input files
-    int_num_genotype = sum(1 for line in open(str_inputFileName_genotype))
     int_num_phenotype = sum(1 for line in open(str_inputFileName_phenotype))
 
     ### set random state
@@ -68,42 +71,19 @@ def SplittingDataAsIsolatedData(str_inputFileName_genotype, str_inputFileName_ph
             str_line = ",".join(np_phenotype_selected[idx_phenotype, :])
             file_outputFile.writelines(str_line + "\n")
     
-    ### get genotype file
-    str_filename_subset = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).replace(".gen", "_subset_1.gen"))
-    is_cont = False
-    str_choice = ""
-    for x in range(int_num_phenotype):
-        if is_cont == False and np_random[x]:
-            is_cont = True
-            str_choice += str(x*3 + 6) + "-"
-        elif is_cont == True and not np_random[x]:
-            is_cont = False
-            str_choice += str((x-1)*3 + 6 + 2) + ","
-    str_choice = str_choice[:-1] if str_choice[-1] == "," else str_choice
-    
-    str_command = 'cut -d " " -f1-5,'
-    str_command += str_choice + " "
-    str_command += str_inputFileName_genotype + " > "
-    str_command += str_filename_subset
-    subprocess.call(str_command, shell=True)
-    
-    is_cont = False
-    str_choice = ""
-    for x in range(int_num_phenotype):
-        if is_cont == False and np_random_complement[x]:
-            is_cont = True
-            str_choice += str(x*3 + 6) + "-"
-        elif is_cont == True and not np_random_complement[x]:
-            is_cont = False
-            str_choice += str((x-1)*3 + 6 + 2) + ","
-    str_choice = str_choice[:-1] if str_choice[-1] == "," else str_choice
-
-    str_filename_subset = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_genotype).replace(".gen", "_subset_2.gen"))
-    str_command = 'cut -d " " -f1-5,'
-    str_command += str_choice + " "
-    str_command += str_inputFileName_genotype + " > "
-    str_command += str_filename_subset
-    subprocess.call(str_command, shell=True)
+    ### get genotype file (plain, gzip or bgzip), the two subsets are written in a single pass
+    ### columns of each subset: the five information columns and the three probabilities of each of its samples
+    np_column_1 = np.concatenate([np.arange(5), (np.flatnonzero(np_random)[:, np.newaxis] * 3 + 5 + np.arange(3)).ravel()])
+    np_column_2 = np.concatenate([np.arange(5), (np.flatnonzero(np_random_complement)[:, np.newaxis] * 3 + 5 + np.arange(3)).ravel()])
+    str_filename_subset_1 = os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_subset_1.gen"))
+    str_filename_subset_2 = os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_subset_2.gen"))
+    with open(str_filename_subset_1, "w") as file_outputFile_1:
+        with open(str_filename_subset_2, "w") as file_outputFile_2:
+            for list_line, float_progress in IterGenBlock(str_inputFileName_genotype):
+                for line in list_line:
+                    np_line = np.array(line.strip().split(" "))
+                    file_outputFile_1.writelines(" ".join(np_line[np_column_1]) + "\n")
+                    file_outputFile_2.writelines(" ".join(np_line[np_column_2]) + "\n")
 
 def IsolatedDataFeatureGenerator(str_inputFileName_feature, str_inputFileName_genotype, str_inputFileName_phenotype, str_outputFilePath = ""):
     ### set default output path
@@ -127,16 +107,7 @@ def IsolatedDataFeatureGenerator(str_inputFileName_feature, str_inputFileName_ge
             if subitem not in dict_feature_rsid_unique:
                 dict_feature_rsid_unique[subitem] = 1
     
-    ### extract selected snp from genotype file
-    list_inputFile_genotype = []
-    with open(str_inputFileName_genotype, 'r') as file_inputFile:
-        for line in file_inputFile:
-            list_thisSnp = line.strip().split(" ")
-            if list_thisSnp[1] in dict_feature_rsid_unique.keys():
-                list_inputFile_genotype.append(line)
-    
     ### count lines of input files
-    int_num_genotype = len(list_inputFile_genotype)
     int_num_phenotype = sum(1 for line in open(str_inputFileName_phenotype))
     
     ### get phenotype file
@@ -148,23 +119,31 @@ def IsolatedDataFeatureGenerator(str_inputFileName_feature, str_inputFileName_ge
     del list_phenotype
 
     ### get genotype file
-    list_genotype = [[] for x in range(int_num_phenotype)]
-    list_genotype_rsid = []
-    with open(str_inputFileName_genotype, 'r') as file_inputFile:
-        for line in file_inputFile:
-            list_thisSnp = line.strip().split(" ")
-            if list_thisSnp[1] not in dict_feature_rsid_unique.keys():
-                continue
-            np_this_genotype = np.empty([int_num_phenotype, 3], dtype='int8')
-            for idx_subject in range(0, int_num_phenotype):
-                list_allelType = [0, 0, 0]
-                list_allelType[np.argmax(list_thisSnp[idx_subject * 3 + 5 : idx_subject * 3 + 8])] = 1
-                list_genotype[idx_subject].extend(list_allelType)
-            list_genotype_rsid.append(list_thisSnp[1] + "_AA")
-            list_genotype_rsid.append(list_thisSnp[1] + "_AB")
-            list_genotype_rsid.append(list_thisSnp[1] + "_BB")
-    np_genotype = np.array(list_genotype, dtype=np.int8)
-    np_genotype_rsid = np.array(list_genotype_rsid)
+    np_variant, np_hardcall = LoadGenotypeStore(str_inputFileName_genotype)
+    if np_hardcall is not None:
+        ### slice selected snp from binary genotype store
+        np_selectedIdx = np.array([x in dict_feature_rsid_unique for x in np_variant[:, 1]], dtype=bool)
+        np_genotype = HardCallToOneHot(np_hardcall[np_selectedIdx, :])
+        list_genotype_rsid = []
+        for str_rsid in np_variant[np_selectedIdx, 1]:
+            list_genotype_rsid.append(str_rsid + "_AA")
+            list_genotype_rsid.append(str_rsid + "_AB")
+            list_genotype_rsid.append(str_rsid + "_BB")
+        np_genotype_rsid = np.array(list_genotype_rsid)
+    else:
+        ### extract selected snp from genotype file, then decode them in one pass
+        list_inputFile_genotype = []
+        for list_line, float_progress in IterGenBlock(str_inputFileName_genotype):
+            for line in list_line:
+                if line.split(" ", 2)[1] in dict_feature_rsid_unique:
+                    list_inputFile_genotype.append(line)
+        np_info, np_genotype = DecodeGenOneHot(list_inputFile_genotype)
+        list_genotype_rsid = []
+        for str_rsid in np_info[:, 1]:
+            list_genotype_rsid.append(str_rsid + "_AA")
+            list_genotype_rsid.append(str_rsid + "_AB")
+            list_genotype_rsid.append(str_rsid + "_BB")
+        np_genotype_rsid = np.array(list_genotype_rsid)
     
     ### generate feature
     np_feature = np.empty([int_num_phenotype, len(list_feature_rsid_all)], dtype='int')
@@ -235,7 +214,7 @@ def ValidateByIsolatedDataRegressor(str_inputFileName_model, str_inputFileName_f
     list_target = []
     list_predict = []
     list_label = estimator.predict(np_genotype)
-    for idx_target, idx_prdict in zip(list(np_phenotype[:, -1].astype(int)), list_label):
+    for idx_target, idx_prdict in zip(list(np_phenotype[:, -1].astype(float)), list_label):
         list_target.append(float(idx_target))
         list_predict.append(idx_prdict)
     float_pearson = stats.stats.pearsonr(list_target, list_predict)[0]
@@ -305,7 +284,7 @@ def ValidateByIsolatedDataCovariateRegressor(str_inputFileName_model, str_inputF
     list_target = []
     list_predict = []
     list_label = estimator.predict(np_genotype)
-    for idx_target, idx_prdict in zip(list(np_phenotype[:, -1].astype(int)), list_label):
+    for idx_target, idx_prdict in zip(list(np_phenotype[:, -1].astype(float)), list_label):
         list_target.append(float(idx_target))
         list_predict.append(idx_prdict)
     float_pearson = stats.stats.pearsonr(list_target, list_predict)[0]
@@ -5,5 +5,18 @@ Created on Jul 2019
 @author: Chester (Yu-Chuan Chang)
 """
 
-from . import six
-from . import randomized_l1
\ No newline at end of file
+import importlib
+
+### the tool modules are loaded at their first use, e.g. genepi.tools.genotypeStore or `from genepi.tools import bitPacked`, so the light ones don't pull in the modelling stack of the others
+list_lazyModule = ["six", "randomized_l1", "genotypeStore", "geneAnnotationIndex", "variantSummary", "interactionScreening", "stabilitySelection", "regularizationPath", "geneScheduler", "geneJournal", "stageCache", "memoryBudget", "bitPacked", "contingencyTable", "genReader", "annotationCache", "featureContainer", "syntheticCohort"]
+
+__all__ = list(list_lazyModule)
+
+def __getattr__(str_name):
+    if str_name not in list_lazyModule:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(str_name))
+
+    return importlib.import_module("." + str_name, __name__)
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
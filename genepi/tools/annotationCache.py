@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import gzip
+import json
+import os
+import shutil
+import time
+import uuid
+
+from genepi.tools.geneAnnotationIndex import LoadAnnotationIndex
+from genepi.tools.geneAnnotationIndex import GetAnnotationIndexFileName
+from genepi.tools.variantSummary import HashFile
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+### the version of the layout of the annotation cache, a cache of another version is never read
+int_annotationCacheVersion = 1
+### the extension of gene regions upstream of the transcription start site (promoter)
+int_promoterLength = 1000
+
+def GetAnnotationCachePath(str_hgbuild = "hg19", str_cacheFilePath = ""):
+    """
+
+    To get the folder of the annotation cache of a genome build. By default, the cache is placed in the home folder (or $GENEPI_ANNOTATION_CACHE), so that it is built once and shared by the runs on a node instead of being written into the package folder.
+
+    Args:
+        str_hgbuild (str): Genome build (eg. "hg19")
+        str_cacheFilePath (str): File path of the annotation cache (default: "". $GENEPI_ANNOTATION_CACHE or ~/.genepi/annotation)
+
+    Returns:
+        (str): str_cacheFilePath
+
+    """
+
+    if str_cacheFilePath == "":
+        str_cacheFilePath = os.environ.get("GENEPI_ANNOTATION_CACHE", os.path.join(os.path.expanduser("~"), ".genepi", "annotation"))
+
+    return os.path.join(os.path.abspath(str_cacheFilePath), "v" + str(int_annotationCacheVersion), str_hgbuild)
+
+def QueryUCSCDB(str_hgbuild = "hg19", str_host = "genome-mysql.soe.ucsc.edu", str_user = "genome", str_passwd = "", int_port = 3306):
+    """
+
+    To retrieve the gene regions (the longest NM/NR transcript of each gene symbol, extended by the promoter) from the kgXref and knownGene tables of the UCSC database or a local MySQL-compatible server holding the same tables.
+
+    Args:
+        str_hgbuild (str): Genome build, which is the name of the database (eg. "hg19")
+        str_host (str): Host of the database (default: "genome-mysql.soe.ucsc.edu")
+        str_user (str): User of the database (default: "genome")
+        str_passwd (str): Password of the database (default: "")
+        int_port (int): Port of the database (default: 3306)
+
+    Returns:
+        (list): list_region
+
+            A list of [chromosome, start, end, strand, gene symbol] with `str` type, sorted by chromosome and start position
+
+    """
+
+    ### only needed for querying a database
+    import pymysql
+
+    ### create connection
+    conv = {pymysql.constants.FIELD_TYPE.LONG: int}
+    conn = pymysql.Connect(host = str_host, port = int_port, user = str_user, passwd = str_passwd, db = str_hgbuild, local_infile = 1, conv = conv)
+
+    ### execute sql command
+    str_sqlCommand = "SELECT chr, CASE WHEN strand='+' THEN txStart-1000 ELSE txStart END AS txStart, CASE WHEN strand='-' THEN txEnd+1000 ELSE txEnd END AS txEnd, strand, geneSymbol FROM "
+    str_sqlCommand = str_sqlCommand + "(SELECT REPLACE(chr, 'chr', '') AS chr, txStart, txEnd, strand, geneSymbol, MAX(ABS(txEnd-txStart)) FROM ( "
+    str_sqlCommand = str_sqlCommand + "SELECT knownGene.chrom AS chr, knownGene.txStart AS txStart, knownGene.txEnd AS txEnd, knownGene.strand AS strand, kgXref.geneSymbol AS geneSymbol FROM kgXref INNER JOIN knownGene ON kgXref.kgID=knownGene.name WHERE LEFT(kgXref.mRNA, 2) IN ('NR', 'NM')) AS L1 "
+    str_sqlCommand = str_sqlCommand + "GROUP BY geneSymbol) AS L2 WHERE LEFT(chr, 1) NOT IN ('X', 'Y', 'M', 'U') AND chr NOT LIKE '%\\_%' ORDER BY CAST(chr AS UNSIGNED), txStart"
+    cur = conn.cursor()
+    cur.execute(str_sqlCommand)
+    db_result = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    return [[str(x) for x in item] for item in db_result]
+
+def ParseUCSCDump(str_inputFileName_knownGene, str_inputFileName_kgXref):
+    """
+
+    To obtain the gene regions from the dump files (tab-separated, plain or gzip) of the knownGene and kgXref tables, which can be downloaded from http://hgdownload.soe.ucsc.edu/goldenPath/<build>/database/. The regions are selected in the same way as QueryUCSCDB: the longest NM/NR transcript of each gene symbol on the autosomes, extended by the promoter.
+
+    Args:
+        str_inputFileName_knownGene (str): File name of the dump of knownGene table (knownGene.txt.gz)
+        str_inputFileName_kgXref (str): File name of the dump of kgXref table (kgXref.txt.gz)
+
+    Returns:
+        (list): list_region
+
+            A list of [chromosome, start, end, strand, gene symbol] with `str` type, sorted by chromosome and start position
+
+    """
+
+    ### kgXref: kgID, mRNA, spID, spDisplayID, geneSymbol, ...
+    dict_symbol = {}
+    with OpenDumpFile(str_inputFileName_kgXref) as file_inputFile:
+        for line in file_inputFile:
+            list_line = line.rstrip("\n").split("\t")
+            if list_line[1][:2] in ("NR", "NM"):
+                dict_symbol[list_line[0]] = list_line[4]
+
+    ### knownGene: name, chrom, strand, txStart, txEnd, ...; keep the longest transcript of each gene symbol
+    dict_transcript = {}
+    with OpenDumpFile(str_inputFileName_knownGene) as file_inputFile:
+        for line in file_inputFile:
+            list_line = line.rstrip("\n").split("\t")
+            if list_line[0] not in dict_symbol:
+                continue
+            str_symbol = dict_symbol[list_line[0]]
+            list_thisTranscript = [list_line[1].replace("chr", ""), int(list_line[3]), int(list_line[4]), list_line[2]]
+            if str_symbol not in dict_transcript or abs(list_thisTranscript[2] - list_thisTranscript[1]) > abs(dict_transcript[str_symbol][2] - dict_transcript[str_symbol][1]):
+                dict_transcript[str_symbol] = list_thisTranscript
+
+    ### autosomes only, extend the regions by the promoter
+    list_region = []
+    for str_symbol, list_thisTranscript in dict_transcript.items():
+        str_chromosome, int_start, int_end, str_strand = list_thisTranscript
+        if str_chromosome[:1] in ("X", "Y", "M", "U") or "_" in str_chromosome or not str_chromosome.isdigit():
+            continue
+        if str_strand == "+":
+            int_start = int_start - int_promoterLength
+        else:
+            int_end = int_end + int_promoterLength
+        list_region.append([str_chromosome, str(int_start), str(int_end), str_strand, str_symbol])
+    list_region.sort(key=lambda item: (int(item[0]), int(item[1])))
+
+    return list_region
+
+def OpenDumpFile(str_inputFileName):
+    """
+
+    To open a dump file of UCSC database (plain or gzip) as text.
+
+    Args:
+        str_inputFileName (str): File name of the dump file
+
+    Returns:
+        (file): file_inputFile
+
+    """
+
+    with open(str_inputFileName, "rb") as file_inputFile:
+        bool_gzip = file_inputFile.read(2) == b"\x1f\x8b"
+
+    return gzip.open(str_inputFileName, "rt") if bool_gzip else open(str_inputFileName, "r")
+
+def BuildAnnotationCache(list_region, str_hgbuild = "hg19", str_source = "", str_cacheFilePath = ""):
+    """
+
+    To build the annotation cache of a genome build from gene regions. An entry contains the gene regions (UCSCGenomeDatabase.txt) and its binary interval index sorted by chromosome and start position (UCSCGenomeDatabase.index.npz, with a checksum), and is named by the hash of the regions. The entry is written to a temporary folder first, then renamed, and the pointer to the current entry (Current.json) is replaced atomically, so concurrent runs never read a partially written entry.
+
+    Args:
+        list_region (list): A list of [chromosome, start, end, strand, gene symbol] by QueryUCSCDB or ParseUCSCDump
+        str_hgbuild (str): Genome build (eg. "hg19")
+        str_source (str): The description of the source of the regions, which is recorded in the manifest (default: "")
+        str_cacheFilePath (str): File path of the annotation cache (default: "". See GetAnnotationCachePath)
+
+    Returns:
+        (str): str_fileName_UCSCDB
+
+            File name of the gene regions in the cache
+
+    """
+
+    str_cacheFilePath = GetAnnotationCachePath(str_hgbuild, str_cacheFilePath)
+    if not os.path.exists(str_cacheFilePath):
+        os.makedirs(str_cacheFilePath)
+
+    str_entryFilePath_tmp = os.path.join(str_cacheFilePath, uuid.uuid4().hex + ".tmp")
+    os.makedirs(str_entryFilePath_tmp)
+    try:
+        ### output gene regions and build the interval index next to them
+        str_fileName_UCSCDB_tmp = os.path.join(str_entryFilePath_tmp, "UCSCGenomeDatabase.txt")
+        with open(str_fileName_UCSCDB_tmp, "w") as file_outputFile:
+            for item in list_region:
+                file_outputFile.writelines(",".join(item) + "\n")
+        dict_index = LoadAnnotationIndex(str_fileName_UCSCDB_tmp)
+        str_hash = HashFile(str_fileName_UCSCDB_tmp)["hash"]
+        dict_manifest = {"version": int_annotationCacheVersion, "hgbuild": str_hgbuild, "source": str_source, "hash": str_hash, "checksum": str(dict_index["checksum"]), "regions": len(list_region), "created": time.strftime("%Y%m%d-%H:%M:%S", time.localtime())}
+        with open(os.path.join(str_entryFilePath_tmp, "Manifest.json"), "w") as file_outputFile:
+            json.dump(dict_manifest, file_outputFile)
+
+        ### entries are named by the hash of their regions, an existing entry with the same regions is reused
+        str_entryFilePath = os.path.join(str_cacheFilePath, str_hash)
+        if not os.path.isdir(str_entryFilePath):
+            try:
+                os.replace(str_entryFilePath_tmp, str_entryFilePath)
+            except OSError:
+                ### the same entry is built by a concurrent run
+                if not os.path.isdir(str_entryFilePath):
+                    raise
+    finally:
+        shutil.rmtree(str_entryFilePath_tmp, ignore_errors=True)
+
+    str_fileName_current_tmp = os.path.join(str_cacheFilePath, "Current.json." + uuid.uuid4().hex + ".tmp")
+    with open(str_fileName_current_tmp, "w") as file_outputFile:
+        json.dump({"entry": str_hash}, file_outputFile)
+    os.replace(str_fileName_current_tmp, os.path.join(str_cacheFilePath, "Current.json"))
+
+    return os.path.join(str_entryFilePath, "UCSCGenomeDatabase.txt")
+
+def GetAnnotationCacheFileName(str_hgbuild = "hg19", str_cacheFilePath = ""):
+    """
+
+    To get the gene regions of the current entry of the annotation cache of a genome build. Only the small pointer and manifest are read here, the interval index is loaded later by LoadAnnotationIndex when genes are queried.
+
+    Args:
+        str_hgbuild (str): Genome build (eg. "hg19")
+        str_cacheFilePath (str): File path of the annotation cache (default: "". See GetAnnotationCachePath)
+
+    Returns:
+        (str): str_fileName_UCSCDB
+
+            File name of the gene regions in the cache ("" if the cache of the genome build is not built or damaged)
+
+    """
+
+    str_cacheFilePath = GetAnnotationCachePath(str_hgbuild, str_cacheFilePath)
+    try:
+        with open(os.path.join(str_cacheFilePath, "Current.json"), "r") as file_inputFile:
+            str_entryFilePath = os.path.join(str_cacheFilePath, json.load(file_inputFile)["entry"])
+        with open(os.path.join(str_entryFilePath, "Manifest.json"), "r") as file_inputFile:
+            dict_manifest = json.load(file_inputFile)
+    except (OSError, ValueError, KeyError):
+        return ""
+
+    str_fileName_UCSCDB = os.path.join(str_entryFilePath, "UCSCGenomeDatabase.txt")
+    if dict_manifest.get("version") != int_annotationCacheVersion or not os.path.isfile(str_fileName_UCSCDB) or not os.path.isfile(GetAnnotationIndexFileName(str_fileName_UCSCDB)):
+        return ""
+
+    return str_fileName_UCSCDB
+
+def GetGenomeRegionFileName(str_hgbuild = "hg19", str_cacheFilePath = ""):
+    """
+
+    To get the gene regions used by step3 when no self-defined regions are given: the annotation cache of the genome build if it is built, otherwise the hg19 regions shipped with the package.
+
+    Args:
+        str_hgbuild (str): Genome build (eg. "hg19")
+        str_cacheFilePath (str): File path of the annotation cache (default: "". See GetAnnotationCachePath)
+
+    Returns:
+        (str): str_fileName_UCSCDB
+
+    Warnings:
+        "Warning: There is no annotation cache of <build>, build it with --updatedb. The hg19 regions shipped with GenEpi are used."
+
+    """
+
+    str_fileName_UCSCDB = GetAnnotationCacheFileName(str_hgbuild, str_cacheFilePath)
+    if str_fileName_UCSCDB != "":
+        return str_fileName_UCSCDB
+
+    if str_hgbuild != "hg19":
+        print("Warning: There is no annotation cache of " + str_hgbuild + ", build it with --updatedb. The hg19 regions shipped with GenEpi are used.")
+
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "UCSCGenomeDatabase.txt")
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import threading
+import time
+import multiprocessing as mp
+import numpy as np
+import psutil
+
+from genepi.tools.syntheticCohort import GenerateSyntheticCohort
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetTreeMemory(process):
+    """
+
+    To get the resident memory of a process and its child processes (e.g. the worker pools of step2, step4 and step5).
+
+    Args:
+        process (Process): The process of psutil
+
+    Returns:
+        (int): int_rss
+
+    """
+
+    int_rss = 0
+    for process_member in [process] + process.children(recursive=True):
+        try:
+            int_rss = int_rss + process_member.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+    return int_rss
+
+def MeasureStage(function_stage, list_args, dict_kwargs, float_interval = 0.05):
+    """
+
+    To measure the wall time and the peak resident memory of a stage. The memory of this process and its child processes is sampled by a thread every float_interval seconds during the stage.
+
+    Args:
+        function_stage (function): The function of the stage
+        list_args (list): The positional arguments of the function
+        dict_kwargs (dict): The keyword arguments of the function
+        float_interval (float): The interval of sampling memory in seconds (default: 0.05)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - float_second (float): The wall time in seconds
+            - int_peakRSS (int): The peak resident memory in bytes
+            - result: The return value of the function
+
+    """
+
+    process = psutil.Process()
+    list_peakRSS = [GetTreeMemory(process)]
+    event_stop = threading.Event()
+
+    def SampleMemory():
+        while not event_stop.wait(float_interval):
+            list_peakRSS[0] = max(list_peakRSS[0], GetTreeMemory(process))
+
+    thread_sampler = threading.Thread(target=SampleMemory, daemon=True)
+    thread_sampler.start()
+    float_start = time.perf_counter()
+    try:
+        result = function_stage(*list_args, **dict_kwargs)
+    finally:
+        float_second = time.perf_counter() - float_start
+        event_stop.set()
+        thread_sampler.join()
+    list_peakRSS[0] = max(list_peakRSS[0], GetTreeMemory(process))
+
+    return float_second, list_peakRSS[0], result
+
+def CountRecoveredEpistasis(str_inputFileName_feature, list_epistasis):
+    """
+
+    To count the planted pairs found by the workflow, a pair is found if a selected feature is the interaction of its two SNPs. A planted SNP replaced by another SNP of its LD block in step2 is not counted.
+
+    Args:
+        str_inputFileName_feature (str): File name of the features selected by step5 (Feature.csv)
+        list_epistasis (list): The planted pairs in the truth of GenerateSyntheticCohort
+
+    Returns:
+        (int): int_num_recovered
+
+    """
+
+    if not os.path.isfile(str_inputFileName_feature):
+        return 0
+    with open(str_inputFileName_feature, "r") as file_inputFile:
+        list_feature = file_inputFile.readline().strip().split(",")
+    set_pair = set([frozenset([item.split("_")[0] for item in str_feature.split("*")]) for str_feature in list_feature if "*" in str_feature])
+
+    return sum([frozenset(dict_epistasis["rsid"]) in set_pair for dict_epistasis in list_epistasis])
+
+def BenchmarkCohort(str_outputFilePath, int_num_sample, int_num_variant, str_model = "c", int_nJobs = 1, int_kOfKFold = 2, int_seed = 0, dict_cohort = {}):
+    """
+
+    To benchmark the stages of GenEpi on a synthetic cohort, the stages are run in the order of GenEpi.py (including step0 and step7 of the isolated validation) and each is measured by MeasureStage. The throughput is the number of genotypes (samples x variants) of the cohort per second.
+
+    Args:
+        str_outputFilePath (str): File path of the cohort and the outputs of the stages
+        int_num_sample (int): The number of samples
+        int_num_variant (int): The number of variants
+        str_model (str): "c" for case/control or "r" for a quantitative trait (default: "c")
+        int_nJobs (int): The number of jobs of the stages (default: 1)
+        int_kOfKFold (int): The k for k-fold cross validation (default: 2)
+        int_seed (int): The seed of the synthetic cohort (default: 0)
+        dict_cohort (dict): The other arguments of GenerateSyntheticCohort (default: {})
+
+    Returns:
+        (dict): dict_run
+
+            {"num_sample", "num_variant", "model", "num_epistasis", "num_recovered", "stages"}, where "stages" is a dict of key: name of a stage; value: {"second", "peak_rss", "throughput"}, or None if the stage is skipped
+
+    """
+
+    from genepi.step2_estimateLD import EstimateLDBlock
+    from genepi.step3_splitByGene import SplitByGene
+    from genepi.step7_validateByIsolatedData import SplittingDataAsIsolatedData
+    from genepi.tools.genotypeStore import ConvertGenToStore
+    from genepi.tools.genReader import GetGenBaseName
+    if str_model == "c":
+        from genepi.step4_singleGeneEpistasis_Logistic import BatchSingleGeneEpistasisLogistic as BatchSingleGeneEpistasis
+        from genepi.step5_crossGeneEpistasis_Logistic import CrossGeneEpistasisLogistic as CrossGeneEpistasis
+        from genepi.step6_ensembleWithCovariates import EnsembleWithCovariatesClassifier as EnsembleWithCovariates
+        from genepi.step7_validateByIsolatedData import ValidateByIsolatedDataClassifier as ValidateByIsolatedData
+        str_fileName_model = "Classifier.pkl"
+    else:
+        from genepi.step4_singleGeneEpistasis_Lasso import BatchSingleGeneEpistasisLasso as BatchSingleGeneEpistasis
+        from genepi.step5_crossGeneEpistasis_Lasso import CrossGeneEpistasisLasso as CrossGeneEpistasis
+        from genepi.step6_ensembleWithCovariates import EnsembleWithCovariatesRegressor as EnsembleWithCovariates
+        from genepi.step7_validateByIsolatedData import ValidateByIsolatedDataRegressor as ValidateByIsolatedData
+        str_fileName_model = "Regressor.pkl"
+
+    ### start over, the stages would skip the work of up-to-date outputs
+    if os.path.exists(str_outputFilePath):
+        shutil.rmtree(str_outputFilePath)
+    for str_folder in ["", "snpSubsets", "isolatedValidation"]:
+        os.makedirs(os.path.join(str_outputFilePath, str_folder), exist_ok=True)
+    str_inputFileName_genotype, str_inputFileName_phenotype, str_inputFileName_truth = GenerateSyntheticCohort(str_outputFilePath, int_num_sample=int_num_sample, int_num_variant=int_num_variant, str_model=str_model, int_seed=int_seed, **dict_cohort)
+    with open(str_inputFileName_truth, "r") as file_inputFile:
+        list_epistasis = json.load(file_inputFile)["epistasis"]
+
+    ### the file names of the stages, as GenEpi.py with -i and --compressld
+    str_inputFileName_genotype_train = os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_subset_1.gen"))
+    str_inputFileName_phenotype_train = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_phenotype).replace(".csv", "_subset_1.csv"))
+    str_inputFileName_genotype_test = os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype).replace(".gen", "_subset_2.gen"))
+    str_inputFileName_phenotype_test = os.path.join(str_outputFilePath, os.path.basename(str_inputFileName_phenotype).replace(".csv", "_subset_2.csv"))
+    str_inputFileName_genotype_LDReduced = os.path.join(str_outputFilePath, GetGenBaseName(str_inputFileName_genotype_train).replace(".gen", "_LDReduced.gen"))
+    str_inputFileName_feature = os.path.join(str_outputFilePath, "crossGeneResult", "Feature.csv")
+
+    ### step2 includes the genotype store of the LD-reduced data, as in GenEpi.py
+    def EstimateLDBlockToStore(str_inputFileName_genotype, str_outputFilePath, int_nJobs):
+        EstimateLDBlock(str_inputFileName_genotype, str_outputFilePath=str_outputFilePath, int_nJobs=int_nJobs)
+        ConvertGenToStore(str_inputFileName_genotype_LDReduced, int_nJobs=int_nJobs)
+
+    list_call = [
+        ["step0_isolatedData", SplittingDataAsIsolatedData, [str_inputFileName_genotype, str_inputFileName_phenotype], {"str_outputFilePath": str_outputFilePath, "int_randomState": 0}],
+        ["genotypeStore", ConvertGenToStore, [str_inputFileName_genotype_train], {"int_nJobs": int_nJobs}],
+        ["step2_estimateLD", EstimateLDBlockToStore, [str_inputFileName_genotype_train], {"str_outputFilePath": str_outputFilePath, "int_nJobs": int_nJobs}],
+        ["step3_splitByGene", SplitByGene, [str_inputFileName_genotype_LDReduced], {"str_inputFileName_UCSCDB": dict_cohort.get("str_inputFileName_regions", "") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "UCSCGenomeDatabase.txt"), "str_outputFilePath": os.path.join(str_outputFilePath, "snpSubsets")}],
+        ["step4_singleGeneEpistasis", BatchSingleGeneEpistasis, [os.path.join(str_outputFilePath, "snpSubsets"), str_inputFileName_phenotype_train], {"int_kOfKFold": int_kOfKFold, "int_nJobs": int_nJobs, "str_inputFileName_genotype": str_inputFileName_genotype_LDReduced}],
+        ["step5_crossGeneEpistasis", CrossGeneEpistasis, [os.path.join(str_outputFilePath, "singleGeneResult"), str_inputFileName_phenotype_train], {"int_kOfKFold": int_kOfKFold, "int_nJobs": int_nJobs}],
+        ["step6_ensembleWithCovariates", EnsembleWithCovariates, [str_inputFileName_feature, str_inputFileName_phenotype_train], {"int_kOfKFold": int_kOfKFold}],
+        ["step7_validateByIsolatedData", ValidateByIsolatedData, [os.path.join(str_outputFilePath, "crossGeneResult", str_fileName_model), str_inputFileName_feature, str_inputFileName_genotype_test, str_inputFileName_phenotype_test], {"str_outputFilePath": os.path.join(str_outputFilePath, "isolatedValidation")}],
+    ]
+
+    dict_run = {"num_sample": int_num_sample, "num_variant": int_num_variant, "model": str_model, "num_epistasis": len(list_epistasis), "stages": {}}
+    for str_stage, function_stage, list_args, dict_kwargs in list_call:
+        ### the first argument of a stage is the output of the previous stages, which is missing if nothing passed the selection (e.g. no model of step6 for step7)
+        if not os.path.exists(list_args[0]):
+            dict_run["stages"][str_stage] = None
+            continue
+        float_second, int_peakRSS, result = MeasureStage(function_stage, list_args, dict_kwargs)
+        dict_run["stages"][str_stage] = {"second": float_second, "peak_rss": int_peakRSS, "throughput": int_num_sample * int_num_variant / max(float_second, 1e-9)}
+    dict_run["num_recovered"] = CountRecoveredEpistasis(str_inputFileName_feature, list_epistasis)
+
+    return dict_run
+
+def BenchmarkStages(str_outputFilePath, list_num_sample, list_num_variant, str_model = "c", int_nJobs = 1, int_kOfKFold = 2, int_seed = 0, dict_cohort = {}):
+    """
+
+    To benchmark the stages of GenEpi over a grid of cohort sizes (every number of samples with every number of variants) by BenchmarkCohort.
+
+    Args:
+        str_outputFilePath (str): File path of the cohorts, each size in its own folder
+        list_num_sample (list): The numbers of samples
+        list_num_variant (list): The numbers of variants
+        str_model (str): "c" for case/control or "r" for a quantitative trait (default: "c")
+        int_nJobs (int): The number of jobs of the stages (default: 1)
+        int_kOfKFold (int): The k for k-fold cross validation (default: 2)
+        int_seed (int): The seed of the synthetic cohorts (default: 0)
+        dict_cohort (dict): The other arguments of GenerateSyntheticCohort (default: {})
+
+    Returns:
+        (dict): dict_report
+
+            {"environment", "runs"}, where "runs" is a list of dict_run by BenchmarkCohort
+
+    """
+
+    import sklearn
+
+    dict_report = {"environment": {"python": platform.python_version(), "numpy": np.__version__, "sklearn": sklearn.__version__, "platform": platform.platform(), "cpu_count": mp.cpu_count(), "memory": int(psutil.virtual_memory().total), "nJobs": int_nJobs, "seed": int_seed, "date": time.strftime("%Y%m%d-%H:%M:%S", time.localtime())}, "runs": []}
+    for int_num_sample in list_num_sample:
+        for int_num_variant in list_num_variant:
+            str_outputFilePath_run = os.path.join(str_outputFilePath, "n" + str(int_num_sample) + "_v" + str(int_num_variant))
+            dict_report["runs"].append(BenchmarkCohort(str_outputFilePath_run, int_num_sample, int_num_variant, str_model=str_model, int_nJobs=int_nJobs, int_kOfKFold=int_kOfKFold, int_seed=int_seed, dict_cohort=dict_cohort))
+
+    return dict_report
+
+def CompareWithBaseline(dict_report, dict_baseline, float_tolerance = 0.2):
+    """
+
+    To compare the wall time of the stages with the ones of a baseline report, a stage regresses if it is more than float_tolerance slower than the run of the same size and model in the baseline.
+
+    Args:
+        dict_report (dict): The report by BenchmarkStages
+        dict_baseline (dict): The baseline report by BenchmarkStages
+        float_tolerance (float): The allowed fraction of slowdown (default: 0.2)
+
+    Returns:
+        (list): list_regression
+
+            "n<samples>_v<variants>/<stage>: <second> s vs <baseline second> s" of each regressed stage
+
+    """
+
+    dict_baselineRun = {(dict_run["num_sample"], dict_run["num_variant"], dict_run["model"]): dict_run for dict_run in dict_baseline["runs"]}
+    list_regression = []
+    for dict_run in dict_report["runs"]:
+        tuple_key = (dict_run["num_sample"], dict_run["num_variant"], dict_run["model"])
+        if tuple_key not in dict_baselineRun:
+            continue
+        for str_stage, dict_stage in dict_run["stages"].items():
+            if dict_stage is None or dict_baselineRun[tuple_key]["stages"].get(str_stage) is None:
+                continue
+            float_baseline = dict_baselineRun[tuple_key]["stages"][str_stage]["second"]
+            if dict_stage["second"] > float_baseline * (1 + float_tolerance):
+                list_regression.append("n" + str(tuple_key[0]) + "_v" + str(tuple_key[1]) + "/" + str_stage + ": " + "{0:.3f}".format(dict_stage["second"]) + " s vs " + "{0:.3f}".format(float_baseline) + " s")
+
+    return list_regression
+
+def ArgumentsParser():
+    ### define arguments
+    str_description = ''
+    'This script benchmarks the stages of GenEpi on synthetic cohorts over a grid of sizes, and records the wall time, throughput and peak memory of each stage to a JSON report'
+    parser = argparse.ArgumentParser(prog='benchmarkStages', description=str_description)
+
+    ### define arguments for I/O
+    parser.add_argument("-o", required=True, help="output file path of the cohorts")
+    parser.add_argument("-j", required=False, default="", help="filename of the output JSON report (default: <output file path>/benchmark.json)")
+    parser.add_argument("-m", required=False, default="c", choices=["c","r"], help="c for case/control or r for a quantitative trait (default: c)")
+    parser.add_argument("-k", required=False, default=2, type=int, help="k of k-fold cross validation (default: 2)")
+    parser.add_argument("-t", required=False, default=1, type=int, help="number of threads (default: 1)")
+    parser.add_argument("--samples", required=False, nargs="+", default=[500, 1000], type=int, help="numbers of samples (default: 500 1000)")
+    parser.add_argument("--variants", required=False, nargs="+", default=[500, 2000], type=int, help="numbers of variants (default: 500 2000)")
+    parser.add_argument("--genes", required=False, default=50, type=int, help="number of genes of a cohort (default: 50)")
+    parser.add_argument("--epistasis", required=False, default=5, type=int, help="number of planted SNP pairs (default: 5)")
+    parser.add_argument("--seed", required=False, default=0, type=int, help="random seed (default: 0)")
+    parser.add_argument("--baseline", required=False, default="", help="JSON report to compare with, a regressed stage makes the exit status 1")
+    parser.add_argument("--tolerance", required=False, default=0.2, type=float, help="allowed fraction of slowdown against the baseline (default: 0.2)")
+
+    return parser
+
+""""""""""""""""""""""""""""""
+# main function
+""""""""""""""""""""""""""""""
+def main(args=None):
+    ### obtain arguments from argument parser
+    args = ArgumentsParser().parse_args(args)
+
+    dict_report = BenchmarkStages(args.o, args.samples, args.variants, str_model=args.m, int_nJobs=args.t, int_kOfKFold=args.k, int_seed=args.seed, dict_cohort={"int_num_gene": args.genes, "int_num_epistasis": args.epistasis})
+    str_outputFileName_report = args.j if args.j != "" else os.path.join(args.o, "benchmark.json")
+    with open(str_outputFileName_report, "w") as file_outputFile:
+        json.dump(dict_report, file_outputFile, indent=2)
+
+    for dict_run in dict_report["runs"]:
+        print("samples: " + str(dict_run["num_sample"]) + ", variants: " + str(dict_run["num_variant"]) + ", recovered pairs: " + str(dict_run["num_recovered"]) + "/" + str(dict_run["num_epistasis"]))
+        for str_stage, dict_stage in dict_run["stages"].items():
+            if dict_stage is None:
+                print("    {0:<30}{1:>12}".format(str_stage, "skipped"))
+                continue
+            print("    {0:<30}{1:>10.3f} s{2:>10.1f} MiB{3:>14.0f} genotypes/s".format(str_stage, dict_stage["second"], dict_stage["peak_rss"] / 2**20, dict_stage["throughput"]))
+
+    if args.baseline != "":
+        with open(args.baseline, "r") as file_inputFile:
+            list_regression = CompareWithBaseline(dict_report, json.load(file_inputFile), args.tolerance)
+        for str_regression in list_regression:
+            print("Regression: " + str_regression)
+        if len(list_regression) > 0:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+### the modelling and plotting stacks, which should not be loaded by the light entry points
+list_heavyModule = ["sklearn", "scipy.stats", "matplotlib", "pandas", "seaborn", "pymysql"]
+
+### key: name of a cold start; value: [the code run by a fresh interpreter, bool_light (the heavy modules should not be loaded)]
+dict_startupCase = {
+    "import": ["import genepi", True],
+    "cli_help": ["import sys\nsys.argv = ['GenEpi', '--help']\nfrom genepi.GenEpi import main\ntry:\n    main()\nexcept SystemExit:\n    pass", True],
+    "app": ["from genepi.step1_downloadUCSCDB import DownloadUCSCDB\nfrom genepi.tools.annotationCache import GetGenomeRegionFileName", True],
+    "worker_step2": ["import genepi.step2_estimateLD", True],
+    "worker_step4": ["import genepi.step4_singleGeneEpistasis_Logistic", False],
+}
+
+def MeasureStartup(str_code, int_repeat = 5):
+    """
+
+    To measure the cold start of a piece of code, each run is a fresh interpreter. The heavy modules loaded by the code are reported by the interpreter itself on the last line of its output.
+
+    Args:
+        str_code (str): The code run by the interpreter
+        int_repeat (int): The number of runs (default: 5)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - list_second (list): The wall time of each run in seconds
+            - list_loaded (list): The heavy modules loaded by the code
+
+    """
+
+    str_probe = str_code + "\nimport json, sys\nprint(json.dumps([str_module for str_module in " + repr(list_heavyModule) + " if str_module in sys.modules]))"
+    list_second = []
+    list_loaded = []
+    for idx_repeat in range(int_repeat):
+        float_start = time.perf_counter()
+        process = subprocess.run([sys.executable, "-c", str_probe], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        list_second.append(time.perf_counter() - float_start)
+        if process.returncode != 0:
+            raise RuntimeError("the cold start failed:\n" + process.stderr)
+        list_loaded = json.loads(process.stdout.strip().split("\n")[-1])
+
+    return list_second, list_loaded
+
+def BenchmarkStartup(list_case, int_repeat = 5, float_maxSecond = 0.0):
+    """
+
+    To benchmark the cold starts of the entry points of GenEpi. The median over int_repeat runs is reported, together with the one of a bare interpreter, and a light entry point fails if it loads a heavy module or if it takes more than float_maxSecond beyond the bare interpreter.
+
+    Args:
+        list_case (list): The names of the cold starts in dict_startupCase
+        int_repeat (int): The number of runs of each cold start (default: 5)
+        float_maxSecond (float): The limit of a light entry point in seconds beyond the bare interpreter (default: 0.0. No limit)
+
+    Returns:
+        (dict): dict_report
+
+            key: name of a cold start ("python" for the bare interpreter); value: {"median", "seconds", "loaded", "passed"}
+
+    """
+
+    dict_report = {}
+    list_second, list_loaded = MeasureStartup("pass", int_repeat)
+    float_base = sorted(list_second)[len(list_second) // 2]
+    dict_report["python"] = {"median": float_base, "seconds": list_second, "loaded": list_loaded, "passed": True}
+
+    for str_case in list_case:
+        str_code, bool_light = dict_startupCase[str_case]
+        list_second, list_loaded = MeasureStartup(str_code, int_repeat)
+        float_median = sorted(list_second)[len(list_second) // 2]
+        bool_passed = True
+        if bool_light:
+            bool_passed = len(list_loaded) == 0 and (float_maxSecond <= 0 or float_median - float_base <= float_maxSecond)
+        dict_report[str_case] = {"median": float_median, "seconds": list_second, "loaded": list_loaded, "passed": bool_passed}
+
+    return dict_report
+
+def ArgumentsParser():
+    ### define arguments
+    str_description = ''
+    'This script is a benchmark of the cold start of GenEpi, which guards the entry points against loading the modelling and plotting stacks'
+    parser = argparse.ArgumentParser(prog='benchmarkStartup', description=str_description)
+
+    ### define arguments
+    parser.add_argument("-c", required=False, nargs="+", default=list(dict_startupCase.keys()), choices=list(dict_startupCase.keys()), help="the cold starts to benchmark (default: all)")
+    parser.add_argument("-n", required=False, default=5, help="number of runs of each cold start (default: 5)")
+    parser.add_argument("-o", required=False, default="", help="filename of the output JSON report")
+    parser.add_argument("--max", required=False, default=0.0, type=float, help="limit of a light entry point in seconds beyond a bare interpreter (default: 0. No limit)")
+
+    return parser
+
+""""""""""""""""""""""""""""""
+# main function
+""""""""""""""""""""""""""""""
+def main(args=None):
+    ### obtain arguments from argument parser
+    args = ArgumentsParser().parse_args(args)
+
+    dict_report = BenchmarkStartup(args.c, int(args.n), args.max)
+    for str_case, dict_case in dict_report.items():
+        print("{0:<14}{1:>8.3f} s{2:>8}  {3}".format(str_case, dict_case["median"], "ok" if dict_case["passed"] else "FAILED", ",".join(dict_case["loaded"])))
+    if args.o != "":
+        with open(args.o, "w") as file_outputFile:
+            json.dump(dict_report, file_outputFile, indent=2)
+
+    if not all([dict_case["passed"] for dict_case in dict_report.values()]):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import numpy as np
+import scipy.sparse as sparse
+import scipy.special as special
+
+from sklearn.preprocessing import LabelBinarizer
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def IsBitPacked(np_genotype):
+    """
+
+    To check whether genotype data is in the bit-packed representation of PackBits.
+
+    Args:
+        np_genotype (ndarray or dict): Genotype data
+
+    Returns:
+        (bool): bool_bitPacked
+
+    """
+
+    return isinstance(np_genotype, dict) and "packed" in np_genotype
+
+def PackBits(np_genotype):
+    """
+
+    To pack 0/1 genotype features into bits. Each feature is stored as a row of bits over samples (the layout of `np.packbits`), padded with zeros to 64-bit words for the popcount kernels, so a feature takes one bit per sample instead of one `int8` byte.
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 features) with `int8` type
+
+    Returns:
+        (dict): dict_packed
+
+            - packed (ndarray): 2D array (features x bytes) containing the bits of each feature with `uint8` type
+            - num_sample (int): The number of samples
+
+    """
+
+    int_num_sample = np_genotype.shape[0]
+    int_num_byte = ((int_num_sample + 63) // 64) * 8
+    np_packed = np.zeros([np_genotype.shape[1], int_num_byte], dtype=np.uint8)
+    np_packed[:, :(int_num_sample + 7) // 8] = np.packbits(np_genotype.T != 0, axis=1)
+
+    return {"packed": np_packed, "num_sample": int_num_sample}
+
+def PackMask(np_mask):
+    """
+
+    To pack a boolean mask of samples (e.g. the cases of the phenotype) into bits, in the layout of PackBits.
+
+    Args:
+        np_mask (ndarray): 1D array containing the mask of samples with `bool` type
+
+    Returns:
+        (ndarray): np_packedMask
+
+            1D array containing the bits of the mask with `uint8` type
+
+    """
+
+    return PackBits(np.asarray(np_mask).reshape(-1, 1))["packed"][0]
+
+def UnpackBits(dict_packed, np_selectedIdx = None):
+    """
+
+    To unpack bit-packed genotype data into `int8` features.
+
+    Args:
+        dict_packed (dict): Bit-packed genotype data by PackBits
+        np_selectedIdx (ndarray): The indices (or boolean mask) of the features to unpack (default: None. All of the features)
+
+    Returns:
+        (ndarray): np_genotype
+
+            2D array containing genotype data (0/1 features) with `int8` type
+
+    """
+
+    np_packed = dict_packed["packed"] if np_selectedIdx is None else dict_packed["packed"][np_selectedIdx]
+
+    return np.ascontiguousarray(np.unpackbits(np_packed, axis=1, count=dict_packed["num_sample"]).T).view(np.int8)
+
+def GetShape(np_genotype):
+    """
+
+    To get the shape (samples x features) of genotype data in either the `int8` or the bit-packed representation.
+
+    Args:
+        np_genotype (ndarray or dict): Genotype data
+
+    Returns:
+        (tuple): (int_num_sample, int_num_feature)
+
+    """
+
+    if IsBitPacked(np_genotype):
+        return np_genotype["num_sample"], np_genotype["packed"].shape[0]
+
+    return np_genotype.shape[0], np_genotype.shape[1]
+
+def SelectFeature(dict_packed, np_selectedIdx):
+    """
+
+    To select features of bit-packed genotype data.
+
+    Args:
+        dict_packed (dict): Bit-packed genotype data by PackBits
+        np_selectedIdx (ndarray): The indices (or boolean mask) of the selected features
+
+    Returns:
+        (dict): dict_packed
+
+    """
+
+    return {"packed": dict_packed["packed"][np_selectedIdx], "num_sample": dict_packed["num_sample"]}
+
+def PopCount(np_packed):
+    """
+
+    To count the set bits of each row of bit-packed data, 64 bits at a time.
+
+    Args:
+        np_packed (ndarray): 2D array (rows x bytes, bytes padded to 64-bit words) with `uint8` type
+
+    Returns:
+        (ndarray): np_count
+
+            1D array containing the number of set bits of each row with `int64` type
+
+    """
+
+    np_word = np.ascontiguousarray(np_packed).view(np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(np_word).sum(axis=-1, dtype=np.int64)
+
+    ### SWAR popcount of 64-bit words
+    np_word = np_word - ((np_word >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    np_word = (np_word & np.uint64(0x3333333333333333)) + ((np_word >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    np_word = (np_word + (np_word >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+    np_word = (np_word * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+    return np_word.sum(axis=-1, dtype=np.int64)
+
+def CountFeature(dict_packed, np_packedMask = None, int_chunkSize = 4096):
+    """
+
+    To count the samples having each feature, or the samples having each feature within a mask (e.g. the case counts with the mask of cases), by popcount.
+
+    Args:
+        dict_packed (dict): Bit-packed genotype data by PackBits
+        np_packedMask (ndarray): The bits of a mask of samples by PackMask (default: None. All samples)
+        int_chunkSize (int): The number of features counted at once (default: 4096)
+
+    Returns:
+        (ndarray): np_count
+
+            1D array containing the count of each feature with `int64` type
+
+    """
+
+    np_packed = dict_packed["packed"]
+    if np_packedMask is None:
+        return PopCount(np_packed)
+
+    np_count = np.empty([np_packed.shape[0]], dtype=np.int64)
+    for idx_chunkStart in range(0, np_packed.shape[0], int_chunkSize):
+        np_count[idx_chunkStart:idx_chunkStart + int_chunkSize] = PopCount(np_packed[idx_chunkStart:idx_chunkStart + int_chunkSize] & np_packedMask)
+
+    return np_count
+
+def AndFeature(dict_packed, np_idxA, np_idxB, int_chunkSize = 4096):
+    """
+
+    To build the product terms of pairs of features (the interaction terms of two-element combinatorial encoding) by bitwise AND, without unpacking them.
+
+    Args:
+        dict_packed (dict): Bit-packed genotype data by PackBits
+        np_idxA (ndarray): 1D array containing the index of the first feature of each pair
+        np_idxB (ndarray): 1D array containing the index of the second feature of each pair
+        int_chunkSize (int): The number of pairs built at once (default: 4096)
+
+    Returns:
+        (dict): dict_packed
+
+            Bit-packed product terms
+
+    """
+
+    np_packed = dict_packed["packed"]
+    np_product = np.empty([np_idxA.shape[0], np_packed.shape[1]], dtype=np.uint8)
+    for idx_chunkStart in range(0, np_idxA.shape[0], int_chunkSize):
+        idx_chunkEnd = idx_chunkStart + int_chunkSize
+        np.bitwise_and(np_packed[np_idxA[idx_chunkStart:idx_chunkEnd]], np_packed[np_idxB[idx_chunkStart:idx_chunkEnd]], out=np_product[idx_chunkStart:idx_chunkEnd])
+
+    return {"packed": np_product, "num_sample": dict_packed["num_sample"]}
+
+def ConcatenateFeature(list_packed):
+    """
+
+    To concatenate the features of bit-packed genotype data of the same samples.
+
+    Args:
+        list_packed (list): Bit-packed genotype data by PackBits
+
+    Returns:
+        (dict): dict_packed
+
+    """
+
+    return {"packed": np.concatenate([item["packed"] for item in list_packed], axis=0), "num_sample": list_packed[0]["num_sample"]}
+
+def GetVariance(dict_packed):
+    """
+
+    To get the variance of each 0/1 feature, p * (1 - p) with the frequency p of the feature.
+
+    Args:
+        dict_packed (dict): Bit-packed genotype data by PackBits
+
+    Returns:
+        (ndarray): np_variance
+
+            1D array containing the variance of each feature with `float` type
+
+    """
+
+    np_frequency = CountFeature(dict_packed) / float(dict_packed["num_sample"])
+
+    return np_frequency * (1 - np_frequency)
+
+def GetChi2(dict_packed, np_y):
+    """
+
+    The chi-square test of each 0/1 feature against the class labels, the same statistic as sklearn's chi2, with the observed counts of each class obtained by popcount.
+
+    Args:
+        dict_packed (dict): Bit-packed genotype data by PackBits
+        np_y (ndarray): 1D array containing the class labels with `int` type
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_chi2 (ndarray): 1D array containing the chi-square statistic of each feature
+            - np_pValue (ndarray): 1D array containing the p-value of each feature
+
+    """
+
+    np_Y = LabelBinarizer().fit_transform(np_y)
+    if np_Y.shape[1] == 1:
+        np_Y = np.append(1 - np_Y, np_Y, axis=1)
+
+    np_count_feature = CountFeature(dict_packed)
+    np_observed = np.stack([CountFeature(dict_packed, PackMask(np_Y[:, idx_class] == 1)) for idx_class in range(np_Y.shape[1])], axis=0).astype(np.float64)
+    np_expected = np_Y.mean(axis=0).reshape(-1, 1) * np_count_feature[np.newaxis, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np_chi2 = np.sum((np_observed - np_expected)**2 / np_expected, axis=0)
+
+    return np_chi2, special.chdtrc(np_observed.shape[0] - 1, np_chi2)
+
+def BitPackedToCSR(dict_packed, dtype = np.float64, int_chunkByte = 2**26):
+    """
+
+    To convert bit-packed genotype data into a sparse matrix (samples x features), unpacking a chunk of samples at a time so the features are never densified at once.
+
+    Args:
+        dict_packed (dict): Bit-packed genotype data by PackBits
+        dtype (type): The type of the sparse matrix (default: np.float64)
+        int_chunkByte (int): The bytes of the unpacked chunk of samples (default: 2**26)
+
+    Returns:
+        (csr_matrix): sp_X
+
+    """
+
+    np_packed = dict_packed["packed"]
+    int_num_sample = dict_packed["num_sample"]
+    int_num_byte_chunk = max(int_chunkByte // (8 * max(np_packed.shape[0], 1)), 1)
+    list_sp_X = []
+    for idx_byteStart in range(0, (int_num_sample + 7) // 8, int_num_byte_chunk):
+        int_num_sample_chunk = min(int_num_byte_chunk * 8, int_num_sample - idx_byteStart * 8)
+        np_chunk = np.unpackbits(np_packed[:, idx_byteStart:idx_byteStart + int_num_byte_chunk], axis=1, count=int_num_sample_chunk)
+        list_sp_X.append(sparse.csr_matrix(np_chunk.T, dtype=dtype))
+    if len(list_sp_X) == 0:
+        return sparse.csr_matrix((int_num_sample, np_packed.shape[0]), dtype=dtype)
+
+    return sparse.vstack(list_sp_X, format="csr")
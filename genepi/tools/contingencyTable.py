@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import numpy as np
+import scipy.special as special
+
+from genepi.tools.bitPacked import IsBitPacked
+from genepi.tools.bitPacked import PackMask
+from genepi.tools.bitPacked import CountFeature
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GenerateContingencyTableBatch(np_genotype, np_phenotype):
+    """
+
+    Generating the 2x2 contingency tables of all features at once. The case counts of the features are obtained with one matrix product of the features against the phenotype (or by popcount for bit-packed features), and each table is laid out as the one of GenerateContingencyTable.
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 features) with `int8` type, or bit-packed data by PackBits
+        np_phenotype (ndarray): 1D array containing phenotype data (0/1) with `float` type
+
+    Returns:
+        (ndarray): np_contingency
+
+            3D array (features x 2 x 2) containing [[feature & case, feature & control], [no feature & case, no feature & control]] with `int` type
+
+    """
+
+    np_case = (np.asarray(np_phenotype) == 1)
+    int_num_sample = np_case.shape[0]
+    int_num_case = int(np.sum(np_case))
+    if IsBitPacked(np_genotype):
+        np_count = CountFeature(np_genotype)
+        np_count_case = CountFeature(np_genotype, PackMask(np_case))
+    else:
+        ### float32 holds the exact counts of up to 2**24 samples
+        dtype_count = np.float32 if int_num_sample < 2**24 else np.float64
+        np_count = np.sum(np_genotype, axis=0, dtype=np.int64)
+        np_count_case = np.rint(np.dot(np_case.astype(dtype_count), np_genotype.astype(dtype_count, copy=False))).astype(np.int64)
+
+    np_contingency = np.empty([np_count.shape[0], 2, 2], dtype=np.int64)
+    np_contingency[:, 0, 0] = np_count_case
+    np_contingency[:, 0, 1] = np_count - np_count_case
+    np_contingency[:, 1, 0] = int_num_case - np_count_case
+    np_contingency[:, 1, 1] = int_num_sample - int_num_case - np_count + np_count_case
+
+    return np_contingency
+
+def GetOddsRatio(np_contingency):
+    """
+
+    To get the odds ratios of 2x2 contingency tables, the same as the ones of `scipy.stats.fisher_exact`: NaN if a row or column of the table is empty, and infinity if the denominator is zero.
+
+    Args:
+        np_contingency (ndarray): 3D array (features x 2 x 2) by GenerateContingencyTableBatch
+
+    Returns:
+        (ndarray): np_oddsRatio
+
+            1D array containing the odds ratio of each feature with `float` type
+
+    """
+
+    np_numerator = np_contingency[:, 0, 0] * np_contingency[:, 1, 1]
+    np_denominator = np_contingency[:, 1, 0] * np_contingency[:, 0, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np_oddsRatio = np.where(np_denominator > 0, np_numerator / np.maximum(np_denominator, 1), np.inf)
+    np_isEmpty = np.any(np.sum(np_contingency, axis=1) == 0, axis=1) | np.any(np.sum(np_contingency, axis=2) == 0, axis=1)
+    np_oddsRatio[np_isEmpty] = np.nan
+
+    return np_oddsRatio
+
+def GetChi2PValue(np_contingency):
+    """
+
+    To get the p-values of the chi-square test of 2x2 contingency tables, the same statistic as sklearn's chi2 of the features against the binary phenotype.
+
+    Args:
+        np_contingency (ndarray): 3D array (features x 2 x 2) by GenerateContingencyTableBatch
+
+    Returns:
+        (ndarray): np_pValue
+
+            1D array containing the p-value of each feature with `float` type
+
+    """
+
+    np_num_sample = np.sum(np_contingency, axis=(1, 2))
+    np_count = np_contingency[:, 0, 0] + np_contingency[:, 0, 1]
+    ### the observed and expected counts of the feature in the controls and the cases
+    np_observed = np.stack([np_contingency[:, 0, 1], np_contingency[:, 0, 0]], axis=0).astype(np.float64)
+    np_classProb = np.stack([np_contingency[:, 0, 1] + np_contingency[:, 1, 1], np_contingency[:, 0, 0] + np_contingency[:, 1, 0]], axis=0) / np_num_sample[np.newaxis, :].astype(float)
+    np_expected = np_classProb * np_count[np.newaxis, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np_chi2 = np.sum((np_observed - np_expected)**2 / np_expected, axis=0)
+
+    return special.chdtrc(1, np_chi2)
+
+def GetFeatureStatistics(np_genotype, np_phenotype):
+    """
+
+    The statistics of the features reported in the result tables, computed for all features at once.
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 features) with `int8` type, or bit-packed data by PackBits
+        np_phenotype (ndarray): 1D array containing phenotype data (0/1) with `float` type
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_oddsRatio (ndarray): 1D array containing the odds ratio of each feature
+            - np_pValue (ndarray): 1D array containing the chi-square p-value of each feature
+            - np_genotypeFreq (ndarray): 1D array containing the genotype frequency of each feature
+
+    """
+
+    np_contingency = GenerateContingencyTableBatch(np_genotype, np_phenotype)
+    np_genotypeFreq = (np_contingency[:, 0, 0] + np_contingency[:, 0, 1]).astype(float) / np.asarray(np_phenotype).shape[0]
+
+    return GetOddsRatio(np_contingency), GetChi2PValue(np_contingency), np_genotypeFreq
@@ -13,6 +13,9 @@ import os
 import genepi
 import numpy as np
 
+from genepi.tools.annotationCache import GetAnnotationCacheFileName
+from genepi.tools.annotationCache import GetGenomeRegionFileName
+
 """"""""""""""""""""""""""""""
 # define functions 
 """"""""""""""""""""""""""""""
@@ -54,13 +57,14 @@ def main(args=None):
         for line in file_inputFile:
             list_gene.append(line.strip())
     
-    ### switch genome build
-    if args.b == "hg38":
-        genepi.DownloadUCSCDB(str_hgbuild=args.b)
+    ### switch genome build, the database is only downloaded if the annotation cache of the genome build is not built
+    str_inputFileName_UCSCDB = GetAnnotationCacheFileName(args.b)
+    if str_inputFileName_UCSCDB == "":
+        str_inputFileName_UCSCDB = GetGenomeRegionFileName(args.b) if args.b == "hg19" else genepi.DownloadUCSCDB(str_hgbuild=args.b)
     
     ### load UCSC Genome Database
     list_UCSCGenomeDatabase = []
-    with open(os.path.join(os.path.dirname(genepi.__file__), "UCSCGenomeDatabase.txt"), "r") as file_inputFile:
+    with open(str_inputFileName_UCSCDB, "r") as file_inputFile:
         for line in file_inputFile:
             list_UCSCGenomeDatabase.append(line.strip().split(","))
     np_UCSCGenomeDatabase = np.array(list_UCSCGenomeDatabase)
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import os
+import numpy as np
+
+from genepi.tools.bitPacked import IsBitPacked
+from genepi.tools.bitPacked import PackBits
+from genepi.tools.bitPacked import UnpackBits
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetFeatureContainerFileName(str_outputFilePath):
+    """
+
+    To get the file names of the feature container of a folder. The container holds the features of the feature files (e.g. <gene>_Feature.csv of step4, Feature.csv of step5) of the folder in one append-only binary file, each feature as a row of bits over samples (the layout of PackBits), and a name index whose records locate the rows of each feature file.
+
+    Args:
+        str_outputFilePath (str): File path of the feature files
+
+    Returns:
+        (list): [str_fileName_data, str_fileName_index]
+
+    """
+
+    return [os.path.join(str_outputFilePath, "All_Feature.bin"), os.path.join(str_outputFilePath, "All_Feature.index.csv")]
+
+def GetFeatureFileStamp(str_fileName_feature):
+    """
+
+    To get the stamp (size and modification time) of a feature file, a record of the container is only used while its feature file keeps the stamp, so an edited or rewritten feature file is read as text instead.
+
+    Args:
+        str_fileName_feature (str): File name of the feature file
+
+    Returns:
+        (str): str_stamp
+
+    """
+
+    stat_feature = os.stat(str_fileName_feature)
+
+    return str(stat_feature.st_size) + ":" + str(stat_feature.st_mtime_ns)
+
+def OpenFeatureContainer(str_outputFilePath, bool_resume = False):
+    """
+
+    To open the feature container of a folder for appending. The container is started over unless resuming from an existing one, whose broken last record (e.g. the process was killed while writing) is dropped.
+
+    Args:
+        str_outputFilePath (str): File path of the feature files
+        bool_resume (bool): Keep the records of the existing container (default: False)
+
+    Returns:
+        None
+
+    """
+
+    str_fileName_data, str_fileName_index = GetFeatureContainerFileName(str_outputFilePath)
+    if bool_resume and os.path.isfile(str_fileName_data) and os.path.isfile(str_fileName_index):
+        with open(str_fileName_index, "r") as file_inputFile:
+            list_line = file_inputFile.readlines()
+        if len(list_line) > 0 and not list_line[-1].endswith("\n"):
+            with open(str_fileName_index, "w") as file_outputFile:
+                file_outputFile.writelines(list_line[:-1])
+        return
+
+    open(str_fileName_data, "wb").close()
+    with open(str_fileName_index, "w") as file_outputFile:
+        file_outputFile.writelines("Name,Stamp,NumSample,Offset,NumFeature,rsid" + "\n")
+
+def AppendFeatureContainer(str_outputFilePath, str_fileName_feature, np_genotype_rsid, np_genotype):
+    """
+
+    To append the features of a feature file to the feature container of its folder. The bits are written before the record of the name index, so a record always refers to complete rows.
+
+    Args:
+        str_outputFilePath (str): File path of the feature files
+        str_fileName_feature (str): File name of the feature file, which should be written already
+        np_genotype_rsid (ndarray): 1D array containing rsid of the features with `str` type
+        np_genotype (ndarray): 2D array containing the features (0/1) with `int8` type, or bit-packed data by PackBits
+
+    Returns:
+        None
+
+    """
+
+    str_fileName_data, str_fileName_index = GetFeatureContainerFileName(str_outputFilePath)
+    if not os.path.isfile(str_fileName_data) or not os.path.isfile(str_fileName_index):
+        OpenFeatureContainer(str_outputFilePath)
+    dict_packed = np_genotype if IsBitPacked(np_genotype) else PackBits(np_genotype)
+
+    with open(str_fileName_data, "ab") as file_outputFile:
+        int_offset = file_outputFile.seek(0, os.SEEK_END)
+        file_outputFile.write(np.ascontiguousarray(dict_packed["packed"]).tobytes())
+        file_outputFile.flush()
+        os.fsync(file_outputFile.fileno())
+    with open(str_fileName_index, "a") as file_outputFile:
+        str_name = os.path.splitext(os.path.basename(str_fileName_feature))[0]
+        file_outputFile.writelines(str_name + "," + GetFeatureFileStamp(str_fileName_feature) + "," + str(dict_packed["num_sample"]) + "," + str(int_offset) + "," + str(dict_packed["packed"].shape[0]) + "," + " ".join(np_genotype_rsid) + "\n")
+        file_outputFile.flush()
+        os.fsync(file_outputFile.fileno())
+
+def GetFeatureShardFileName(str_fileName_feature):
+    """
+
+    To get the file name of the shard of a feature file, the bit-packed copy of its features written by a worker process and appended to the container by the parent process.
+
+    Args:
+        str_fileName_feature (str): File name of the feature file
+
+    Returns:
+        (str): str_fileName_shard
+
+    """
+
+    return os.path.splitext(str_fileName_feature)[0] + ".npz"
+
+def WriteFeatureShard(str_fileName_feature, np_genotype_rsid, np_genotype):
+    """
+
+    To write the shard of a feature file, next to the feature file which should be written already.
+
+    Args:
+        str_fileName_feature (str): File name of the feature file
+        np_genotype_rsid (ndarray): 1D array containing rsid of the features with `str` type
+        np_genotype (ndarray): 2D array containing the features (0/1) with `int8` type
+
+    Returns:
+        None
+
+    """
+
+    dict_packed = PackBits(np_genotype)
+    np.savez(GetFeatureShardFileName(str_fileName_feature), packed=dict_packed["packed"], num_sample=dict_packed["num_sample"], rsid=np.array(np_genotype_rsid, dtype=str))
+
+def AppendFeatureShard(str_outputFilePath, str_fileName_feature):
+    """
+
+    To append the shard of a feature file to the feature container of its folder and remove the shard. Nothing is done if the feature file has no shard (e.g. the gene has no feature).
+
+    Args:
+        str_outputFilePath (str): File path of the feature files
+        str_fileName_feature (str): File name of the feature file
+
+    Returns:
+        None
+
+    """
+
+    str_fileName_shard = GetFeatureShardFileName(str_fileName_feature)
+    if not os.path.isfile(str_fileName_shard) or not os.path.isfile(str_fileName_feature):
+        return
+
+    with np.load(str_fileName_shard) as npz_shard:
+        dict_packed = {"packed": npz_shard["packed"], "num_sample": int(npz_shard["num_sample"])}
+        np_genotype_rsid = npz_shard["rsid"]
+    AppendFeatureContainer(str_outputFilePath, str_fileName_feature, np_genotype_rsid, dict_packed)
+    os.remove(str_fileName_shard)
+
+def LoadFeatureContainer(str_outputFilePath):
+    """
+
+    To load the records of the feature container of a folder, the data file is mapped into memory once and each record is a view of its rows. The last record of a name is kept, and a broken record is ignored.
+
+    Args:
+        str_outputFilePath (str): File path of the feature files
+
+    Returns:
+        (dict): dict_container
+
+            key: name of the feature file (without extension); value: {"stamp", "rsid", "packed"}, where "packed" is bit-packed data by PackBits
+
+    """
+
+    dict_container = {}
+    str_fileName_data, str_fileName_index = GetFeatureContainerFileName(str_outputFilePath)
+    if not os.path.isfile(str_fileName_data) or not os.path.isfile(str_fileName_index):
+        return dict_container
+    int_size = os.path.getsize(str_fileName_data)
+    if int_size == 0:
+        return dict_container
+
+    np_data = np.memmap(str_fileName_data, dtype=np.uint8, mode="r")
+    with open(str_fileName_index, "r") as file_inputFile:
+        file_inputFile.readline()
+        for line in file_inputFile:
+            list_line = line.rstrip("\n").split(",")
+            if not line.endswith("\n") or len(list_line) != 6:
+                continue
+            try:
+                int_num_sample, int_offset, int_num_feature = int(list_line[2]), int(list_line[3]), int(list_line[4])
+            except ValueError:
+                continue
+            int_num_byte = ((int_num_sample + 63) // 64) * 8
+            if int_offset + int_num_feature * int_num_byte > int_size:
+                continue
+            np_packed = np_data[int_offset:int_offset + int_num_feature * int_num_byte].reshape(int_num_feature, int_num_byte)
+            list_rsid = list_line[5].split(" ") if int_num_feature > 0 else []
+            dict_container[list_line[0]] = {"stamp": list_line[1], "rsid": list_rsid, "packed": {"packed": np_packed, "num_sample": int_num_sample}}
+
+    return dict_container
+
+def LoadFeature(dict_container, str_fileName_feature):
+    """
+
+    To load the features of a feature file, from the container if it holds the current features of the file, else from the text of the file.
+
+    Args:
+        dict_container (dict): The records of the container by LoadFeatureContainer
+        str_fileName_feature (str): File name of the feature file
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_genotype_rsid (ndarray): 1D array containing rsid of the features with `str` type
+            - np_genotype (ndarray): 2D array containing the features with `int8` type
+
+    """
+
+    str_name = os.path.splitext(os.path.basename(str_fileName_feature))[0]
+    if str_name in dict_container and dict_container[str_name]["stamp"] == GetFeatureFileStamp(str_fileName_feature):
+        return np.array(dict_container[str_name]["rsid"]), UnpackBits(dict_container[str_name]["packed"])
+
+    list_genotype = []
+    with open(str_fileName_feature, "r") as file_inputFile:
+        ### grep the header
+        list_rsids = file_inputFile.readline().strip().split(",")
+        ### read feature
+        for line in file_inputFile:
+            list_genotype.append(np.array([float(x) for x in line.strip().split(",")], dtype='int'))
+
+    return np.array(list_rsids), np.array(list_genotype, dtype=np.int8).reshape(-1, len(list_rsids))
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import collections
+import gzip
+import os
+import multiprocessing as mp
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+### the file name extensions of compressed .gen files, gzip and bgzip (BGZF, a series of gzip members) are read by the same decompressor
+list_compressedExtension = [".gz", ".bgz"]
+
+def GetGenBaseName(str_inputFileName_genotype):
+    """
+
+    To get the base name of a .gen file without its compression extension (e.g. sample.gen.gz -> sample.gen), the outputs derived from the .gen file (_LDReduced.gen, _subset_1.gen, ...) are named after it and always written uncompressed.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+
+    Returns:
+        (str): str_baseName
+
+    """
+
+    str_baseName = os.path.basename(str_inputFileName_genotype)
+    for str_extension in list_compressedExtension:
+        if str_baseName.endswith(str_extension):
+            return str_baseName[:-len(str_extension)]
+
+    return str_baseName
+
+def OpenGenFile(str_inputFileName_genotype):
+    """
+
+    To open a plain, gzip or bgzip .gen file for reading bytes. The raw file is returned as well, its position is the compressed byte offset which is used to report progress.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+
+    Returns:
+        (tuple): tuple containing:
+
+            - file_inputFile (file): The decompressed stream of the .gen file (binary mode)
+            - file_rawFile (file): The raw file
+
+    """
+
+    file_rawFile = open(str_inputFileName_genotype, "rb")
+    if file_rawFile.read(2) == b"\x1f\x8b":
+        file_rawFile.seek(0)
+        return gzip.GzipFile(fileobj=file_rawFile, mode="rb"), file_rawFile
+    file_rawFile.seek(0)
+
+    return file_rawFile, file_rawFile
+
+def IterGenBlock(str_inputFileName_genotype, int_blockSize = 2**22, bool_decode = True):
+    """
+
+    To iterate over the lines of a plain, gzip or bgzip .gen file in blocks of about int_blockSize (decompressed) bytes. A block always ends at a line break, and the progress of each block is taken from the compressed byte offset, so the file is never scanned in advance for counting its lines.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        int_blockSize (int): The bytes read at a time (default: 2**22)
+        bool_decode (bool): Yield the lines as `str` instead of `bytes` (default: True)
+
+    Returns:
+        (generator): Yielding (list_line, float_progress) of each block
+
+            - list_line (list): The lines of the block (with their line breaks)
+            - float_progress (float): The fraction of the file which is read (0 to 1)
+
+    """
+
+    int_size = max(os.path.getsize(str_inputFileName_genotype), 1)
+    file_inputFile, file_rawFile = OpenGenFile(str_inputFileName_genotype)
+    try:
+        bytes_remainder = b""
+        while True:
+            bytes_block = file_inputFile.read(int_blockSize)
+            if len(bytes_block) == 0:
+                break
+            ### carry the incomplete last line to the next block
+            idx_lastBreak = bytes_block.rfind(b"\n")
+            if idx_lastBreak < 0:
+                bytes_remainder = bytes_remainder + bytes_block
+                continue
+            bytes_block, bytes_remainder = bytes_remainder + bytes_block[:idx_lastBreak + 1], bytes_block[idx_lastBreak + 1:]
+            list_line = bytes_block.splitlines(True)
+            yield ([line.decode() for line in list_line] if bool_decode else list_line), min(float(file_rawFile.tell()) / int_size, 1.0)
+        if len(bytes_remainder) > 0:
+            list_line = bytes_remainder.splitlines(True)
+            yield ([line.decode() for line in list_line] if bool_decode else list_line), 1.0
+    finally:
+        file_inputFile.close()
+        file_rawFile.close()
+
+def MapGenBlock(function_decode, str_inputFileName_genotype, int_nJobs = 1, int_blockSize = 2**22):
+    """
+
+    To decode the blocks of a .gen file by IterGenBlock in a process pool. The blocks are decoded while the next ones are read, the results are yielded in the order of the file, and at most 2 * int_nJobs blocks are in flight, so the memory does not grow with the file.
+
+    Args:
+        function_decode (function): The function which decodes a list of lines of .gen file (e.g. DecodeGenHardCall), it must be picklable if int_nJobs > 1
+        str_inputFileName_genotype (str): File name of input genotype data
+        int_nJobs (int): The number of decoding processes (default: 1)
+        int_blockSize (int): The bytes read at a time (default: 2**22)
+
+    Returns:
+        (generator): Yielding (result, float_progress) of each block
+
+            - result: The return value of function_decode of the block
+            - float_progress (float): The fraction of the file which is read (0 to 1)
+
+    """
+
+    if int_nJobs <= 1:
+        for list_line, float_progress in IterGenBlock(str_inputFileName_genotype, int_blockSize):
+            yield function_decode(list_line), float_progress
+        return
+
+    mp_pool = mp.Pool(int_nJobs)
+    try:
+        deque_pending = collections.deque()
+        for list_line, float_progress in IterGenBlock(str_inputFileName_genotype, int_blockSize):
+            deque_pending.append((mp_pool.apply_async(function_decode, (list_line,)), float_progress))
+            if len(deque_pending) >= 2 * int_nJobs:
+                result, float_progress = deque_pending.popleft()
+                yield result.get(), float_progress
+        while len(deque_pending) > 0:
+            result, float_progress = deque_pending.popleft()
+            yield result.get(), float_progress
+        mp_pool.close()
+    finally:
+        mp_pool.terminate()
+        mp_pool.join()
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import hashlib
+import os
+import uuid
+import numpy as np
+
+### interval indices loaded by LoadAnnotationIndex in current process
+dict_annotationIndex = {}
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetAnnotationIndexFileName(str_inputFileName_UCSCDB):
+    """
+
+    To get the file name of the serialized interval index which belongs to a genome region file. The index is placed next to its genome region file, except the one of the regions shipped with the package, which is placed in the annotation cache (see GetAnnotationCachePath) so nothing is written into the package folder.
+
+    Args:
+        str_inputFileName_UCSCDB (str): File name of input genome regions
+
+    Returns:
+        (str): File name of the serialized interval index (.npz)
+
+    """
+
+    ### imported here, annotationCache imports this module
+    from genepi.tools.annotationCache import GetAnnotationCachePath
+
+    str_inputFileName_UCSCDB = os.path.abspath(str_inputFileName_UCSCDB)
+    str_fileName_index = os.path.splitext(os.path.basename(str_inputFileName_UCSCDB))[0] + ".index.npz"
+    if os.path.dirname(str_inputFileName_UCSCDB) == os.path.dirname(os.path.dirname(os.path.abspath(__file__))):
+        return os.path.join(GetAnnotationCachePath("bundled"), str_fileName_index)
+
+    return os.path.join(os.path.dirname(str_inputFileName_UCSCDB), str_fileName_index)
+
+def BuildAnnotationIndex(str_inputFileName_UCSCDB):
+    """
+
+    To build an interval index over a genome region file (chromosome, start, end, strand, gene symbol). The regions are sorted by chromosome and start position, and the running maximum of the end positions within each chromosome is kept, so that overlapping regions can be queried by binary search.
+
+    Args:
+        str_inputFileName_UCSCDB (str): File name of input genome regions
+
+    Returns:
+        (dict): dict_index
+
+            A dictionary of arrays with keys "chromosome", "start", "end", "maxEnd" (`int64` type), "symbol" (`str` type) and "checksum" (see GetAnnotationIndexChecksum), sorted by chromosome and start position
+
+    """
+
+    ### load genome regions
+    list_UCSCGenomeDatabase = []
+    with open(str_inputFileName_UCSCDB, "r") as file_inputFile:
+        for line in file_inputFile:
+            list_UCSCGenomeDatabase.append(line.strip().split(","))
+    np_UCSCGenomeDatabase = np.array(list_UCSCGenomeDatabase, dtype=str).reshape(-1, 5)
+
+    ### sort regions by chromosome and start position (stable, so the order in the file is kept for ties)
+    np_chromosome = np_UCSCGenomeDatabase[:, 0].astype(np.int64)
+    np_start = np_UCSCGenomeDatabase[:, 1].astype(np.int64)
+    np_end = np_UCSCGenomeDatabase[:, 2].astype(np.int64)
+    np_order = np.lexsort((np_start, np_chromosome))
+    np_chromosome = np_chromosome[np_order]
+    np_start = np_start[np_order]
+    np_end = np_end[np_order]
+    np_symbol = np_UCSCGenomeDatabase[np_order, 4]
+
+    ### running maximum of end positions within each chromosome
+    np_maxEnd = np.empty_like(np_end)
+    for int_chromosome in np.unique(np_chromosome):
+        int_idx_start = np.searchsorted(np_chromosome, int_chromosome, side="left")
+        int_idx_end = np.searchsorted(np_chromosome, int_chromosome, side="right")
+        np_maxEnd[int_idx_start:int_idx_end] = np.maximum.accumulate(np_end[int_idx_start:int_idx_end])
+
+    dict_index = {"chromosome": np_chromosome, "start": np_start, "end": np_end, "maxEnd": np_maxEnd, "symbol": np_symbol}
+    dict_index["checksum"] = np.array(GetAnnotationIndexChecksum(dict_index))
+
+    return dict_index
+
+def GetAnnotationIndexChecksum(dict_index):
+    """
+
+    To get the checksum (SHA-1) of the arrays of an interval index, so that a damaged or partially written index is never used.
+
+    Args:
+        dict_index (dict): The interval index from BuildAnnotationIndex
+
+    Returns:
+        (str): str_checksum
+
+    """
+
+    hash_sha1 = hashlib.sha1()
+    for key in ["chromosome", "start", "end", "maxEnd", "symbol"]:
+        np_array = np.ascontiguousarray(dict_index[key])
+        hash_sha1.update((key + ":" + np_array.dtype.str + ":" + str(np_array.shape)).encode("utf-8"))
+        hash_sha1.update(np_array.tobytes())
+
+    return hash_sha1.hexdigest()
+
+def LoadAnnotationIndex(str_inputFileName_UCSCDB, bool_overwrite = False):
+    """
+
+    To load the serialized interval index of a genome region file. The index is built and saved if it doesn't exist, is older than the genome region file or fails its checksum; if the folder is not writable, the index is only kept in memory. An index is loaded once per process.
+
+    Args:
+        str_inputFileName_UCSCDB (str): File name of input genome regions
+        bool_overwrite (bool): Rebuild the index even if an up-to-date one exists (default: False)
+
+    Returns:
+        (dict): dict_index
+
+            A dictionary of arrays with keys "chromosome", "start", "end", "maxEnd", "symbol" and "checksum", see BuildAnnotationIndex
+
+    """
+
+    str_fileName_index = GetAnnotationIndexFileName(str_inputFileName_UCSCDB)
+    if not bool_overwrite and os.path.isfile(str_fileName_index) and os.path.getmtime(str_fileName_index) >= os.path.getmtime(str_inputFileName_UCSCDB):
+        tuple_key = (str_fileName_index, os.path.getmtime(str_fileName_index))
+        if tuple_key in dict_annotationIndex:
+            return dict_annotationIndex[tuple_key]
+        try:
+            with np.load(str_fileName_index) as np_index:
+                dict_index = {key: np_index[key] for key in np_index.files}
+            if "checksum" in dict_index and str(dict_index["checksum"]) == GetAnnotationIndexChecksum(dict_index):
+                dict_annotationIndex[tuple_key] = dict_index
+                return dict_index
+        except (OSError, ValueError, KeyError):
+            pass
+        print("Warning: the interval index of " + str_inputFileName_UCSCDB + " is outdated or damaged, rebuild it")
+
+    dict_index = BuildAnnotationIndex(str_inputFileName_UCSCDB)
+
+    ### write to a temporary file first, then rename it, so that a broken write never leaves a valid-looking index (concurrent runs write different temporary files)
+    str_fileName_index_tmp = str_fileName_index + "." + uuid.uuid4().hex + ".tmp.npz"
+    try:
+        os.makedirs(os.path.dirname(str_fileName_index), exist_ok=True)
+        np.savez(str_fileName_index_tmp, **dict_index)
+        os.replace(str_fileName_index_tmp, str_fileName_index)
+        dict_annotationIndex[(str_fileName_index, os.path.getmtime(str_fileName_index))] = dict_index
+    except OSError:
+        if os.path.isfile(str_fileName_index_tmp):
+            os.remove(str_fileName_index_tmp)
+
+    return dict_index
+
+def GetChromosomeRange(dict_index, int_chromosome):
+    """
+
+    To get the range of regions on a chromosome in the interval index.
+
+    Args:
+        dict_index (dict): The interval index from LoadAnnotationIndex
+        int_chromosome (int): The chromosome
+
+    Returns:
+        (tuple): tuple containing:
+
+            - int_idx_start (int): The first region on the chromosome
+            - int_idx_end (int): The region after the last region on the chromosome
+
+    """
+
+    int_idx_start = int(np.searchsorted(dict_index["chromosome"], int_chromosome, side="left"))
+    int_idx_end = int(np.searchsorted(dict_index["chromosome"], int_chromosome, side="right"))
+
+    return int_idx_start, int_idx_end
+
+def QueryGenesByPosition(dict_index, int_chromosome, int_position):
+    """
+
+    To find all of the regions (genes) containing a position, including overlapping ones, in O(log n) plus the number of candidate regions.
+
+    Args:
+        dict_index (dict): The interval index from LoadAnnotationIndex
+        int_chromosome (int): The chromosome
+        int_position (int): The position
+
+    Returns:
+        (ndarray): np_geneIdx
+
+            1D array containing the indices of regions in the interval index which contain the position
+
+    """
+
+    int_idx_start, int_idx_end = GetChromosomeRange(dict_index, int_chromosome)
+
+    ### regions starting after the position can't contain it
+    int_idx_last = int_idx_start + int(np.searchsorted(dict_index["start"][int_idx_start:int_idx_end], int_position, side="right"))
+    ### regions before the first one whose running maximum of end reaches the position can't contain it
+    int_idx_first = int_idx_start + int(np.searchsorted(dict_index["maxEnd"][int_idx_start:int_idx_end], int_position, side="left"))
+
+    np_geneIdx = np.arange(int_idx_first, max(int_idx_first, int_idx_last))
+
+    return np_geneIdx[dict_index["end"][np_geneIdx] >= int_position]
+
+def QueryGenesByPositions(dict_index, int_chromosome, np_position):
+    """
+
+    Bulk query of a whole chromosome. For each region (gene) on the chromosome, the range of positions it contains is found by binary search, so a position in several overlapping genes is reported for each of them.
+
+    Args:
+        dict_index (dict): The interval index from LoadAnnotationIndex
+        int_chromosome (int): The chromosome
+        np_position (ndarray): 1D array containing the positions on the chromosome, sorted in ascending order
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_geneIdx (ndarray): 1D array containing the indices of regions in the interval index which contain at least one position
+            - np_positionStart (ndarray): 1D array containing the first position index in each region
+            - np_positionEnd (ndarray): 1D array containing the position index after the last one in each region
+
+    """
+
+    int_idx_start, int_idx_end = GetChromosomeRange(dict_index, int_chromosome)
+    np_geneIdx = np.arange(int_idx_start, int_idx_end)
+    np_positionStart = np.searchsorted(np_position, dict_index["start"][int_idx_start:int_idx_end], side="left")
+    np_positionEnd = np.searchsorted(np_position, dict_index["end"][int_idx_start:int_idx_end], side="right")
+
+    ### keep regions with at least one position
+    np_selectedIdx = np_positionEnd > np_positionStart
+
+    return np_geneIdx[np_selectedIdx], np_positionStart[np_selectedIdx], np_positionEnd[np_selectedIdx]
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import hashlib
+import os
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetGeneJournalFileName(str_outputFilePath, str_model, int_kOfKFold):
+    """
+
+    To get the file name of the journal of a batch run of single gene workflow, which is placed next to its summary file (All_<model>_k<k>.csv).
+
+    Args:
+        str_outputFilePath (str): File path of output file
+        str_model (str): "Logistic" or "Lasso"
+        int_kOfKFold (int): The k for k-fold cross validation
+
+    Returns:
+        (str): str_fileName_journal
+
+    """
+
+    return os.path.join(str_outputFilePath, "All_" + str_model + "_k" + str(int_kOfKFold) + ".journal.csv")
+
+def GetGeneInputHash(list_key):
+    """
+
+    To get the hash of the inputs of a gene, e.g. the hashes of the genotype and phenotype files, the rows of the gene and the parameters of modeling.
+
+    Args:
+        list_key (list): The inputs of a gene, which are converted to `str`
+
+    Returns:
+        (str): str_hash
+
+    """
+
+    return hashlib.sha1("|".join([str(item) for item in list_key]).encode("utf-8")).hexdigest()
+
+def GetGeneOutputFileName(str_outputFilePath, str_geneFileName):
+    """
+
+    To get the file names of the outputs of a gene written by the single gene workflow.
+
+    Args:
+        str_outputFilePath (str): File path of output file
+        str_geneFileName (str): File name of the gene subset
+
+    Returns:
+        (list): [str_fileName_result, str_fileName_feature]
+
+    """
+
+    str_gene = os.path.basename(str_geneFileName).split("_")[0]
+
+    return [os.path.join(str_outputFilePath, str_gene + "_Result.csv"), os.path.join(str_outputFilePath, str_gene + "_Feature.csv")]
+
+def LoadGeneJournal(str_fileName_journal):
+    """
+
+    To load the finished genes recorded in a journal. A broken last line (e.g. the process was killed while writing) is ignored.
+
+    Args:
+        str_fileName_journal (str): File name of the journal
+
+    Returns:
+        (dict): dict_journal
+
+            key: file name of the gene subset; value: [str_hash, float_score]
+
+    """
+
+    dict_journal = {}
+    if not os.path.isfile(str_fileName_journal):
+        return dict_journal
+
+    with open(str_fileName_journal, "r") as file_inputFile:
+        file_inputFile.readline()
+        for line in file_inputFile:
+            list_line = line.strip().split(",")
+            if not line.endswith("\n") or len(list_line) != 3:
+                continue
+            try:
+                dict_journal[list_line[0]] = [list_line[1], float(list_line[2])]
+            except ValueError:
+                continue
+
+    return dict_journal
+
+def IsGeneFinished(dict_journal, str_geneFileName, str_hash, str_outputFilePath):
+    """
+
+    To check whether a gene was finished by a previous run with the same inputs. A gene with non-zero score should also have its _Result.csv and _Feature.csv, while a gene with zero score may stop before writing them.
+
+    Args:
+        dict_journal (dict): The journal loaded by LoadGeneJournal
+        str_geneFileName (str): File name of the gene subset
+        str_hash (str): The input hash of the gene by GetGeneInputHash
+        str_outputFilePath (str): File path of output file
+
+    Returns:
+        (bool): bool_finished
+
+    """
+
+    if str_geneFileName not in dict_journal or dict_journal[str_geneFileName][0] != str_hash:
+        return False
+    if dict_journal[str_geneFileName][1] == 0.0:
+        return True
+
+    return all([os.path.isfile(item) for item in GetGeneOutputFileName(str_outputFilePath, str_geneFileName)])
+
+def OpenGeneJournal(str_fileName_journal, bool_resume = False):
+    """
+
+    To open a journal for appending the genes as they finish. The journal is started over unless resuming from an existing one.
+
+    Args:
+        str_fileName_journal (str): File name of the journal
+        bool_resume (bool): Keep the records of the existing journal (default: False)
+
+    Returns:
+        (file): file_journal
+
+    """
+
+    if bool_resume and os.path.isfile(str_fileName_journal):
+        ### drop a broken last line before appending
+        with open(str_fileName_journal, "r") as file_inputFile:
+            list_line = file_inputFile.readlines()
+        if len(list_line) > 0 and not list_line[-1].endswith("\n"):
+            with open(str_fileName_journal, "w") as file_outputFile:
+                file_outputFile.writelines(list_line[:-1])
+        return open(str_fileName_journal, "a")
+
+    file_journal = open(str_fileName_journal, "w")
+    file_journal.writelines("GeneFileName,InputHash,Score" + "\n")
+    file_journal.flush()
+
+    return file_journal
+
+def AppendGeneJournal(file_journal, str_geneFileName, str_hash, float_score):
+    """
+
+    To append a finished gene to the journal, the line is flushed to disk immediately.
+
+    Args:
+        file_journal (file): The journal opened by OpenGeneJournal
+        str_geneFileName (str): File name of the gene subset
+        str_hash (str): The input hash of the gene by GetGeneInputHash
+        float_score (float): The score of the gene
+
+    Returns:
+        None
+
+    """
+
+    file_journal.writelines(str_geneFileName + "," + str_hash + "," + repr(float(float_score)) + "\n")
+    file_journal.flush()
+    os.fsync(file_journal.fileno())
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import os
+import queue
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetGeneSnpCount(str_geneFileName):
+    """
+
+    To get the number of SNPs of a gene subset from its file name (<gene>_<n>.gen).
+
+    Args:
+        str_geneFileName (str): File name of the gene subset
+
+    Returns:
+        (int): int_num_snp (1 if the file name doesn't contain it)
+
+    """
+
+    str_count = os.path.splitext(os.path.basename(str_geneFileName))[0].split("_")[-1]
+
+    return int(str_count) if str_count.isdigit() else 1
+
+def EstimateGeneCost(str_geneFileName, int_num_snp = None):
+    """
+
+    To estimate the relative cost of modeling a gene. The pairwise encoder dominates the cost of a gene, so the cost is the square of its number of SNPs, which is given by the row range of the gene index or parsed from the file name of the gene subset (<gene>_<n>.gen).
+
+    Args:
+        str_geneFileName (str): File name of the gene subset
+        int_num_snp (int): The number of SNPs of the gene, parsed from str_geneFileName if None (default: None)
+
+    Returns:
+        (int): int_cost
+
+    """
+
+    if int_num_snp is None:
+        int_num_snp = GetGeneSnpCount(str_geneFileName)
+
+    return int(int_num_snp)**2
+
+def ScheduleLongestJobFirst(list_cost):
+    """
+
+    To get the dispatch order of jobs by descending cost, jobs of the same cost keep their original order.
+
+    Args:
+        list_cost (list): The estimated costs of the jobs
+
+    Returns:
+        (list): list_order
+
+            The indices of the jobs in dispatch order
+
+    """
+
+    return sorted(range(len(list_cost)), key=lambda idx_job: -list_cost[idx_job])
+
+def RunIndexedJob(tuple_job):
+    """
+
+    Worker wrapper which runs one job and tags its result with the job index, for collecting results of `imap_unordered`.
+
+    Args:
+        tuple_job (tuple): (func_job, idx_job, tuple_args)
+
+    Returns:
+        (tuple): (idx_job, result)
+
+    """
+
+    func_job, idx_job, tuple_args = tuple_job
+
+    return idx_job, func_job(*tuple_args)
+
+def ImapWithinMemory(mp_pool, func_job, list_args, list_order, list_memory, int_memoryTotal):
+    """
+
+    To run jobs on a multiprocessing pool in the given order, while the sum of the estimated memory of the running jobs stays within the total memory. The next job waits until enough running jobs finish (a job is always dispatched if none is running), so that the memory-heavy genes run with fewer concurrent workers.
+
+    Args:
+        mp_pool (Pool): The multiprocessing pool
+        func_job (function): The function of a job, which should be picklable (a module-level function)
+        list_args (list): The argument tuples of the jobs
+        list_order (list): The indices of the jobs in dispatch order
+        list_memory (list): The estimated memory of the jobs (bytes)
+        int_memoryTotal (int): The total memory for the running jobs (bytes)
+
+    Returns:
+        (generator): (idx_job, result) of each job in order of completion
+
+    """
+
+    queue_done = queue.Queue()
+    int_memoryInUse = 0
+    int_running = 0
+    idx_next = 0
+    while idx_next < len(list_order) or int_running > 0:
+        ### dispatch the next jobs while their estimated memory fits
+        while idx_next < len(list_order) and (int_running == 0 or int_memoryInUse + list_memory[list_order[idx_next]] <= int_memoryTotal):
+            idx_job = list_order[idx_next]
+            mp_pool.apply_async(RunIndexedJob, ((func_job, idx_job, list_args[idx_job]),), callback=queue_done.put, error_callback=queue_done.put)
+            int_memoryInUse += list_memory[idx_job]
+            int_running += 1
+            idx_next += 1
+
+        result = queue_done.get()
+        if isinstance(result, BaseException):
+            raise result
+        int_memoryInUse -= list_memory[result[0]]
+        int_running -= 1
+        yield result
+
+def ImapLongestJobFirst(mp_pool, func_job, list_args, list_cost, list_memory = None, int_memoryTotal = 0):
+    """
+
+    To run jobs on a multiprocessing pool in longest-job-first order. The jobs are dispatched one by one (chunksize 1) by descending cost, so that a large gene never lands at the tail of a chunk, and the results are yielded as soon as they finish. If the estimated memory of the jobs is given, the concurrency is also capped by the total memory (see ImapWithinMemory).
+
+    Args:
+        mp_pool (Pool): The multiprocessing pool
+        func_job (function): The function of a job, which should be picklable (a module-level function)
+        list_args (list): The argument tuples of the jobs
+        list_cost (list): The estimated costs of the jobs
+        list_memory (list): The estimated memory of the jobs (bytes) (default: None. Not capped)
+        int_memoryTotal (int): The total memory for the running jobs (bytes) (default: 0. Not capped)
+
+    Returns:
+        (generator): (idx_job, result) of each job in order of completion
+
+    """
+
+    list_order = ScheduleLongestJobFirst(list_cost)
+    if list_memory is not None and int_memoryTotal > 0:
+        return ImapWithinMemory(mp_pool, func_job, list_args, list_order, list_memory, int_memoryTotal)
+
+    list_job = [(func_job, idx_job, list_args[idx_job]) for idx_job in list_order]
+
+    return mp_pool.imap_unordered(RunIndexedJob, list_job, chunksize=1)
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import argparse
+import os
+import sys
+import shutil
+import uuid
+import numpy as np
+
+from genepi.tools.genReader import GetGenBaseName
+from genepi.tools.genReader import MapGenBlock
+
+### data loaded once per worker process by InitGenotypeStoreWorker
+dict_workerData = {}
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetGenotypeStoreFileName(str_inputFileName_genotype):
+    """
+
+    To get the file names of the binary genotype store which belongs to a .gen file. The store is always placed next to its .gen file, and is named without the compression extension of a gzip or bgzip .gen file.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+
+    Returns:
+        (tuple): tuple containing:
+
+            - str_fileName_hardcall (str): File name of the hard-call matrix (.npy)
+            - str_fileName_variant (str): File name of the variant index
+
+    """
+
+    str_inputFileName_genotype = os.path.abspath(str_inputFileName_genotype)
+    str_prefix = os.path.splitext(os.path.join(os.path.dirname(str_inputFileName_genotype), GetGenBaseName(str_inputFileName_genotype)))[0]
+
+    return str_prefix + ".genotype.npy", str_prefix + ".variant"
+
+def DecodeGenProbability(list_line):
+    """
+
+    To decode the genotype probabilities of one or several lines of .gen file with a single `np.fromstring` pass.
+
+    Args:
+        list_line (list): A line (str) or a list of lines of .gen file
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_info (ndarray): 2D array (variants x 5) containing chromosome, rsid, position, allele A and allele B with `str` type
+            - np_probability (ndarray): 3D array (variants x samples x 3) containing genotype probabilities with `float` type
+
+    """
+
+    if isinstance(list_line, str):
+        list_line = [list_line]
+    if len(list_line) == 0:
+        return np.empty([0, 5], dtype=str), np.empty([0, 0, 3], dtype=float)
+
+    ### split the five information columns from the probabilities
+    list_info = []
+    list_probability = []
+    for line in list_line:
+        list_thisSnp = line.strip().split(" ", 5)
+        list_info.append(list_thisSnp[:5])
+        list_probability.append(list_thisSnp[5] if len(list_thisSnp) > 5 else "")
+    np_info = np.array(list_info, dtype=str).reshape(-1, 5)
+    np_probability = np.fromstring(" ".join(list_probability), dtype=float, sep=" ").reshape(len(list_line), -1, 3)
+
+    return np_info, np_probability
+
+def DecodeGenHardCall(list_line):
+    """
+
+    To decode the hard calls (0: AA, 1: AB, 2: BB, 3: missing) of one or several lines of .gen file. A call is regarded as missing when all of its three probabilities are zero.
+
+    Args:
+        list_line (list): A line (str) or a list of lines of .gen file
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_info (ndarray): 2D array (variants x 5) containing chromosome, rsid, position, allele A and allele B with `str` type
+            - np_hardcall (ndarray): 2D array (variants x samples) containing hard calls with `int8` type
+
+    """
+
+    np_info, np_probability = DecodeGenProbability(list_line)
+    np_hardcall = np.argmax(np_probability, axis=2).astype(np.int8)
+    np_hardcall[np.max(np_probability, axis=2) == 0] = 3
+
+    return np_info, np_hardcall
+
+def DecodeGenOneHot(list_line):
+    """
+
+    To decode one or several lines of .gen file into the one-hot (AA, AB, BB) encoding used by the modeling steps, replacing the per-subject argmax loop.
+
+    Args:
+        list_line (list): A line (str) or a list of lines of .gen file
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_info (ndarray): 2D array (variants x 5) containing chromosome, rsid, position, allele A and allele B with `str` type
+            - np_genotype (ndarray): 2D array (samples x 3 * variants) containing genotype data with `int8` type
+
+    """
+
+    np_info, np_hardcall = DecodeGenHardCall(list_line)
+
+    return np_info, HardCallToOneHot(np_hardcall)
+
+def GetWritableGenotypeFileName(str_inputFileName_genotype, str_outputFilePath):
+    """
+
+    To get a file name of the genotype data whose folder can hold its genotype store. A .gen file in a folder that can't be written (e.g. a shared read-only cohort) is linked into str_outputFilePath, or copied if links are not supported, so the store and the other files derived from it are written there.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        str_outputFilePath (str): File path of output files
+
+    Returns:
+        (str): str_inputFileName_genotype
+
+    """
+
+    str_inputFileName_genotype = os.path.abspath(str_inputFileName_genotype)
+    if os.access(os.path.dirname(str_inputFileName_genotype), os.W_OK):
+        return str_inputFileName_genotype
+
+    str_fileName_link = os.path.join(os.path.abspath(str_outputFilePath), os.path.basename(str_inputFileName_genotype))
+    if os.path.exists(str_fileName_link):
+        if os.path.samefile(str_fileName_link, str_inputFileName_genotype):
+            return str_fileName_link
+        ### a copy of a previous run is kept while it is still the same as the .gen file
+        stat_link, stat_genotype = os.stat(str_fileName_link), os.stat(str_inputFileName_genotype)
+        if not os.path.islink(str_fileName_link) and stat_link.st_size == stat_genotype.st_size and stat_link.st_mtime == stat_genotype.st_mtime:
+            return str_fileName_link
+    if os.path.lexists(str_fileName_link):
+        os.remove(str_fileName_link)
+    print("Warning: " + os.path.dirname(str_inputFileName_genotype) + " is not writable, the genotype store is written to " + os.path.abspath(str_outputFilePath))
+    try:
+        os.symlink(str_inputFileName_genotype, str_fileName_link)
+    except OSError:
+        shutil.copy2(str_inputFileName_genotype, str_fileName_link)
+
+    return str_fileName_link
+
+def IsGenotypeStoreValid(str_inputFileName_genotype):
+    """
+
+    To check whether the binary genotype store of a .gen file exists and is newer than the .gen file.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+
+    Returns:
+        (bool): True if the store can be used instead of the .gen file
+
+    """
+
+    str_fileName_hardcall, str_fileName_variant = GetGenotypeStoreFileName(str_inputFileName_genotype)
+    if not os.path.isfile(str_fileName_hardcall) or not os.path.isfile(str_fileName_variant):
+        return False
+    if not os.path.isfile(str_inputFileName_genotype):
+        return True
+    float_mtime_genotype = os.path.getmtime(str_inputFileName_genotype)
+
+    return os.path.getmtime(str_fileName_hardcall) >= float_mtime_genotype and os.path.getmtime(str_fileName_variant) >= float_mtime_genotype
+
+def ConvertGenToStore(str_inputFileName_genotype, bool_overwrite = False, int_nJobs = 1):
+    """
+
+    One-time conversion of an Oxford .gen file (plain, gzip or bgzip) into a compact binary genotype store. The store contains a hard-call matrix (variants x samples, `int8`; 0: AA, 1: AB, 2: BB, 3: missing) saved as .npy and a variant index (chromosome, rsid, position, allele A, allele B) saved as text. A call is regarded as missing when all of its three probabilities are zero. The .gen file is read in a single pass by blocks, which are decoded by int_nJobs processes.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        bool_overwrite (bool): Rebuild the store even if an up-to-date one exists (default: False)
+        int_nJobs (int): The number of processes decoding the blocks of the .gen file (default: 1)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - str_fileName_hardcall (str): File name of the hard-call matrix (.npy)
+            - str_fileName_variant (str): File name of the variant index
+
+    """
+
+    str_fileName_hardcall, str_fileName_variant = GetGenotypeStoreFileName(str_inputFileName_genotype)
+    if not bool_overwrite and IsGenotypeStoreValid(str_inputFileName_genotype):
+        return str_fileName_hardcall, str_fileName_variant
+
+    ### write to temporary files first, then rename them, so that a broken conversion never leaves a valid-looking store; the names are unique, so concurrent conversions of the same .gen file don't remove the files of each other
+    ### the number of variants is unknown until the end of the file, so the hard calls are appended to a raw file and the .npy header is written at last
+    str_suffix = "." + uuid.uuid4().hex + ".tmp"
+    str_fileName_hardcall_tmp = str_fileName_hardcall + str_suffix + ".npy"
+    str_fileName_hardcall_raw = str_fileName_hardcall + str_suffix + ".raw"
+    str_fileName_variant_tmp = str_fileName_variant + str_suffix
+    int_num_genotype = 0
+    int_num_sample = 0
+    try:
+        with open(str_fileName_hardcall_raw, "wb") as file_outputFile_hardcall:
+            with open(str_fileName_variant_tmp, "w") as file_outputFile:
+                ### hard call by the genotype with maximum probability
+                for (np_info, np_call), float_progress in MapGenBlock(DecodeGenHardCall, str_inputFileName_genotype, int_nJobs):
+                    if np_info.shape[0] == 0:
+                        continue
+                    if int_num_genotype == 0:
+                        int_num_sample = np_call.shape[1]
+                    file_outputFile.writelines([" ".join(item) + "\n" for item in np_info])
+                    np_call.astype(np.int8).tofile(file_outputFile_hardcall)
+                    int_num_genotype = int_num_genotype + np_info.shape[0]
+
+                    ### show progress
+                    str_print = "Convert to genotype store: Processing: " + "{0:.2f}".format(float_progress * 100) + "%"
+                    sys.stdout.write('%s\r' % str_print)
+                    sys.stdout.flush()
+        with open(str_fileName_hardcall_tmp, "wb") as file_outputFile:
+            np.lib.format.write_array_header_1_0(file_outputFile, {"descr": np.lib.format.dtype_to_descr(np.dtype(np.int8)), "fortran_order": False, "shape": (int_num_genotype, int_num_sample)})
+            with open(str_fileName_hardcall_raw, "rb") as file_inputFile:
+                shutil.copyfileobj(file_inputFile, file_outputFile, 2**24)
+        os.replace(str_fileName_hardcall_tmp, str_fileName_hardcall)
+        os.replace(str_fileName_variant_tmp, str_fileName_variant)
+    finally:
+        for str_fileName in [str_fileName_hardcall_raw, str_fileName_hardcall_tmp, str_fileName_variant_tmp]:
+            if os.path.isfile(str_fileName):
+                os.remove(str_fileName)
+
+    print("Convert to genotype store. DONE! \t\t\t\t")
+
+    return str_fileName_hardcall, str_fileName_variant
+
+def LoadGenotypeStore(str_inputFileName_genotype):
+    """
+
+    To load the binary genotype store of a .gen file. The hard-call matrix is returned as a read-only memory-mapped view, so only the touched variants are read from disk.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_variant (ndarray): 2D array containing chromosome, rsid, position, allele A and allele B of each variant with `str` type (None if there is no valid store)
+            - np_hardcall (ndarray): 2D memory-mapped array (variants x samples) containing hard calls with `int8` type (None if there is no valid store)
+
+    """
+
+    if not IsGenotypeStoreValid(str_inputFileName_genotype):
+        return None, None
+
+    str_fileName_hardcall, str_fileName_variant = GetGenotypeStoreFileName(str_inputFileName_genotype)
+    list_variant = []
+    with open(str_fileName_variant, "r") as file_inputFile:
+        for line in file_inputFile:
+            list_variant.append(line.strip().split(" "))
+    np_variant = np.array(list_variant, dtype=str).reshape(-1, 5)
+    np_hardcall = np.load(str_fileName_hardcall, mmap_mode="r")
+
+    return np_variant, np_hardcall
+
+def HardCallToIndex(np_hardcall):
+    """
+
+    To convert hard calls into genotype indices (0: AA, 1: AB, 2: BB). Missing calls are regarded as AA, the same as taking argmax over three zero probabilities.
+
+    Args:
+        np_hardcall (ndarray): Array containing hard calls with `int8` type
+
+    Returns:
+        (ndarray): Array containing genotype indices with `int8` type
+
+    """
+
+    np_hardcall = np.asarray(np_hardcall)
+
+    return np.where(np_hardcall == 3, 0, np_hardcall).astype(np.int8)
+
+def HardCallToOneHot(np_hardcall):
+    """
+
+    To convert the hard calls of several variants into the one-hot (AA, AB, BB) encoding used by the modeling steps.
+
+    Args:
+        np_hardcall (ndarray): 2D array (variants x samples) containing hard calls with `int8` type
+
+    Returns:
+        (ndarray): np_genotype
+
+            2D array (samples x 3 * variants) containing genotype data with `int8` type, the columns are ordered as variant1_AA, variant1_AB, variant1_BB, variant2_AA, ...
+
+    """
+
+    np_index = HardCallToIndex(np.atleast_2d(np_hardcall))
+    np_genotype = (np_index.T[:, :, np.newaxis] == np.arange(3, dtype=np.int8)).astype(np.int8)
+
+    return np_genotype.reshape(np_index.shape[1], np_index.shape[0] * 3)
+
+def InitGenotypeStoreWorker(str_inputFileName_genotype, np_phenotype, np_variantCount = None):
+    """
+
+    Initializer of the worker processes in a multiprocessing pool. Each worker opens the memory-mapped genotype store once and keeps the phenotype passed by the parent, so that the pages of the store are shared through the OS page cache and the phenotype is not re-parsed for every task.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        np_phenotype (ndarray): 2D array containing phenotype data with `float` type
+        np_variantCount (ndarray): 2D array (variants x 4) containing the counts of AA, AB, BB and missing calls of each variant (default: None)
+
+    Returns:
+        None
+
+    """
+
+    np_variant, np_hardcall = LoadGenotypeStore(str_inputFileName_genotype)
+    dict_workerData["np_variant"] = np_variant
+    dict_workerData["np_hardcall"] = np_hardcall
+    dict_workerData["np_phenotype"] = np_phenotype
+    dict_workerData["np_variantCount"] = np_variantCount
+
+def GetGenotypeStoreWorkerData():
+    """
+
+    To get the data loaded by InitGenotypeStoreWorker in current worker process.
+
+    Args:
+        None
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_variant (ndarray): 2D array containing chromosome, rsid, position, allele A and allele B of each variant with `str` type
+            - np_hardcall (ndarray): 2D memory-mapped array (variants x samples) containing hard calls with `int8` type
+            - np_phenotype (ndarray): 2D array containing phenotype data with `float` type
+            - np_variantCount (ndarray): 2D array (variants x 4) containing the counts of AA, AB, BB and missing calls of each variant (None if not given)
+
+    """
+
+    return dict_workerData["np_variant"], dict_workerData["np_hardcall"], dict_workerData["np_phenotype"], dict_workerData["np_variantCount"]
+
+def LoadGeneIndex(str_inputFileName_geneIndex):
+    """
+
+    To load the gene index written by SplitByGene, which records the rows of each gene subset in the genotype store.
+
+    Args:
+        str_inputFileName_geneIndex (str): File name of the gene index
+
+    Returns:
+        (tuple): tuple containing:
+
+            - str_inputFileName_genotype (str): File name of the genotype data which the rows refer to
+            - list_geneIndex (list): A list of (file name of gene subset, start row, end row) tuples; rows are half-open as in slicing
+
+    """
+
+    list_geneIndex = []
+    with open(str_inputFileName_geneIndex, "r") as file_inputFile:
+        str_inputFileName_genotype = file_inputFile.readline().strip()[1:]
+        ### skip header
+        file_inputFile.readline()
+        for line in file_inputFile:
+            list_line = line.strip().split(",")
+            list_geneIndex.append((list_line[0], int(list_line[1]), int(list_line[2])))
+
+    return str_inputFileName_genotype, list_geneIndex
+
+def WriteGeneIndex(str_outputFileName_geneIndex, str_inputFileName_genotype, list_geneIndex):
+    """
+
+    To write the gene index, which records the rows of each gene subset in the genotype store.
+
+    Args:
+        str_outputFileName_geneIndex (str): File name of the gene index
+        str_inputFileName_genotype (str): File name of the genotype data which the rows refer to
+        list_geneIndex (list): A list of (file name of gene subset, start row, end row) tuples; rows are half-open as in slicing
+
+    Returns:
+        None
+
+    """
+
+    with open(str_outputFileName_geneIndex, "w") as file_outputFile:
+        file_outputFile.writelines("#" + os.path.abspath(str_inputFileName_genotype) + "\n")
+        file_outputFile.writelines("GeneFileName,StartRow,EndRow" + "\n")
+        for item in list_geneIndex:
+            file_outputFile.writelines(",".join([str(x) for x in item]) + "\n")
+
+def ArgumentsParser():
+    ### define arguments
+    str_description = ''
+    'This script is a preprossing tool of GenEpi for converting .gen file to the binary genotype store'
+    parser = argparse.ArgumentParser(prog='gen2store', description=str_description)
+
+    ### define arguments for I/O
+    parser.add_argument("-g", required=True, help="filename of the input .gen file (plain, gzip or bgzip)")
+    parser.add_argument("-t", required=False, default=1, help="number of processes decoding the .gen file (default: 1)")
+    parser.add_argument('--overwrite', action='store_true', default=False, help="rebuild the store even if it is up to date")
+
+    return parser
+
+""""""""""""""""""""""""""""""
+# main function
+""""""""""""""""""""""""""""""
+def main(args=None):
+    ### obtain arguments from argument parser
+    args = ArgumentsParser().parse_args(args)
+
+    ConvertGenToStore(args.g, bool_overwrite=args.overwrite, int_nJobs=int(args.t))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import multiprocessing as mp
+import numpy as np
+import scipy.special as special
+
+from sklearn.feature_selection import VarianceThreshold
+from sklearn.feature_selection import chi2
+from sklearn.feature_selection import f_regression
+from sklearn.preprocessing import LabelBinarizer
+
+from genepi.tools.bitPacked import IsBitPacked
+from genepi.tools.bitPacked import UnpackBits
+from genepi.tools.bitPacked import AndFeature
+from genepi.tools.bitPacked import ConcatenateFeature
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def ScreenPairByBlock(np_genotype, np_phenotype, int_dim, idx_snpA, idx_snpB, str_test = "chi2"):
+    """
+
+    The reference screening of one SNP pair. The int_dim**2 interaction terms of the pair are built one at a time, a term equal to one of its parent features is zeroed, and the block is filtered by variance check and chi-square test (or f regression).
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 one-hot features) with `int8` type
+        np_phenotype (ndarray): 2D array containing phenotype data with `float` type
+        int_dim (int): The dimension of a variant (default: 3. AA, AB and BB)
+        idx_snpA (int): The index of the first SNP of the pair
+        idx_snpB (int): The index of the second SNP of the pair
+        str_test (str): "chi2" for classification or "f_regression" for regression (default: "chi2")
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_selected (ndarray): 2D array (interactions x 2) containing the indices of the two parent features of each selected interaction term
+            - np_score (ndarray): 1D array containing the -log10 p-value of each selected interaction term
+
+    """
+
+    ### generate interaction terms
+    np_this_interaction = np.zeros([np_phenotype.shape[0], int_dim**2], dtype='int8')
+    list_this_parent = []
+    for idx_x in range(int_dim):
+        for idx_y in range(int_dim):
+            np_this_interaction_term = (np_genotype[:, idx_snpA * int_dim + idx_x] * np_genotype[:, idx_snpB * int_dim + idx_y]).astype(np.int8)
+            if not(np.array_equal(np_this_interaction_term, np_genotype[:, idx_snpA * int_dim + idx_x])) and not(np.array_equal(np_this_interaction_term, np_genotype[:, idx_snpB * int_dim + idx_y])):
+                np_this_interaction[:, idx_x * int_dim + idx_y] = np_this_interaction_term
+            list_this_parent.append([idx_snpA * int_dim + idx_x, idx_snpB * int_dim + idx_y])
+    np_this_parent = np.array(list_this_parent, dtype=np.int64).reshape(-1, 2)
+
+    try:
+        ### variance check (detect variance < 0.05)
+        sk_variance = VarianceThreshold(threshold=(.95 * (1 - .95)))
+        np_this_interaction = sk_variance.fit_transform(np_this_interaction)
+        np_this_parent = np_this_parent[sk_variance.get_support()]
+
+        ### chi-square test or f regression selection
+        if str_test == "chi2":
+            np_score = -np.log10(chi2(np_this_interaction.astype(int), np_phenotype[:, -1].astype(int))[1])
+        else:
+            np_score = -np.log10(f_regression(np_this_interaction.astype(int), np_phenotype[:, -1].astype(float))[1])
+        np_selectedIdx = np.array([x > 2 for x in np_score], dtype=bool)
+        return np_this_parent[np_selectedIdx], np_score[np_selectedIdx]
+    except:
+        return np.empty([0, 2], dtype=np.int64), np.empty([0], dtype=np.float64)
+
+def PrepareInteractionScreening(np_genotype, np_phenotype, int_dim, str_test = "chi2", bool_streaming = False):
+    """
+
+    To prepare the data shared by the tiles of the batched pairwise screening: the genotype data (converted to floating point at once unless streaming), the count of each feature, and the weights of the phenotype.
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 one-hot features) with `int8` type, or bit-packed data by PackBits which is unpacked once
+        np_phenotype (ndarray): 2D array containing phenotype data with `float` type
+        int_dim (int): The dimension of a variant (default: 3. AA, AB and BB)
+        str_test (str): "chi2" for classification or "f_regression" for regression (default: "chi2")
+        bool_streaming (bool): Convert the genotype data to floating point tile by tile instead of all at once (default: False)
+
+    Returns:
+        (dict): dict_screening
+
+            The data of the screening for ScreenInteractionTile
+
+    """
+
+    if IsBitPacked(np_genotype):
+        np_genotype = UnpackBits(np_genotype)
+    int_num_sample = np_genotype.shape[0]
+    int_num_snp = int(np_genotype.shape[1] / int_dim)
+    dict_screening = {"genotype": np_genotype, "phenotype": np_phenotype, "dim": int_dim, "test": str_test, "num_sample": int_num_sample, "num_snp": int_num_snp}
+
+    ### float32 holds the exact counts of up to 2**24 samples and is faster than integer matrix multiplication; f regression sums the phenotype in float64
+    dict_screening["dtype"] = np.float32 if int_num_sample < 2**24 and str_test == "chi2" else np.float64
+    dict_screening["X"] = np_genotype[:, :int_num_snp * int_dim].astype(dict_screening["dtype"]) if not bool_streaming else None
+    dict_screening["count_feature"] = np.sum(np_genotype[:, :int_num_snp * int_dim], axis=0, dtype=np.int64)
+
+    ### weights of the phenotype, as the class indicators of sklearn's chi2 or the centered phenotype of f_regression
+    if int_num_sample == 0:
+        dict_screening["weight"] = []
+    elif str_test == "chi2":
+        np_Y = LabelBinarizer().fit_transform(np_phenotype[:, -1].astype(int))
+        if np_Y.shape[1] == 1:
+            np_Y = np.append(1 - np_Y, np_Y, axis=1)
+        dict_screening["classProb"] = np_Y.mean(axis=0).reshape(-1, 1)
+        dict_screening["weight"] = [np_Y[:, idx_class].astype(dict_screening["dtype"]) for idx_class in range(np_Y.shape[1] - 1)]
+    else:
+        np_y = np_phenotype[:, -1].astype(float)
+        np_y = np_y - np.mean(np_y)
+        dict_screening["norm_y"] = np.linalg.norm(np_y)
+        dict_screening["df"] = np_y.size - 2
+        dict_screening["weight"] = [np_y]
+
+    return dict_screening
+
+def ScreenInteractionTile(dict_screening, idx_snpStartA, idx_snpEndA, idx_snpStartB, idx_snpEndB, int_blockSize = 64):
+    """
+
+    To screen the pairwise interaction terms of a tile of SNP pairs, the SNPs [idx_snpStartA, idx_snpEndA) against the SNPs [idx_snpStartB, idx_snpEndB), keeping the pairs whose first SNP precedes the second one. The counts of each product term, overall and per class (or the sum of centered phenotype for regression), are obtained with one matrix multiplication (X[:, A]ᵀ·diag(y)·X[:, B]).
+
+    Args:
+        dict_screening (dict): The data of the screening by PrepareInteractionScreening
+        idx_snpStartA (int): The first SNP of the rows of the tile
+        idx_snpEndA (int): The end (exclusive) of the rows of the tile
+        idx_snpStartB (int): The first SNP of the columns of the tile
+        idx_snpEndB (int): The end (exclusive) of the columns of the tile
+        int_blockSize (int): The number of SNPs converted to floating point at a time when streaming (default: 64)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_selected (ndarray): 2D array (interactions x 2) containing the indices of the two parent features of each selected interaction term, in the order of SNP pairs and then terms
+            - np_score (ndarray): 1D array containing the -log10 p-value of each selected interaction term
+
+    """
+
+    np_genotype = dict_screening["genotype"]
+    np_phenotype = dict_screening["phenotype"]
+    int_dim = dict_screening["dim"]
+    str_test = dict_screening["test"]
+    int_num_sample = dict_screening["num_sample"]
+    dtype_count = dict_screening["dtype"]
+    np_X = dict_screening["X"]
+    np_count_feature = dict_screening["count_feature"]
+    float_threshold_variance = .95 * (1 - .95)
+    list_selected = []
+    list_score = []
+
+    int_num_blockSnp = idx_snpEndA - idx_snpStartA
+    int_num_restSnp = idx_snpEndB - idx_snpStartB
+    if np_X is not None:
+        np_X_block = np_X[:, idx_snpStartA * int_dim:idx_snpEndA * int_dim]
+        np_X_rest = np_X[:, idx_snpStartB * int_dim:idx_snpEndB * int_dim]
+        DotRest = np_X_rest.T.dot
+    else:
+        np_X_block = np_genotype[:, idx_snpStartA * int_dim:idx_snpEndA * int_dim].astype(dtype_count)
+        DotRest = lambda np_A: np.concatenate([np_genotype[:, idx_tileStart * int_dim:min(idx_tileStart + int_blockSize, idx_snpEndB) * int_dim].astype(dtype_count).T.dot(np_A) for idx_tileStart in range(idx_snpStartB, idx_snpEndB, int_blockSize)], axis=0)
+
+    ### co-occurrence counts (and weighted sums) of the rows against the columns, shaped as (snpA, x, snpB, y)
+    np_count = np.rint(DotRest(np_X_block).T).astype(np.int64).reshape(int_num_blockSnp, int_dim, int_num_restSnp, int_dim)
+    list_weighted = []
+    for np_weight in dict_screening["weight"]:
+        np_weighted = DotRest(np_X_block * np_weight[:, np.newaxis]).T
+        if str_test == "chi2":
+            np_weighted = np.rint(np_weighted).astype(np.int64)
+        list_weighted.append(np_weighted.reshape(int_num_blockSnp, int_dim, int_num_restSnp, int_dim))
+
+    ### keep pairs (snpA < snpB) and reorder the terms as (snpA, snpB, x, y), the order of pair-by-pair screening
+    np_idx_snpA = np.arange(idx_snpStartA, idx_snpEndA)
+    np_idx_snpB = np.arange(idx_snpStartB, idx_snpEndB)
+    np_isPair = np_idx_snpB[np.newaxis, :] > np_idx_snpA[:, np.newaxis]
+    np_count = np_count.transpose(0, 2, 1, 3)[np_isPair]
+    list_weighted = [np_weighted.transpose(0, 2, 1, 3)[np_isPair] for np_weighted in list_weighted]
+    np_pair = np.stack(np.nonzero(np_isPair), axis=1) + np.array([idx_snpStartA, idx_snpStartB])
+    np_parentA = (np_pair[:, 0] * int_dim)[:, np.newaxis, np.newaxis] + np.arange(int_dim)[np.newaxis, :, np.newaxis]
+    np_parentB = (np_pair[:, 1] * int_dim)[:, np.newaxis, np.newaxis] + np.arange(int_dim)[np.newaxis, np.newaxis, :]
+    np_parentA, np_parentB = np.broadcast_arrays(np_parentA, np_parentB)
+
+    ### a term equal to one of its parent features is zeroed
+    np_isParent = (np_count == np_count_feature[np_parentA]) | (np_count == np_count_feature[np_parentB])
+    np_count = np.where(np_isParent, 0, np_count)
+
+    ### variance check (detect variance < 0.05)
+    np_frequency = np_count / int_num_sample
+    np_variance = np_frequency * (1 - np_frequency)
+    np_pass = np_variance > float_threshold_variance
+    np_borderline = np.abs(np_variance - float_threshold_variance) <= 1e-9 * float_threshold_variance
+
+    ### chi-square test or f regression selection
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if str_test == "chi2":
+            list_observed = [np.where(np_isParent, 0, np_weighted) for np_weighted in list_weighted]
+            list_observed.append(np_count - np.sum(list_observed, axis=0))
+            np_observed = np.stack(list_observed, axis=0).astype(np.float64)
+            np_expected = dict_screening["classProb"].reshape(-1, 1, 1, 1) * np_count[np.newaxis, :, :, :]
+            np_chisq = np.sum((np_observed - np_expected)**2 / np_expected, axis=0)
+            np_score = -np.log10(special.chdtrc(np_observed.shape[0] - 1, np_chisq))
+        else:
+            np_sum_y = np.where(np_isParent, 0, list_weighted[0])
+            np_corr = np_sum_y / np.sqrt(np_count - int_num_sample * np_frequency**2) / dict_screening["norm_y"]
+            np_F = np_corr**2 / (1 - np_corr**2) * dict_screening["df"]
+            np_score = -np.log10(special.fdtrc(1, dict_screening["df"], np_F))
+    np_pass = np_pass & (np_score > 2)
+    np_borderline = np_borderline | (np_variance > float_threshold_variance) & (np.abs(np_score - 2) <= 1e-6)
+
+    ### screen the pairs on a threshold again by the reference screening
+    np_isBorderlinePair = np.any(np_borderline, axis=(1, 2))
+    for idx_pair in range(np_pair.shape[0]):
+        if np_isBorderlinePair[idx_pair]:
+            np_this_selected, np_this_score = ScreenPairByBlock(np_genotype, np_phenotype, int_dim, np_pair[idx_pair, 0], np_pair[idx_pair, 1], str_test)
+            list_selected.append(np_this_selected)
+            list_score.append(np_this_score)
+        elif np.any(np_pass[idx_pair]):
+            list_selected.append(np.stack([np_parentA[idx_pair][np_pass[idx_pair]], np_parentB[idx_pair][np_pass[idx_pair]]], axis=1))
+            list_score.append(np_score[idx_pair][np_pass[idx_pair]])
+
+    if len(list_selected) == 0:
+        return np.empty([0, 2], dtype=np.int64), np.empty([0], dtype=np.float64)
+
+    return np.concatenate(list_selected, axis=0), np.concatenate(list_score, axis=0)
+
+def ScreenPairwiseInteraction(np_genotype, np_phenotype, int_dim, str_test = "chi2", int_blockSize = 64, bool_streaming = False):
+    """
+
+    Batched screening of all of the pairwise interaction terms of a gene. The counts of each product term, overall and per class (or the sum of centered phenotype for regression), are obtained for a block of SNPs against all of the following SNPs with one matrix multiplication (X[:, block]ᵀ·diag(y)·X), so the variance check and the chi-square test (or f regression) can be applied without building any interaction column. Pairs having a term whose statistic falls on a threshold within floating point error are screened again by ScreenPairByBlock, so the result is the same as the pair-by-pair screening.
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 one-hot features) with `int8` type, or bit-packed data by PackBits which is unpacked once
+        np_phenotype (ndarray): 2D array containing phenotype data with `float` type
+        int_dim (int): The dimension of a variant (default: 3. AA, AB and BB)
+        str_test (str): "chi2" for classification or "f_regression" for regression (default: "chi2")
+        int_blockSize (int): The number of SNPs screened against all of the following SNPs at once (default: 64)
+        bool_streaming (bool): Convert the genotype data to floating point tile by tile (int_blockSize SNPs) instead of all at once, for the low-memory path (default: False)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_selected (ndarray): 2D array (interactions x 2) containing the indices of the two parent features of each selected interaction term, in the order of SNP pairs and then terms
+            - np_score (ndarray): 1D array containing the -log10 p-value of each selected interaction term
+
+    """
+
+    dict_screening = PrepareInteractionScreening(np_genotype, np_phenotype, int_dim, str_test, bool_streaming)
+    int_num_snp = dict_screening["num_snp"]
+    list_selected = []
+    list_score = []
+    if int_num_snp < 2 or dict_screening["num_sample"] == 0:
+        return np.empty([0, 2], dtype=np.int64), np.empty([0], dtype=np.float64)
+
+    for idx_blockStart in range(0, int_num_snp - 1, int_blockSize):
+        np_this_selected, np_this_score = ScreenInteractionTile(dict_screening, idx_blockStart, min(idx_blockStart + int_blockSize, int_num_snp - 1), idx_blockStart, int_num_snp, int_blockSize)
+        list_selected.append(np_this_selected)
+        list_score.append(np_this_score)
+
+    return np.concatenate(list_selected, axis=0), np.concatenate(list_score, axis=0)
+
+### the data of the screening shared by the tiles of a worker process
+dict_workerData = {}
+
+def InitInteractionScreeningWorker(np_genotype, np_phenotype, int_dim, str_test):
+    """
+
+    The initializer of the worker processes of ScreenPairwiseInteractionParallel. The genotype data is sent to each worker once and converted to floating point tile by tile, so a worker does not hold a floating point copy of all of the features.
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 one-hot features) with `int8` type
+        np_phenotype (ndarray): 2D array containing phenotype data with `float` type
+        int_dim (int): The dimension of a variant
+        str_test (str): "chi2" for classification or "f_regression" for regression
+
+    Returns:
+        None
+
+    """
+
+    dict_workerData["screening"] = PrepareInteractionScreening(np_genotype, np_phenotype, int_dim, str_test, bool_streaming=True)
+
+def ScreenInteractionTileInWorker(tuple_tile):
+    """
+
+    To screen a tile of SNP pairs in a worker process initialized by InitInteractionScreeningWorker.
+
+    Args:
+        tuple_tile (tuple): (idx_snpStartA, idx_snpEndA, idx_snpStartB, idx_snpEndB) of the tile
+
+    Returns:
+        (tuple): (np_selected, np_score) of the tile by ScreenInteractionTile
+
+    """
+
+    return ScreenInteractionTile(dict_workerData["screening"], *tuple_tile)
+
+def ScreenPairwiseInteractionParallel(np_genotype, np_phenotype, int_dim, str_test = "chi2", int_blockSize = 256, int_nJobs = 1):
+    """
+
+    The screening of ScreenPairwiseInteraction by a process pool, for the many features of the cross-gene stage. The upper triangle of SNP pairs is split into tiles of int_blockSize x int_blockSize SNPs which are screened by int_nJobs processes; each tile returns only the parent indices and scores of its selected interaction terms, which are merged back into the order of SNP pairs and then terms, so the selected terms are the same as ScreenPairwiseInteraction (f regression scores may differ in floating point rounding only).
+
+    Args:
+        np_genotype (ndarray): 2D array containing genotype data (0/1 one-hot features) with `int8` type, or bit-packed data by PackBits which is unpacked once
+        np_phenotype (ndarray): 2D array containing phenotype data with `float` type
+        int_dim (int): The dimension of a variant (default: 3. AA, AB and BB)
+        str_test (str): "chi2" for classification or "f_regression" for regression (default: "chi2")
+        int_blockSize (int): The number of SNPs of each side of a tile (default: 256)
+        int_nJobs (int): The number of screening processes (default: 1)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_selected (ndarray): 2D array (interactions x 2) containing the indices of the two parent features of each selected interaction term, in the order of SNP pairs and then terms
+            - np_score (ndarray): 1D array containing the -log10 p-value of each selected interaction term
+
+    """
+
+    if IsBitPacked(np_genotype):
+        np_genotype = UnpackBits(np_genotype)
+    int_num_snp = int(np_genotype.shape[1] / int_dim)
+    if int_nJobs <= 1 or int_num_snp <= int_blockSize:
+        return ScreenPairwiseInteraction(np_genotype, np_phenotype, int_dim, str_test)
+    if np_genotype.shape[0] == 0:
+        return np.empty([0, 2], dtype=np.int64), np.empty([0], dtype=np.float64)
+
+    ### tiles of the upper triangle, the rows end before the last SNP as it has no following SNP
+    list_tile = []
+    for idx_snpStartA in range(0, int_num_snp - 1, int_blockSize):
+        for idx_snpStartB in range(idx_snpStartA, int_num_snp, int_blockSize):
+            list_tile.append((idx_snpStartA, min(idx_snpStartA + int_blockSize, int_num_snp - 1), idx_snpStartB, min(idx_snpStartB + int_blockSize, int_num_snp)))
+
+    mp_pool = mp.Pool(min(int_nJobs, len(list_tile)), initializer=InitInteractionScreeningWorker, initargs=(np_genotype, np_phenotype, int_dim, str_test))
+    try:
+        list_result = mp_pool.map(ScreenInteractionTileInWorker, list_tile)
+        mp_pool.close()
+    finally:
+        mp_pool.terminate()
+        mp_pool.join()
+
+    np_selected = np.concatenate([np_this_selected for np_this_selected, np_this_score in list_result], axis=0)
+    np_score = np.concatenate([np_this_score for np_this_selected, np_this_score in list_result], axis=0)
+
+    ### merge the tiles into the order of SNP pairs (snpA, snpB) and then terms (x, y)
+    np_order = np.lexsort((np_selected[:, 1] % int_dim, np_selected[:, 0] % int_dim, np_selected[:, 1] // int_dim, np_selected[:, 0] // int_dim))
+
+    return np_selected[np_order], np_score[np_order]
+
+def LimitInteractionByMemory(np_selected, np_score, np_genotype, int_memoryLimit):
+    """
+
+    To keep the encoded features of a gene within a memory limit. The features are sized as they are stored (a row of bits per feature if bit-packed by PackBits, else one `int8` byte per sample); if the genotype features and the selected interaction terms exceed the limit, only the interaction terms with the smallest p-values that fit are kept, in their original order.
+
+    Args:
+        np_selected (ndarray): 2D array (interactions x 2) containing the indices of the two parent features of each selected interaction term
+        np_score (ndarray): 1D array containing the -log10 p-value of each selected interaction term
+        np_genotype (ndarray): 2D array containing the genotype features with `int8` type, or bit-packed data by PackBits
+        int_memoryLimit (int): The memory limit of the encoded features in bytes (0: no limit)
+
+    Returns:
+        (ndarray): np_selected
+
+            2D array (interactions x 2) containing the indices of the two parent features of each kept interaction term
+
+    """
+
+    if int_memoryLimit <= 0:
+        return np_selected
+    if IsBitPacked(np_genotype):
+        int_num_feature, int_num_byte = np_genotype["packed"].shape
+    else:
+        int_num_byte, int_num_feature = np_genotype.shape
+    if int_num_byte == 0:
+        return np_selected
+    int_num_interaction_max = max(int(int_memoryLimit // int_num_byte) - int_num_feature, 0)
+    if np_selected.shape[0] <= int_num_interaction_max:
+        return np_selected
+
+    print("Warning of step4: " + str(np_selected.shape[0]) + " interaction terms exceed the memory limit, the " + str(int_num_interaction_max) + " most significant ones are kept")
+    np_keptIdx = np.sort(np.argsort(-np_score, kind="stable")[:int_num_interaction_max])
+
+    return np_selected[np_keptIdx]
+
+def MaterializeInteraction(np_genotype_rsid, np_genotype, np_selected):
+    """
+
+    To build the encoded features, the genotype features followed by the selected interaction terms, into one preallocated array. Bit-packed genotype data gives bit-packed encoded features, whose interaction terms are built by bitwise AND.
+
+    Args:
+        np_genotype_rsid (ndarray): 1D array containing rsid of genotype data with `str` type
+        np_genotype (ndarray): 2D array containing genotype data with `int8` type, or bit-packed data by PackBits
+        np_selected (ndarray): 2D array (interactions x 2) containing the indices of the two parent features of each interaction term
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_interaction_rsid (ndarray): 1D array containing rsid of genotype data and interaction terms with `str` type
+            - np_interaction (ndarray): 2D array containing genotype data and interaction terms with `int8` type (bit-packed if np_genotype is)
+
+    """
+
+    if IsBitPacked(np_genotype):
+        np_interaction = ConcatenateFeature([np_genotype, AndFeature(np_genotype, np_selected[:, 0], np_selected[:, 1])])
+    else:
+        int_num_feature = np_genotype.shape[1]
+        int_num_interaction = np_selected.shape[0]
+        np_interaction = np.empty([np_genotype.shape[0], int_num_feature + int_num_interaction], dtype=np.int8)
+        np_interaction[:, :int_num_feature] = np_genotype
+        np.multiply(np_genotype[:, np_selected[:, 0]], np_genotype[:, np_selected[:, 1]], out=np_interaction[:, int_num_feature:], casting="unsafe")
+
+    list_interaction_rsid = list(np_genotype_rsid)
+    list_interaction_rsid.extend([np_genotype_rsid[idx_x] + "*" + np_genotype_rsid[idx_y] for idx_x, idx_y in np_selected])
+
+    return np.array(list_interaction_rsid), np_interaction
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import psutil
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+### the peak memory of modeling in bytes per encoded entry (one sample of a feature), measured on the stability selection and the cross validation of step4
+dict_bytesPerEntry = {"Logistic": 14, "Lasso": 20}
+
+def GetAvailableMemory():
+    """
+
+    To get the memory which is available for starting new processes without swapping.
+
+    Args:
+        None
+
+    Returns:
+        (int): int_memoryAvailable (bytes)
+
+    """
+
+    return int(psutil.virtual_memory().available)
+
+def GetPackedFeatureBytes(int_num_sample):
+    """
+
+    To get the bytes of a bit-packed feature (see PackBits), the unit of the memory limit of the encoded features.
+
+    Args:
+        int_num_sample (int): The number of samples
+
+    Returns:
+        (int): int_num_byte
+
+    """
+
+    return ((int_num_sample + 63) // 64) * 8
+
+def EstimateGeneMemory(int_num_snp, int_num_sample, int_memoryLimit = 2**30, str_model = "Logistic", bool_lowMemory = False, int_dim = 3):
+    """
+
+    To estimate the peak memory of the single gene workflow of a gene from its number of SNPs, before the encoder runs. All of the pairwise interaction terms are assumed to pass the screening, so the encoded features are bounded by the memory limit only.
+
+    Args:
+        int_num_snp (int): The number of SNPs of the gene
+        int_num_sample (int): The number of samples
+        int_memoryLimit (int): The memory limit of the encoded features in bytes (default: 2**30. 0: no limit)
+        str_model (str): "Logistic" or "Lasso" (default: "Logistic")
+        bool_lowMemory (bool): Estimate for the low-memory path, which streams the pairwise screening (default: False)
+        int_dim (int): The dimension of a variant (default: 3. AA, AB and BB)
+
+    Returns:
+        (int): int_memory (bytes)
+
+    """
+
+    int_num_feature = int_num_snp * int_dim
+    int_num_entry_genotype = int_num_sample * int_num_feature
+    int_num_entry = int_num_sample * (int_num_feature + int_dim**2 * int_num_snp * (int_num_snp - 1) // 2)
+    ### the limit is on the bit-packed features, a row of 64-bit words per feature
+    if int_memoryLimit > 0:
+        int_num_entry = min(int_num_entry, max((int_memoryLimit // GetPackedFeatureBytes(int_num_sample)) * int_num_sample, int_num_entry_genotype))
+
+    ### screening: the floating point copy of the genotype features (tile by tile if streaming) and the tables of one block against the following SNPs
+    int_blockSize = 8 if bool_lowMemory else 64
+    int_memory_screening = 2 * 4 * int_num_sample * min(int_blockSize, int_num_snp) * int_dim if bool_lowMemory else 4 * int_num_entry_genotype
+    int_memory_screening = int_memory_screening + 24 * 8 * min(int_blockSize, int_num_snp) * int_dim * int_num_feature
+    ### modeling: the encoded features and the copies of the models
+    int_memory_modeling = dict_bytesPerEntry[str_model] * int_num_entry
+
+    return int(int_num_entry_genotype + max(int_memory_screening, int_memory_modeling))
+
+def GetMemoryLimitForBudget(int_num_snp, int_num_sample, int_memoryBudget, str_model = "Logistic", int_dim = 3):
+    """
+
+    To get the memory limit of the bit-packed encoded features which keeps the estimated peak memory of a gene within a budget. The genotype features are always kept, so the limit is not lower than them.
+
+    Args:
+        int_num_snp (int): The number of SNPs of the gene
+        int_num_sample (int): The number of samples
+        int_memoryBudget (int): The memory budget of the gene (bytes)
+        str_model (str): "Logistic" or "Lasso" (default: "Logistic")
+        int_dim (int): The dimension of a variant (default: 3. AA, AB and BB)
+
+    Returns:
+        (int): int_memoryLimit (bytes)
+
+    """
+
+    int_num_feature_genotype = int_num_snp * int_dim
+    int_num_feature = max((int_memoryBudget - int_num_sample * int_num_feature_genotype) // (dict_bytesPerEntry[str_model] * max(int_num_sample, 1)), int_num_feature_genotype)
+
+    return int(int_num_feature * GetPackedFeatureBytes(int_num_sample))
+
+def PlanGeneMemory(list_num_snp, int_num_sample, int_memoryLimit = 2**30, str_model = "Logistic", int_memoryBudget = 0, int_nJobs = 1):
+    """
+
+    To plan the memory of the genes of a batch run. A gene whose estimate exceeds the share of a worker (int_memoryBudget / int_nJobs) is routed to the low-memory path, which streams the pairwise screening and runs with fewer concurrent workers; its interaction terms are only reduced (the most significant ones are kept) if it would not fit into the whole budget even alone.
+
+    Args:
+        list_num_snp (list): The numbers of SNPs of the genes
+        int_num_sample (int): The number of samples
+        int_memoryLimit (int): The memory limit of the encoded features of each gene in bytes (default: 2**30. 0: no limit)
+        str_model (str): "Logistic" or "Lasso" (default: "Logistic")
+        int_memoryBudget (int): The memory budget of all of the workers in bytes (default: 0. The available memory)
+        int_nJobs (int): The number of workers (default: 1)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - list_memoryLimit (list): The memory limit of the encoded features of each gene
+            - list_lowMemory (list): Whether each gene takes the low-memory path
+            - list_memory (list): The estimated peak memory of each gene (bytes)
+            - int_memoryBudget (int): The memory budget of all of the workers (bytes)
+
+    """
+
+    if int_memoryBudget <= 0:
+        int_memoryBudget = GetAvailableMemory()
+    int_memoryShare = int_memoryBudget // max(int_nJobs, 1)
+
+    list_memoryLimit = []
+    list_lowMemory = []
+    list_memory = []
+    for int_num_snp in list_num_snp:
+        int_memoryLimit_gene = int_memoryLimit
+        bool_lowMemory = False
+        int_memory = EstimateGeneMemory(int_num_snp, int_num_sample, int_memoryLimit_gene, str_model)
+        if int_memory > int_memoryShare:
+            bool_lowMemory = True
+            int_memory = EstimateGeneMemory(int_num_snp, int_num_sample, int_memoryLimit_gene, str_model, bool_lowMemory)
+            if int_memory > int_memoryBudget:
+                int_memoryLimit_gene = GetMemoryLimitForBudget(int_num_snp, int_num_sample, int_memoryBudget, str_model)
+                if int_memoryLimit > 0:
+                    int_memoryLimit_gene = min(int_memoryLimit_gene, int_memoryLimit)
+                int_memory = EstimateGeneMemory(int_num_snp, int_num_sample, int_memoryLimit_gene, str_model, bool_lowMemory)
+        list_memoryLimit.append(int_memoryLimit_gene)
+        list_lowMemory.append(bool_lowMemory)
+        list_memory.append(int_memory)
+
+    int_num_lowMemory = sum(list_lowMemory)
+    if int_num_lowMemory > 0:
+        print("Warning of step4: " + str(int_num_lowMemory) + " genes exceed the memory budget of a worker (" + "{0:.2f}".format(float(int_memoryShare) / 2**30) + " GiB), they take the low-memory path with fewer concurrent workers")
+
+    return list_memoryLimit, list_lowMemory, list_memory, int_memoryBudget
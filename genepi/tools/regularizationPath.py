@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import warnings
+import numpy as np
+
+from sklearn import linear_model
+from sklearn.model_selection import KFold
+from sklearn.exceptions import ConvergenceWarning
+import sklearn.metrics as skMetric
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetCostGrid():
+    """
+
+    To get the grid of inverse regularization strength (C) for L1-regularized Logistic regression.
+
+    Args:
+        None
+
+    Returns:
+        (list): list_cost
+
+    """
+
+    return [2**x for x in range(-8, 8)]
+
+def GetAlphaGrid():
+    """
+
+    To get the grid of regularization strength (alpha) for Lasso regression.
+
+    Args:
+        None
+
+    Returns:
+        (ndarray): np_alpha
+
+    """
+
+    return np.logspace(-10, 10, 200)
+
+def SelectBestParameter(np_score, np_weight_fold):
+    """
+
+    To select the best parameter of a grid by the cross validation scores, as GridSearchCV of scikit-learn 0.21 (the scores of folds are averaged with the weights of fold sizes, and the first one in grid order is chosen among ties).
+
+    Args:
+        np_score (ndarray): 2D array (folds x parameters) containing the validation scores, nan for the parameters not evaluated
+        np_weight_fold (ndarray): 1D array containing the number of validation samples of each fold
+
+    Returns:
+        (int): idx_best
+
+    """
+
+    np_score_mean = np.average(np_score, axis=0, weights=np_weight_fold)
+    np_score_mean[np.isnan(np_score_mean)] = -np.inf
+
+    return int(np.argmax(np_score_mean))
+
+def SearchLogisticRegressionL1(np_X, np_y, list_cost = None, int_nFold = 2, bool_earlyStopping = True, int_patience = 3):
+    """
+
+    Searching the regularization strength of L1-regularized Logistic regression (liblinear, balanced class weight) by F1 score of k-fold cross validation, a drop-in for GridSearchCV. The grid is walked from strong to weak regularization, where the fits get slower; once the cross validation score has been below the best one for int_patience values of C after leaving the null models, the score is regarded as plateaued and the search stops.
+
+    Args:
+        np_X (ndarray): 2D array containing genotype data with `int8` type
+        np_y (ndarray): 1D array containing phenotype data with `int` type
+        list_cost (list): The grid of C in ascending order (default: None. 2**-8 to 2**7)
+        int_nFold (int): The k of the inner k-fold cross validation (default: 2)
+        bool_earlyStopping (bool): Stop once the cross validation score plateaus (default: True)
+        int_patience (int): The number of C scored below the best one before stopping (default: 3)
+
+    Returns:
+        (LogisticRegression): estimator
+
+            The estimator with the best C fitted on all of the data
+
+    """
+
+    if list_cost is None:
+        list_cost = GetCostGrid()
+    list_fold = list(KFold(n_splits=int_nFold).split(np_X))
+    np_score = np.full([int_nFold, len(list_cost)], np.nan)
+    np_weight_fold = np.array([idxTe.shape[0] for idxTr, idxTe in list_fold], dtype=float)
+    float_score_best = -np.inf
+    int_count_decline = 0
+
+    for idx_cost, float_cost in enumerate(list_cost):
+        for idx_fold, (idxTr, idxTe) in enumerate(list_fold):
+            estimator = linear_model.LogisticRegression(C=float_cost, penalty='l1', dual=False, class_weight='balanced', max_iter=100, solver='liblinear')
+            estimator.fit(np_X[idxTr], np_y[idxTr])
+            np_score[idx_fold, idx_cost] = skMetric.f1_score(np_y[idxTe], estimator.predict(np_X[idxTe]))
+
+        ### early stopping
+        float_score = np.average(np_score[:, idx_cost], weights=np_weight_fold)
+        if float_score > float_score_best:
+            float_score_best = float_score
+            int_count_decline = 0
+        elif float_score < float_score_best:
+            int_count_decline = int_count_decline + 1
+        if bool_earlyStopping and float_score_best > 0 and int_count_decline >= int_patience:
+            break
+
+    float_cost_best = list_cost[SelectBestParameter(np_score, np_weight_fold)]
+    estimator = linear_model.LogisticRegression(C=float_cost_best, penalty='l1', dual=False, class_weight='balanced', max_iter=100, solver='liblinear')
+    estimator.fit(np_X, np_y)
+
+    return estimator
+
+def SearchLassoRegression(np_X, np_y, np_alpha = None, int_nFold = 2, bool_earlyStopping = True, int_patience = 10, float_tol = 1e-6, int_chunkSize = 10):
+    """
+
+    Searching the regularization strength of Lasso regression by mean squared error of k-fold cross validation, a drop-in for GridSearchCV. On each fold, the alphas giving the null model (alpha >= max|Xᵀy|/n) are scored without fitting, and the others are fitted along one warm-started regularization path from strong to weak regularization. The path stops once the cross validation score of fitted models plateaus (relative change < float_tol for int_patience alphas).
+
+    Args:
+        np_X (ndarray): 2D array containing genotype data
+        np_y (ndarray): 1D array containing phenotype data with `float` type
+        np_alpha (ndarray): The grid of alpha in ascending order (default: None. np.logspace(-10, 10, 200))
+        int_nFold (int): The k of the inner k-fold cross validation (default: 2)
+        bool_earlyStopping (bool): Stop once the cross validation score plateaus (default: True)
+        int_patience (int): The number of alphas in a plateau (default: 10)
+        float_tol (float): The relative change of scores regarded as a plateau (default: 1e-6)
+        int_chunkSize (int): The number of alphas fitted in one call of lasso_path (default: 10)
+
+    Returns:
+        (Lasso): estimator
+
+            The estimator with the best alpha fitted on all of the data
+
+    """
+
+    if np_alpha is None:
+        np_alpha = GetAlphaGrid()
+    np_alpha = np.asarray(np_alpha, dtype=float)
+    np_X = np.asarray(np_X, dtype=float)
+    np_y = np.asarray(np_y, dtype=float)
+    list_fold = list(KFold(n_splits=int_nFold).split(np_X))
+    np_score = np.full([int_nFold, np_alpha.shape[0]], np.nan)
+    np_weight_fold = np.array([idxTe.shape[0] for idxTr, idxTe in list_fold], dtype=float)
+    np_order = np.argsort(-np_alpha, kind="stable")
+
+    ### center data of each fold, as Lasso with intercept
+    list_foldData = []
+    for idxTr, idxTe in list_fold:
+        np_X_mean = np.mean(np_X[idxTr], axis=0)
+        float_y_mean = np.mean(np_y[idxTr])
+        np_X_train = np_X[idxTr] - np_X_mean
+        np_y_train = np_y[idxTr] - float_y_mean
+        float_alpha_max = np.max(np.abs(np.dot(np_X_train.T, np_y_train))) / idxTr.shape[0] if np_X.shape[1] > 0 else np.inf
+        list_foldData.append([np_X_train, np_y_train, np_X_mean, float_y_mean, float_alpha_max, None])
+
+    for idx_chunkStart in range(0, np_order.shape[0], int_chunkSize):
+        np_idx_chunk = np_order[idx_chunkStart:idx_chunkStart + int_chunkSize]
+        for idx_fold, (idxTr, idxTe) in enumerate(list_fold):
+            np_X_train, np_y_train, np_X_mean, float_y_mean, float_alpha_max, np_coef_init = list_foldData[idx_fold]
+
+            ### null model
+            np_isNull = np_alpha[np_idx_chunk] >= float_alpha_max
+            np_score[idx_fold, np_idx_chunk[np_isNull]] = -np.mean((np_y[idxTe] - float_y_mean)**2)
+
+            ### warm-started path of the other alphas
+            np_idx_fit = np_idx_chunk[~np_isNull]
+            if np_idx_fit.shape[0] == 0:
+                continue
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', ConvergenceWarning)
+                _, np_coefs, _ = linear_model.lasso_path(np_X_train, np_y_train, alphas=np_alpha[np_idx_fit], coef_init=np_coef_init, max_iter=1000, tol=1e-4)
+            np_predict = np.dot(np_X[idxTe] - np_X_mean, np_coefs) + float_y_mean
+            np_score[idx_fold, np_idx_fit] = -np.mean((np_y[idxTe][:, np.newaxis] - np_predict)**2, axis=0)
+            list_foldData[idx_fold][5] = np.asfortranarray(np_coefs[:, -1])
+
+        ### early stopping
+        int_num_done = min(idx_chunkStart + int_chunkSize, np_order.shape[0])
+        if bool_earlyStopping and int_num_done >= int_patience and np.max(np_alpha[np_order[int_num_done - int_patience:int_num_done]]) < min([item[4] for item in list_foldData]):
+            np_score_recent = np.average(np_score[:, np_order[int_num_done - int_patience:int_num_done]], axis=0, weights=np_weight_fold)
+            if np.max(np_score_recent) - np.min(np_score_recent) <= float_tol * np.max(np.abs(np_score_recent)):
+                break
+
+    float_alpha_best = np_alpha[SelectBestParameter(np_score, np_weight_fold)]
+    estimator = linear_model.Lasso(alpha=float_alpha_best, max_iter=1000)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        estimator.fit(np_X, np_y)
+
+    return estimator
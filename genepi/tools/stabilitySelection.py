@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import warnings
+import numpy as np
+import scipy.sparse as sparse
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import Lasso
+from sklearn.linear_model import lars_path
+from sklearn.exceptions import ConvergenceWarning
+
+from genepi.tools.bitPacked import IsBitPacked
+from genepi.tools.bitPacked import BitPackedToCSR
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+### subsample masks of each number of samples, shared by all of the genes processed in this process
+dict_subsampleMask = {}
+
+def GetSubsampleMask(int_num_sample, int_nResampling = 100, float_sampleFraction = .75, int_randomState = 0):
+    """
+
+    To get the subsample masks of stability selection. The masks depend only on the number of samples and the random state, so they are generated once and shared by all of the genes in the same batch.
+
+    Args:
+        int_num_sample (int): The number of samples
+        int_nResampling (int): The number of resamplings (default: 100)
+        float_sampleFraction (float): The fraction of samples in each subsample (default: 0.75)
+        int_randomState (int): The seed of random number generator (default: 0)
+
+    Returns:
+        (ndarray): np_mask
+
+            2D array (resamplings x samples) with `bool` type, True for the samples in each subsample
+
+    """
+
+    tuple_key = (int_num_sample, int_nResampling, float_sampleFraction, int_randomState)
+    if tuple_key not in dict_subsampleMask:
+        np_random = np.random.RandomState(int_randomState)
+        dict_subsampleMask[tuple_key] = np_random.rand(int_nResampling, int_num_sample) < float_sampleFraction
+
+    return dict_subsampleMask[tuple_key]
+
+def PrepareStabilityData(np_X):
+    """
+
+    To convert genotype data into a sparse matrix with each column scaled by the L2 norm of its centered values (the normalization of sklearn's randomized linear models). The columns are centered by the fits instead of here, so the int8 genotype data is never densified to float: the column means are folded into an intercept which is not penalized (the offsets of Lasso, and the intercept scaling of liblinear in StabilitySelectionLogistic).
+
+    Args:
+        np_X (ndarray): 2D array (sparse matrix, or bit-packed data by PackBits) containing genotype data with `int8` type
+
+    Returns:
+        (tuple): tuple containing:
+
+            - sp_X (csr_matrix): Scaled genotype data with `float64` type
+            - np_scale (ndarray): 1D array containing the scale of each column
+
+    """
+
+    if IsBitPacked(np_X):
+        sp_X = BitPackedToCSR(np_X, dtype=np.float64)
+    else:
+        sp_X = sparse.csr_matrix(np_X, dtype=np.float64, copy=sparse.issparse(np_X))
+    int_num_sample = sp_X.shape[0]
+    np_mean = np.asarray(sp_X.mean(axis=0)).ravel()
+    np_sumSquare = np.asarray(sp_X.multiply(sp_X).sum(axis=0)).ravel()
+    np_scale = np.sqrt(np.maximum(np_sumSquare - int_num_sample * np_mean**2, 0))
+    np_scale[np_scale == 0] = 1.
+
+    ### scale the stored values in place instead of multiplying by a diagonal matrix, which would copy the matrix
+    sp_X.data *= (1. / np_scale)[sp_X.indices]
+
+    return sp_X, np_scale
+
+def IsSelectionConverged(np_count, int_num_resampling, float_selectionThreshold, float_zScore = 2.):
+    """
+
+    To check whether the selection of every feature is settled. A feature is settled if the selection threshold is outside the Wilson score interval of its selection frequency.
+
+    Args:
+        np_count (ndarray): 1D array containing the number of resamplings selecting each feature
+        int_num_resampling (int): The number of resamplings done
+        float_selectionThreshold (float): The threshold of selection frequency
+        float_zScore (float): The z-score of the interval (default: 2)
+
+    Returns:
+        (bool): True if the selection of all features is settled
+
+    """
+
+    np_frequency = np_count / float(int_num_resampling)
+    float_z2 = float_zScore**2 / int_num_resampling
+    np_center = (np_frequency + float_z2 / 2) / (1 + float_z2)
+    np_halfWidth = float_zScore * np.sqrt(np_frequency * (1 - np_frequency) / int_num_resampling + float_z2 / (4 * int_num_resampling)) / (1 + float_z2)
+
+    return bool(np.all(np.abs(np_center - float_selectionThreshold) > np_halfWidth))
+
+def ResampleSelection(func_fit, sp_X, np_y, float_scaling = .5, float_sampleFraction = .75, int_nResampling = 100, float_selectionThreshold = .25, bool_earlyStopping = True, int_minResampling = 20, int_checkInterval = 10, int_randomState = 0):
+    """
+
+    The resampling loop of stability selection. In each resampling, a subsample is drawn by the shared masks and each feature is randomly down-weighted by the scaling, then the selected features of the fitted model are counted. The loop stops early if the selection of all features is settled.
+
+    Args:
+        func_fit (function): func_fit(sp_X, np_y, np_weight) returns the 1D boolean array of the features selected on a subsample
+        sp_X (csr_matrix): Scaled genotype data from PrepareStabilityData
+        np_y (ndarray): 1D array containing phenotype data
+        float_scaling (float): The scaling of the down-weighted features, between 0 and 1 (default: 0.5)
+        float_sampleFraction (float): The fraction of samples in each subsample (default: 0.75)
+        int_nResampling (int): The maximum number of resamplings (default: 100)
+        float_selectionThreshold (float): The threshold of selection frequency used by early stopping (default: 0.25)
+        bool_earlyStopping (bool): Stop once the selection of all features is settled (default: True)
+        int_minResampling (int): The minimum number of resamplings before early stopping (default: 20)
+        int_checkInterval (int): The number of resamplings between the checks of early stopping (default: 10)
+        int_randomState (int): The seed of random number generator (default: 0)
+
+    Returns:
+        (ndarray): np_score
+
+            1D array containing the selection frequency of each feature with `float` type
+
+    """
+
+    if not (0 < float_scaling < 1):
+        raise ValueError("'scaling' should be between 0 and 1. Got %r instead." % float_scaling)
+
+    int_num_sample, int_num_feature = sp_X.shape
+    np_mask = GetSubsampleMask(int_num_sample, int_nResampling, float_sampleFraction, int_randomState)
+    ### the weights of each resampling are drawn in turn (the same stream as drawing all of them at once)
+    np_random = np.random.RandomState(int_randomState + 1)
+
+    np_count = np.zeros(int_num_feature, dtype=np.int64)
+    for idx_resampling in range(int_nResampling):
+        np_weight = 1. - float_scaling * np_random.randint(0, 2, size=int_num_feature)
+        sp_X_sub = sp_X[np_mask[idx_resampling]]
+        sp_X_sub.data *= np_weight[sp_X_sub.indices]
+        np_count += func_fit(sp_X_sub, np_y[np_mask[idx_resampling]], np_weight)
+
+        ### early stopping
+        int_num_resampling = idx_resampling + 1
+        if bool_earlyStopping and int_num_resampling >= int_minResampling and int_num_resampling % int_checkInterval == 0 and int_num_resampling < int_nResampling:
+            if IsSelectionConverged(np_count, int_num_resampling, float_selectionThreshold):
+                break
+
+    return np_count / float(int_num_resampling)
+
+def SelectAlphaByAIC(np_X, np_y, int_maxIter = 500):
+    """
+
+    To choose the regularization strength of Lasso by Akaike information criterion along the LARS path, the criterion of LassoLarsIC in scikit-learn 0.21 (the variance of noise is estimated by the variance of phenotype, so it also works if there are more features than samples).
+
+    Args:
+        np_X (ndarray): 2D array containing centered genotype data with `float` type
+        np_y (ndarray): 1D array containing centered phenotype data with `float` type
+        int_maxIter (int): The maximum number of LARS iterations (default: 500)
+
+    Returns:
+        (float): float_alpha
+
+    """
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        np_alpha, _, np_coefPath = lars_path(np_X, np_y, alpha_min=0.0, method='lasso', max_iter=int_maxIter)
+    np_meanSquaredError = np.mean((np_y[:, np.newaxis] - np.dot(np_X, np_coefPath))**2, axis=0)
+    np_df = np.sum(np.abs(np_coefPath) > np.finfo(np_coefPath.dtype).eps, axis=0)
+    np_criterion = np_X.shape[0] * np_meanSquaredError / (np.var(np_y) + np.finfo(np.float64).eps) + 2 * np_df
+
+    return float(np_alpha[np.argmin(np_criterion)])
+
+def StabilitySelectionLogistic(np_X, np_y, float_C = 1., float_scaling = .5, float_sampleFraction = .75, int_nResampling = 100, float_selectionThreshold = .25, float_tol = 1e-3, bool_earlyStopping = True, int_randomState = 0):
+    """
+
+    Stability selection with L1-regularized logistic regression, a drop-in for RandomizedLogisticRegression of randomized_l1. The models are fitted on sparse subsamples by liblinear, which has no warm start. randomized_l1 centered the columns; liblinear penalizes its intercept, so the uncentered columns are fitted with a large intercept scaling instead, which leaves the intercept practically unpenalized and absorbs the column means.
+
+    Args:
+        np_X (ndarray): 2D array (sparse matrix, or bit-packed data by PackBits) containing genotype data with `int8` type
+        np_y (ndarray): 1D array containing phenotype data with `int` type
+        float_C (float): The inverse of regularization strength (default: 1)
+        float_scaling (float): The scaling of the down-weighted features, between 0 and 1 (default: 0.5)
+        float_sampleFraction (float): The fraction of samples in each subsample (default: 0.75)
+        int_nResampling (int): The maximum number of resamplings (default: 100)
+        float_selectionThreshold (float): The threshold of selection frequency used by early stopping (default: 0.25)
+        float_tol (float): The tolerance of liblinear (default: 1e-3)
+        bool_earlyStopping (bool): Stop once the selection of all features is settled (default: True)
+        int_randomState (int): The seed of random number generator (default: 0)
+
+    Returns:
+        (ndarray): np_score
+
+            1D array containing the selection frequency of each feature with `float` type
+
+    """
+
+    sp_X, np_scale = PrepareStabilityData(np_X)
+    np_y = np.asarray(np_y).ravel()
+
+    def FitLogistic(sp_X_sub, np_y_sub, np_weight):
+        ### the penalty of the intercept is divided by intercept_scaling, as if the columns were centered
+        estimator = LogisticRegression(C=float_C, tol=float_tol, penalty='l1', dual=False, fit_intercept=True, intercept_scaling=100., solver='liblinear')
+        estimator.fit(sp_X_sub, np_y_sub)
+        return np.any(np.abs(estimator.coef_) > 10 * np.finfo(np.float64).eps, axis=0)
+
+    return ResampleSelection(FitLogistic, sp_X, np_y, float_scaling, float_sampleFraction, int_nResampling, float_selectionThreshold, bool_earlyStopping, int_randomState=int_randomState)
+
+def StabilitySelectionLasso(np_X, np_y, float_alpha = None, float_scaling = .5, float_sampleFraction = .75, int_nResampling = 100, float_selectionThreshold = .1, bool_earlyStopping = True, int_randomState = 0):
+    """
+
+    Stability selection with Lasso, a drop-in for RandomizedLasso of randomized_l1. The regularization strength is chosen by AIC on all samples once, and the coordinate descent of each resampling is warm-started by the coefficients of the previous one.
+
+    Args:
+        np_X (ndarray): 2D array (sparse matrix, or bit-packed data by PackBits) containing genotype data with `int8` type
+        np_y (ndarray): 1D array containing phenotype data with `float` type
+        float_alpha (float): The regularization strength, chosen by AIC if None (default: None)
+        float_scaling (float): The scaling of the down-weighted features, between 0 and 1 (default: 0.5)
+        float_sampleFraction (float): The fraction of samples in each subsample (default: 0.75)
+        int_nResampling (int): The maximum number of resamplings (default: 100)
+        float_selectionThreshold (float): The threshold of selection frequency used by early stopping (default: 0.1)
+        bool_earlyStopping (bool): Stop once the selection of all features is settled (default: True)
+        int_randomState (int): The seed of random number generator (default: 0)
+
+    Returns:
+        (ndarray): np_score
+
+            1D array containing the selection frequency of each feature with `float` type
+
+    """
+
+    sp_X, np_scale = PrepareStabilityData(np_X)
+    np_y = np.asarray(np_y, dtype=np.float64).ravel()
+
+    ### choose the regularization strength by AIC on the centered data of all samples
+    if float_alpha is None:
+        np_X_centered = sp_X.toarray()
+        np_X_centered -= np_X_centered.mean(axis=0)
+        float_alpha = SelectAlphaByAIC(np_X_centered, np_y - np_y.mean())
+        del np_X_centered
+    float_alpha = max(float(float_alpha), np.finfo(np.float64).eps)
+
+    estimator = Lasso(alpha=float_alpha, fit_intercept=True, warm_start=True)
+    list_previous = [None]
+
+    def FitLasso(sp_X_sub, np_y_sub, np_weight):
+        ### warm start by the coefficients of the previous resampling, rescaled by the weights of this one
+        if list_previous[0] is not None:
+            estimator.coef_ = list_previous[0] / np_weight
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            estimator.fit(sp_X_sub, np_y_sub)
+        list_previous[0] = estimator.coef_ * np_weight
+        return estimator.coef_ != 0.0
+
+    return ResampleSelection(FitLasso, sp_X, np_y, float_scaling, float_sampleFraction, int_nResampling, float_selectionThreshold, bool_earlyStopping, int_randomState=int_randomState)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+from genepi.tools.variantSummary import HashFile
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetStageCachePath(str_inputFileName_genotype, str_cacheFilePath = ""):
+    """
+
+    To get the folder of the stage cache. By default, the cache is placed next to the input genotype data, so that the runs on the same cohort share it across output folders.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        str_cacheFilePath (str): File path of the stage cache (default: "". .genepiCache next to the genotype data)
+
+    Returns:
+        (str): str_cacheFilePath
+
+    """
+
+    if str_cacheFilePath == "":
+        str_cacheFilePath = os.path.join(os.path.dirname(os.path.abspath(str_inputFileName_genotype)), ".genepiCache")
+
+    return os.path.abspath(str_cacheFilePath)
+
+def HashFileWithMemo(str_cacheFilePath, str_inputFileName):
+    """
+
+    To get the SHA-1 hash of a file, the hashes are memorized in the cache (FileHash.json) with the size and modification time of the files, so that an unchanged file is not read again.
+
+    Args:
+        str_cacheFilePath (str): File path of the stage cache
+        str_inputFileName (str): File name
+
+    Returns:
+        (str): str_hash
+
+    """
+
+    str_fileName_memo = os.path.join(str_cacheFilePath, "FileHash.json")
+    dict_memo = {}
+    if os.path.isfile(str_fileName_memo):
+        try:
+            with open(str_fileName_memo, "r") as file_inputFile:
+                dict_memo = json.load(file_inputFile)
+        except ValueError:
+            dict_memo = {}
+
+    str_inputFileName = os.path.abspath(str_inputFileName)
+    dict_hash = HashFile(str_inputFileName, dict_memo.get(str_inputFileName))
+    if dict_memo.get(str_inputFileName) != dict_hash:
+        dict_memo[str_inputFileName] = dict_hash
+        str_fileName_memo_tmp = str_fileName_memo + "." + uuid.uuid4().hex + ".tmp"
+        ### the memo only saves reading, the hash is still returned if it can't be written
+        try:
+            with open(str_fileName_memo_tmp, "w") as file_outputFile:
+                json.dump(dict_memo, file_outputFile)
+            os.replace(str_fileName_memo_tmp, str_fileName_memo)
+        except OSError:
+            if os.path.isfile(str_fileName_memo_tmp):
+                os.remove(str_fileName_memo_tmp)
+
+    return dict_hash["hash"]
+
+def GetStageKey(str_cacheFilePath, str_stage, list_inputFileName, dict_parameter):
+    """
+
+    To get the key of a stage in the cache, which is the hash of the stage name, the contents of its input files and its parameters. If the cache folder can't be created (e.g. the genotype data is in a read-only folder), the key is empty and the stage runs uncached.
+
+    Args:
+        str_cacheFilePath (str): File path of the stage cache
+        str_stage (str): The name of the stage
+        list_inputFileName (list): The file names of the inputs of the stage
+        dict_parameter (dict): The parameters of the stage, which are converted to `str`
+
+    Returns:
+        (str): str_key ("" if the cache is not usable)
+
+    Warnings:
+        "Warning: the stage cache <path> is not writable, <stage> runs uncached. Set its folder with --cachedir."
+
+    """
+
+    try:
+        os.makedirs(str_cacheFilePath, exist_ok=True)
+        if not os.access(str_cacheFilePath, os.W_OK):
+            raise PermissionError(str_cacheFilePath)
+    except OSError:
+        print("Warning: the stage cache " + str_cacheFilePath + " is not writable, " + str_stage + " runs uncached. Set its folder with --cachedir.")
+        return ""
+
+    list_key = [str_stage]
+    for str_inputFileName in list_inputFileName:
+        list_key.append(HashFileWithMemo(str_cacheFilePath, str_inputFileName))
+    for key in sorted(dict_parameter.keys()):
+        list_key.append(str(key) + "=" + str(dict_parameter[key]))
+
+    return hashlib.sha1("|".join(list_key).encode("utf-8")).hexdigest()
+
+def LoadStageCache(str_cacheFilePath, str_stage, str_key, str_outputFilePath):
+    """
+
+    To restore the outputs of a stage from the cache into the output folder. The files are copied with their modification time, so that the stores built from them stay up to date.
+
+    Args:
+        str_cacheFilePath (str): File path of the stage cache
+        str_stage (str): The name of the stage
+        str_key (str): The key of the stage by GetStageKey ("": not cached)
+        str_outputFilePath (str): File path of output file
+
+    Returns:
+        (bool): True if the outputs were restored, False if the stage is not in the cache
+
+    """
+
+    if str_key == "":
+        return False
+    str_entryFilePath = os.path.join(str_cacheFilePath, str_stage, str_key)
+    str_fileName_manifest = os.path.join(str_entryFilePath, "Manifest.json")
+    if not os.path.isfile(str_fileName_manifest):
+        return False
+
+    with open(str_fileName_manifest, "r") as file_inputFile:
+        list_outputFileName = json.load(file_inputFile)
+    if not all([os.path.isfile(os.path.join(str_entryFilePath, item)) for item in list_outputFileName]):
+        return False
+
+    if not os.path.exists(str_outputFilePath):
+        os.makedirs(str_outputFilePath)
+    for item in list_outputFileName:
+        shutil.copy2(os.path.join(str_entryFilePath, item), os.path.join(str_outputFilePath, item))
+
+    return True
+
+def SaveStageCache(str_cacheFilePath, str_stage, str_key, list_outputFileName):
+    """
+
+    To record the outputs of a stage in the cache. The entry is written to a temporary folder first, then renamed, so that a broken write never leaves a valid-looking entry.
+
+    Args:
+        str_cacheFilePath (str): File path of the stage cache
+        str_stage (str): The name of the stage
+        str_key (str): The key of the stage by GetStageKey ("": not cached)
+        list_outputFileName (list): The file names of the outputs of the stage, restored by their base names
+
+    Returns:
+        None
+
+    """
+
+    if str_key == "":
+        return
+    str_entryFilePath = os.path.join(str_cacheFilePath, str_stage, str_key)
+    if os.path.isfile(os.path.join(str_entryFilePath, "Manifest.json")):
+        return
+
+    str_entryFilePath_tmp = str_entryFilePath + "." + uuid.uuid4().hex + ".tmp"
+    try:
+        os.makedirs(str_entryFilePath_tmp)
+        for str_outputFileName in list_outputFileName:
+            shutil.copy2(str_outputFileName, os.path.join(str_entryFilePath_tmp, os.path.basename(str_outputFileName)))
+        with open(os.path.join(str_entryFilePath_tmp, "Manifest.json"), "w") as file_outputFile:
+            json.dump([os.path.basename(item) for item in list_outputFileName], file_outputFile)
+        shutil.rmtree(str_entryFilePath, ignore_errors=True)
+        os.replace(str_entryFilePath_tmp, str_entryFilePath)
+    except OSError:
+        print("Warning: the outputs of " + str_stage + " can't be saved to the stage cache " + str_cacheFilePath)
+        shutil.rmtree(str_entryFilePath_tmp, ignore_errors=True)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import argparse
+import json
+import os
+import numpy as np
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+### the hard-call probabilities of AA, AB and BB (with the separator of the next call) in .gen format
+np_genCall = np.frombuffer(b"1 0 0 0 1 0 0 0 1 ", dtype=np.uint8).reshape(3, 6)
+
+def SelectSyntheticGene(str_inputFileName_regions, int_num_gene, int_num_snp_gene, rng):
+    """
+
+    To select the genes of a synthetic cohort from genome regions. The genes are long enough for their SNPs, don't overlap each other, and are sorted by chromosome and position as step3 expects.
+
+    Args:
+        str_inputFileName_regions (str): File name of genome regions (chromosome, start, end, strand, gene symbol)
+        int_num_gene (int): The number of genes
+        int_num_snp_gene (int): The number of SNPs of a gene
+        rng (RandomState): The random number generator
+
+    Returns:
+        (list): list_gene
+
+            [str_chromosome, int_start, int_end, str_symbol] of each selected gene
+
+    """
+
+    list_region = []
+    with open(str_inputFileName_regions, "r") as file_inputFile:
+        for line in file_inputFile:
+            list_line = line.strip().split(",")
+            if len(list_line) < 5 or int(list_line[2]) - int(list_line[1]) < 2 * int_num_snp_gene:
+                continue
+            list_region.append([list_line[0], int(list_line[1]), int(list_line[2]), list_line[4]])
+    dict_chromosomeOrder = {}
+    for item in list_region:
+        dict_chromosomeOrder.setdefault(item[0], len(dict_chromosomeOrder))
+
+    ### draw genes in random order and keep the ones not overlapping the kept genes
+    list_gene = []
+    for idx_region in rng.permutation(len(list_region)):
+        if len(list_gene) == int_num_gene:
+            break
+        str_chromosome, int_start, int_end, str_symbol = list_region[idx_region]
+        if any([item[0] == str_chromosome and item[1] <= int_end and int_start <= item[2] for item in list_gene]):
+            continue
+        list_gene.append(list_region[idx_region])
+    if len(list_gene) < int_num_gene:
+        print("Warning of syntheticCohort: only " + str(len(list_gene)) + " genes are long enough and not overlapping")
+
+    return sorted(list_gene, key=lambda item: (dict_chromosomeOrder[item[0]], item[1]))
+
+def GenerateLDBlock(int_num_sample, np_maf, float_ldRho, rng):
+    """
+
+    To generate the genotypes of an LD block. Each haplotype is a latent Gaussian chain whose adjacent SNPs are correlated by float_ldRho, and a SNP carries its minor allele where the latent value exceeds the quantile of its MAF; a genotype is the number of minor alleles of two haplotypes.
+
+    Args:
+        int_num_sample (int): The number of samples
+        np_maf (ndarray): 1D array containing the minor allele frequency of each SNP of the block
+        float_ldRho (float): The correlation of the latent values of adjacent SNPs (0: no LD)
+        rng (RandomState): The random number generator
+
+    Returns:
+        (ndarray): np_genotype
+
+            2D array (SNPs x samples) containing the number of minor alleles (0: AA, 1: AB, 2: BB) with `int8` type
+
+    """
+
+    from scipy.special import ndtri
+
+    int_num_snp = np_maf.shape[0]
+    np_latent = np.empty([int_num_snp, 2 * int_num_sample])
+    np_latent[0] = rng.standard_normal(2 * int_num_sample)
+    for idx_snp in range(1, int_num_snp):
+        np_latent[idx_snp] = float_ldRho * np_latent[idx_snp - 1] + np.sqrt(1 - float_ldRho**2) * rng.standard_normal(2 * int_num_sample)
+    np_haplotype = np_latent > ndtri(1 - np_maf)[:, np.newaxis]
+
+    return (np_haplotype[:, :int_num_sample].astype(np.int8) + np_haplotype[:, int_num_sample:].astype(np.int8))
+
+def GetPrevalenceIntercept(np_liability, float_prevalence):
+    """
+
+    To get the intercept of the logistic model whose expected prevalence over the samples is float_prevalence, by bisection.
+
+    Args:
+        np_liability (ndarray): 1D array containing the liability of each sample
+        float_prevalence (float): The expected fraction of cases
+
+    Returns:
+        (float): float_intercept
+
+    """
+
+    float_low, float_high = -50.0, 50.0
+    for idx_iteration in range(100):
+        float_intercept = (float_low + float_high) / 2
+        if np.mean(1 / (1 + np.exp(-(np_liability + float_intercept)))) < float_prevalence:
+            float_low = float_intercept
+        else:
+            float_high = float_intercept
+
+    return (float_low + float_high) / 2
+
+def GenerateSyntheticCohort(str_outputFilePath, int_num_sample = 1000, int_num_variant = 1000, int_num_gene = 50, int_ldBlockSize = 10, float_ldRho = 0.9, float_mafMin = 0.05, float_mafAlpha = 1.0, float_mafBeta = 2.0, int_num_epistasis = 5, float_effect = 1.5, float_crossGeneRate = 0.5, str_model = "c", float_prevalence = 0.5, int_num_covariate = 2, int_seed = 0, str_inputFileName_regions = "", str_prefix = "synthetic"):
+    """
+
+    To generate a synthetic cohort of genotypes (.gen) and phenotypes (.csv) for benchmarking GenEpi at sizes beyond the example data. The variants are split evenly into genes of the genome regions, the genes into LD blocks (GenerateLDBlock), and the MAFs are drawn from a Beta(float_mafAlpha, float_mafBeta) spectrum scaled to [float_mafMin, 0.5]. The phenotype is driven by int_num_epistasis planted pairs, each adding float_effect to the liability of the samples carrying the minor alleles of both SNPs; a pair is cross-gene with probability float_crossGeneRate. The covariates (a binary one and Gaussian ones) have no effect. The .gen file is written an LD block at a time, so the genotypes of the whole cohort are never held in memory.
+
+    Args:
+        str_outputFilePath (str): File path of output files
+        int_num_sample (int): The number of samples (default: 1000)
+        int_num_variant (int): The number of variants (default: 1000)
+        int_num_gene (int): The number of genes (default: 50)
+        int_ldBlockSize (int): The number of SNPs of an LD block (default: 10)
+        float_ldRho (float): The correlation of the latent values of adjacent SNPs in a block (default: 0.9)
+        float_mafMin (float): The minimum minor allele frequency (default: 0.05)
+        float_mafAlpha (float): The alpha of the Beta distribution of MAFs (default: 1.0)
+        float_mafBeta (float): The beta of the Beta distribution of MAFs (default: 2.0)
+        int_num_epistasis (int): The number of planted SNP pairs, at most the number of distinct pairs (default: 5)
+        float_effect (float): The effect of a planted pair on the liability (default: 1.5)
+        float_crossGeneRate (float): The probability that a planted pair is cross-gene (default: 0.5)
+        str_model (str): "c" for case/control or "r" for a quantitative trait (default: "c")
+        float_prevalence (float): The expected fraction of cases of case/control (default: 0.5)
+        int_num_covariate (int): The number of covariates (default: 2)
+        int_seed (int): The seed of the random number generator (default: 0)
+        str_inputFileName_regions (str): File name of genome regions (default: "". The bundled UCSCGenomeDatabase.txt)
+        str_prefix (str): The prefix of the output file names (default: "synthetic")
+
+    Returns:
+        (tuple): tuple containing:
+
+            - str_outputFileName_genotype (str): File name of the genotype data (.gen)
+            - str_outputFileName_phenotype (str): File name of the phenotype data (.csv)
+            - str_outputFileName_truth (str): File name of the planted pairs and the parameters (.truth.json)
+
+    """
+
+    rng = np.random.RandomState(int_seed)
+    if str_inputFileName_regions == "":
+        str_inputFileName_regions = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "UCSCGenomeDatabase.txt")
+    if not os.path.exists(str_outputFilePath):
+        os.makedirs(str_outputFilePath)
+    str_outputFileName_genotype = os.path.join(str_outputFilePath, str_prefix + ".gen")
+    str_outputFileName_phenotype = os.path.join(str_outputFilePath, str_prefix + ".csv")
+    str_outputFileName_truth = os.path.join(str_outputFilePath, str_prefix + ".truth.json")
+
+    ### genes and their numbers of SNPs
+    int_num_gene = max(min(int_num_gene, int_num_variant), 1)
+    list_gene = SelectSyntheticGene(str_inputFileName_regions, int_num_gene, -(-int_num_variant // int_num_gene), rng)
+    list_num_snp_gene = [len(item) for item in np.array_split(np.arange(int_num_variant), len(list_gene))]
+
+    ### planted pairs, as the indices of their SNPs; the pairs are drawn at most int_num_draw times, as a small cohort may have fewer distinct pairs of a kind than requested
+    np_offset = np.concatenate([[0], np.cumsum(list_num_snp_gene)])
+    list_idx_geneWithin = [idx_gene for idx_gene, int_num_snp in enumerate(list_num_snp_gene) if int_num_snp > 1]
+    int_num_epistasis = min(int_num_epistasis, int_num_variant * (int_num_variant - 1) // 2)
+    int_num_draw = 100 * int_num_epistasis + 1000
+    list_pair = []
+    for idx_draw in range(int_num_draw):
+        if len(list_pair) == int_num_epistasis:
+            break
+        if len(list_gene) > 1 and (len(list_idx_geneWithin) == 0 or rng.rand() < float_crossGeneRate):
+            idx_geneA, idx_geneB = sorted(rng.choice(len(list_gene), 2, replace=False))
+        else:
+            idx_geneA = idx_geneB = rng.choice(list_idx_geneWithin)
+        idx_snpA = np_offset[idx_geneA] + rng.randint(list_num_snp_gene[idx_geneA])
+        idx_snpB = np_offset[idx_geneB] + rng.randint(list_num_snp_gene[idx_geneB])
+        if idx_snpA != idx_snpB and [min(idx_snpA, idx_snpB), max(idx_snpA, idx_snpB)] not in list_pair:
+            list_pair.append([min(idx_snpA, idx_snpB), max(idx_snpA, idx_snpB)])
+    if len(list_pair) < int_num_epistasis:
+        print("Warning of syntheticCohort: only " + str(len(list_pair)) + " distinct SNP pairs are planted")
+    dict_plantedGenotype = {idx_snp: None for item in list_pair for idx_snp in item}
+
+    ### write the .gen file by LD blocks
+    list_rsid = []
+    list_symbol = []
+    idx_snp = 0
+    with open(str_outputFileName_genotype, "wb") as file_outputFile:
+        for (str_chromosome, int_start, int_end, str_symbol), int_num_snp_gene in zip(list_gene, list_num_snp_gene):
+            np_position = np.sort(rng.choice(np.arange(int_start, int_end + 1), int_num_snp_gene, replace=False))
+            for idx_blockStart in range(0, int_num_snp_gene, int_ldBlockSize):
+                int_num_snp_block = min(int_ldBlockSize, int_num_snp_gene - idx_blockStart)
+                np_maf = float_mafMin + (0.5 - float_mafMin) * rng.beta(float_mafAlpha, float_mafBeta, int_num_snp_block)
+                np_genotype = GenerateLDBlock(int_num_sample, np_maf, float_ldRho, rng)
+                ### the calls of a SNP as one line of bytes, the last separator is replaced by the line break
+                np_line = np_genCall[np_genotype].reshape(int_num_snp_block, int_num_sample * 6)
+                np_line[:, -1] = ord("\n")
+                for idx_snpBlock in range(int_num_snp_block):
+                    str_rsid = "rs" + str(900000000 + idx_snp)
+                    str_allele = "".join(rng.choice(list("ACGT"), 2, replace=False))
+                    file_outputFile.write((" ".join([str_chromosome, str_rsid, str(np_position[idx_blockStart + idx_snpBlock]), str_allele[0], str_allele[1]]) + " ").encode())
+                    file_outputFile.write(np_line[idx_snpBlock].tobytes())
+                    if idx_snp in dict_plantedGenotype:
+                        dict_plantedGenotype[idx_snp] = np_genotype[idx_snpBlock].copy()
+                    list_rsid.append(str_rsid)
+                    list_symbol.append(str_symbol)
+                    idx_snp = idx_snp + 1
+
+    ### phenotype from the planted pairs, the samples carrying the minor alleles of both SNPs of a pair
+    np_liability = np.zeros(int_num_sample)
+    for idx_snpA, idx_snpB in list_pair:
+        np_liability = np_liability + float_effect * ((dict_plantedGenotype[idx_snpA] > 0) & (dict_plantedGenotype[idx_snpB] > 0))
+    if str_model == "c":
+        np_probability = 1 / (1 + np.exp(-(np_liability + GetPrevalenceIntercept(np_liability, float_prevalence))))
+        list_phenotype = [str(int(item)) for item in (rng.rand(int_num_sample) < np_probability)]
+    else:
+        list_phenotype = [str(round(item, 4)) for item in np_liability + rng.standard_normal(int_num_sample)]
+    list_covariate = []
+    for idx_covariate in range(int_num_covariate):
+        if idx_covariate == 0:
+            list_covariate.append([str(item) for item in rng.randint(0, 2, int_num_sample)])
+        else:
+            list_covariate.append([str(round(item, 1)) for item in rng.normal(60, 10, int_num_sample)])
+    with open(str_outputFileName_phenotype, "w") as file_outputFile:
+        for idx_sample in range(int_num_sample):
+            file_outputFile.writelines(",".join([item[idx_sample] for item in list_covariate] + [list_phenotype[idx_sample]]) + "\n")
+
+    ### the planted pairs and the parameters, for checking what the workflow recovers
+    dict_truth = {"num_sample": int_num_sample, "num_variant": int_num_variant, "num_gene": len(list_gene), "ldBlockSize": int_ldBlockSize, "ldRho": float_ldRho, "mafMin": float_mafMin, "mafAlpha": float_mafAlpha, "mafBeta": float_mafBeta, "effect": float_effect, "model": str_model, "prevalence": float_prevalence, "seed": int_seed}
+    dict_truth["epistasis"] = [{"rsid": [list_rsid[idx_snpA], list_rsid[idx_snpB]], "gene": [list_symbol[idx_snpA], list_symbol[idx_snpB]]} for idx_snpA, idx_snpB in list_pair]
+    with open(str_outputFileName_truth, "w") as file_outputFile:
+        json.dump(dict_truth, file_outputFile, indent=2)
+
+    return str_outputFileName_genotype, str_outputFileName_phenotype, str_outputFileName_truth
+
+def ArgumentsParser():
+    ### define arguments
+    str_description = ''
+    'This script generates a synthetic cohort (.gen and .csv) with LD blocks, a MAF spectrum and planted pairwise epistasis for benchmarking GenEpi'
+    parser = argparse.ArgumentParser(prog='syntheticCohort', description=str_description)
+
+    ### define arguments for I/O
+    parser.add_argument("-o", required=True, help="output file path")
+    parser.add_argument("-n", required=False, default=1000, type=int, help="number of samples (default: 1000)")
+    parser.add_argument("-v", required=False, default=1000, type=int, help="number of variants (default: 1000)")
+    parser.add_argument("-g", required=False, default=50, type=int, help="number of genes (default: 50)")
+    parser.add_argument("-m", required=False, default="c", choices=["c","r"], help="c for case/control or r for a quantitative trait (default: c)")
+    parser.add_argument("-s", required=False, default="", help="genome regions (default: the bundled UCSCGenomeDatabase.txt)")
+    parser.add_argument("--ldblock", required=False, default=10, type=int, help="number of SNPs of an LD block (default: 10)")
+    parser.add_argument("--ldrho", required=False, default=0.9, type=float, help="correlation of adjacent SNPs in an LD block (default: 0.9)")
+    parser.add_argument("--maf", required=False, nargs=3, default=[0.05, 1.0, 2.0], type=float, metavar=("MIN", "ALPHA", "BETA"), help="minimum MAF and the Beta distribution of MAFs (default: 0.05 1 2)")
+    parser.add_argument("--epistasis", required=False, default=5, type=int, help="number of planted SNP pairs (default: 5)")
+    parser.add_argument("--effect", required=False, default=1.5, type=float, help="effect of a planted pair (default: 1.5)")
+    parser.add_argument("--crossgene", required=False, default=0.5, type=float, help="fraction of cross-gene planted pairs (default: 0.5)")
+    parser.add_argument("--seed", required=False, default=0, type=int, help="random seed (default: 0)")
+    parser.add_argument("--prefix", required=False, default="synthetic", help="prefix of the output file names (default: synthetic)")
+
+    return parser
+
+""""""""""""""""""""""""""""""
+# main function
+""""""""""""""""""""""""""""""
+def main(args=None):
+    ### obtain arguments from argument parser
+    args = ArgumentsParser().parse_args(args)
+
+    list_outputFileName = GenerateSyntheticCohort(args.o, int_num_sample=args.n, int_num_variant=args.v, int_num_gene=args.g, int_ldBlockSize=args.ldblock, float_ldRho=args.ldrho, float_mafMin=args.maf[0], float_mafAlpha=args.maf[1], float_mafBeta=args.maf[2], int_num_epistasis=args.epistasis, float_effect=args.effect, float_crossGeneRate=args.crossgene, str_model=args.m, int_seed=args.seed, str_inputFileName_regions=args.s, str_prefix=args.prefix)
+    print("\n".join(list_outputFileName))
+
+if __name__ == "__main__":
+    main()
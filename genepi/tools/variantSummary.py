@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 2026
+
+@author: Chester (Yu-Chuan Chang)
+"""
+
+""""""""""""""""""""""""""""""
+# import libraries
+""""""""""""""""""""""""""""""
+import os
+import sys
+import hashlib
+import uuid
+import numpy as np
+
+from genepi.tools.genotypeStore import ConvertGenToStore
+from genepi.tools.genotypeStore import LoadGenotypeStore
+from genepi.tools.genReader import GetGenBaseName
+
+""""""""""""""""""""""""""""""
+# define functions
+""""""""""""""""""""""""""""""
+def GetVariantSummaryFileName(str_inputFileName_genotype):
+    """
+
+    To get the file name of the variant summary table which belongs to a .gen file. The table is placed next to its .gen file, and is named without the compression extension of a gzip or bgzip .gen file, as the genotype store.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+
+    Returns:
+        (str): File name of the variant summary table (.npz)
+
+    """
+
+    str_inputFileName_genotype = os.path.abspath(str_inputFileName_genotype)
+
+    return os.path.splitext(os.path.join(os.path.dirname(str_inputFileName_genotype), GetGenBaseName(str_inputFileName_genotype)))[0] + ".summary.npz"
+
+def HashFile(str_inputFileName, dict_previous = None):
+    """
+
+    To get the SHA-1 hash of a file. If the size and the modification time of the file are the same as the ones recorded with a previous hash, the previous hash is returned without reading the file again.
+
+    Args:
+        str_inputFileName (str): File name
+        dict_previous (dict): A previous result of this function (default: None)
+
+    Returns:
+        (dict): dict_hash
+
+            A dictionary with keys "hash", "size" and "mtime"
+
+    """
+
+    if str_inputFileName == "":
+        return {"hash": "", "size": 0, "mtime": 0}
+
+    int_size = os.path.getsize(str_inputFileName)
+    int_mtime = os.stat(str_inputFileName).st_mtime_ns
+    if dict_previous is not None and dict_previous["size"] == int_size and dict_previous["mtime"] == int_mtime:
+        return dict_previous
+
+    hash_sha1 = hashlib.sha1()
+    with open(str_inputFileName, "rb") as file_inputFile:
+        for bytes_block in iter(lambda: file_inputFile.read(2**20), b""):
+            hash_sha1.update(bytes_block)
+
+    return {"hash": hash_sha1.hexdigest(), "size": int_size, "mtime": int_mtime}
+
+def LoadPhenotypeLabel(str_inputFileName_phenotype):
+    """
+
+    To load the last column of phenotype data. The phenotype is regarded as case/control if all of the values are 0 or 1.
+
+    Args:
+        str_inputFileName_phenotype (str): File name of input phenotype data
+
+    Returns:
+        (ndarray): np_case
+
+            1D array with `bool` type, True for case; None if the phenotype is not case/control
+
+    """
+
+    list_phenotype = []
+    with open(str_inputFileName_phenotype, 'r') as file_inputFile:
+        for line in file_inputFile:
+            list_phenotype.append(line.strip().split(",")[-1])
+    np_phenotype = np.array(list_phenotype, dtype=float)
+    if not np.all((np_phenotype == 0) | (np_phenotype == 1)):
+        return None
+
+    return np_phenotype == 1
+
+def ComputeVariantSummary(str_inputFileName_genotype, str_inputFileName_phenotype = "", int_chunkSize = 10000):
+    """
+
+    To count the hard calls (AA, AB, BB, missing) of each variant in one streaming pass over the binary genotype store, and split the counts by case/control if the phenotype is given.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        str_inputFileName_phenotype (str): File name of input phenotype data (default: "")
+        int_chunkSize (int): The number of variants counted at once (default: 10000)
+
+    Returns:
+        (tuple): tuple containing:
+
+            - np_count (ndarray): 2D array (variants x 4) containing the counts of AA, AB, BB and missing calls with `int64` type
+            - np_count_case (ndarray): 2D array (variants x 4) containing the counts among cases with `int64` type (variants x 0 if the phenotype is not given or not case/control)
+
+    """
+
+    np_variant, np_hardcall = LoadGenotypeStore(str_inputFileName_genotype)
+    int_num_snp = np_hardcall.shape[0]
+    np_case = None
+    if str_inputFileName_phenotype != "":
+        np_case = LoadPhenotypeLabel(str_inputFileName_phenotype)
+
+    np_count = np.zeros([int_num_snp, 4], dtype=np.int64)
+    np_count_case = np.zeros([int_num_snp, 4 if np_case is not None else 0], dtype=np.int64)
+    for idx_start in range(0, int_num_snp, int_chunkSize):
+        idx_end = min(idx_start + int_chunkSize, int_num_snp)
+        np_call = np.array(np_hardcall[idx_start:idx_end, :]).astype(np.int64)
+
+        ### count all of the calls of this chunk with a single bincount (offset each variant by 4)
+        np_index = np_call + (np.arange(idx_end - idx_start, dtype=np.int64) * 4)[:, np.newaxis]
+        np_count[idx_start:idx_end, :] = np.bincount(np_index.ravel(), minlength=(idx_end - idx_start) * 4).reshape(-1, 4)
+        if np_case is not None:
+            np_count_case[idx_start:idx_end, :] = np.bincount(np_index[:, np_case].ravel(), minlength=(idx_end - idx_start) * 4).reshape(-1, 4)
+
+        ### show progress
+        str_print = "Summarize variants: Processing: " + "{0:.2f}".format(float(idx_end) / int_num_snp * 100) + "%"
+        sys.stdout.write('%s\r' % str_print)
+        sys.stdout.flush()
+
+    return np_count, np_count_case
+
+def LoadVariantSummary(str_inputFileName_genotype, str_inputFileName_phenotype = ""):
+    """
+
+    To load the variant summary table of a .gen file. The table is keyed by the hashes of the genotype and phenotype files; it is computed and saved next to the .gen file if it doesn't exist or the files changed. A table computed with a phenotype can be used without phenotype.
+
+    Args:
+        str_inputFileName_genotype (str): File name of input genotype data
+        str_inputFileName_phenotype (str): File name of input phenotype data (default: "")
+
+    Returns:
+        (dict): dict_summary
+
+            A dictionary of arrays with keys "count" (AA, AB, BB, missing), "count_case" (see ComputeVariantSummary), "maf" (minor allele frequency, missing calls counted as AA as in step2) and "missing" (missing rate)
+
+    """
+
+    str_fileName_summary = GetVariantSummaryFileName(str_inputFileName_genotype)
+
+    ### check the hashes recorded in the existing table
+    if os.path.isfile(str_fileName_summary):
+        with np.load(str_fileName_summary) as np_summary:
+            dict_summary = {key: np_summary[key] for key in np_summary.files}
+        dict_hash_genotype = {"hash": str(dict_summary["hash_genotype"]), "size": int(dict_summary["size_genotype"]), "mtime": int(dict_summary["mtime_genotype"])}
+        bool_valid = HashFile(str_inputFileName_genotype, dict_hash_genotype)["hash"] == dict_hash_genotype["hash"]
+        if bool_valid and str_inputFileName_phenotype != "":
+            bool_valid = HashFile(str_inputFileName_phenotype)["hash"] == str(dict_summary["hash_phenotype"])
+        if bool_valid:
+            return dict_summary
+
+    ### compute the table in one streaming pass over the genotype store
+    ConvertGenToStore(str_inputFileName_genotype)
+    np_count, np_count_case = ComputeVariantSummary(str_inputFileName_genotype, str_inputFileName_phenotype)
+    int_num_subject = np.sum(np_count[0, :]) if np_count.shape[0] > 0 else 0
+
+    ### calculate allele frequency
+    ### frequency of A = AA + AB/2 (missing calls counted as AA)
+    ### frequency of B = BB + AB/2
+    np_frequency_A = ((np_count[:, 0] + np_count[:, 3]) + np_count[:, 1] / 2) / int_num_subject
+    np_frequency_B = (np_count[:, 2] + np_count[:, 1] / 2) / int_num_subject
+
+    dict_hash_genotype = HashFile(str_inputFileName_genotype)
+    dict_summary = {
+        "count": np_count,
+        "count_case": np_count_case,
+        "maf": np.minimum(np_frequency_A, np_frequency_B),
+        "missing": np_count[:, 3] / max(int_num_subject, 1),
+        "hash_genotype": np.array(dict_hash_genotype["hash"]),
+        "size_genotype": np.array(dict_hash_genotype["size"]),
+        "mtime_genotype": np.array(dict_hash_genotype["mtime"]),
+        "hash_phenotype": np.array(HashFile(str_inputFileName_phenotype)["hash"]),
+    }
+
+    ### write to a temporary file first, then rename it, so that a broken write never leaves a valid-looking table
+    ### the temporary name is unique, runs summarizing the same file at once don't write to the same file
+    str_fileName_summary_tmp = str_fileName_summary + "." + uuid.uuid4().hex + ".tmp.npz"
+    try:
+        np.savez(str_fileName_summary_tmp, **dict_summary)
+        os.replace(str_fileName_summary_tmp, str_fileName_summary)
+    except OSError:
+        if os.path.isfile(str_fileName_summary_tmp):
+            os.remove(str_fileName_summary_tmp)
+
+    return dict_summary
+
+def GetOneHotVariance(np_count):
+    """
+
+    To get the variance of the one-hot (AA, AB, BB) columns of each variant from its counts; missing calls are counted as AA, as in the one-hot encoding.
+
+    Args:
+        np_count (ndarray): 2D array (variants x 4) containing the counts of AA, AB, BB and missing calls
+
+    Returns:
+        (ndarray): np_variance
+
+            2D array (variants x 3) containing the variances of AA, AB and BB columns
+
+    """
+
+    np_count = np.atleast_2d(np_count)
+    np_count_oneHot = np.stack([np_count[:, 0] + np_count[:, 3], np_count[:, 1], np_count[:, 2]], axis=1).astype(float)
+    np_frequency = np_count_oneHot / np.maximum(np.sum(np_count_oneHot, axis=1, keepdims=True), 1)
+
+    return np_frequency * (1 - np_frequency)